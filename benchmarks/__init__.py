@@ -0,0 +1,3 @@
+"""
+Benchmarks for StudSar (run as modules, e.g. python -m benchmarks.bench_bucketing).
+"""
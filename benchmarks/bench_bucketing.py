@@ -0,0 +1,106 @@
+"""
+Padding and throughput of bulk ingestion encoding, with and without length bucketing.
+
+The corpus mixes PDF-like segments (long prose paragraphs, as produced by the
+RAG splitter) with CSV-like segments (short "column: value" rows), which is
+where padding waste is worst. Results are printed as JSON.
+
+    python -m benchmarks.bench_bucketing                      # offline stub encoder
+    python -m benchmarks.bench_bucketing --model all-MiniLM-L6-v2 --segments 4000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, register_stub_encoder  # noqa: E402
+from src.utils.batching import length_buckets, padding_stats, sequential_batches  # noqa: E402
+
+_WORDS = ("memory marker segment network retrieval embedding semantic neural civil service policy "
+          "department budget report analysis guidance record data value model system process").split()
+
+
+def mixed_corpus(count, pdf_fraction=0.5, seed=0):
+    """Synthetic mixed corpus: PDF-like paragraphs (80-220 words) and CSV-like rows (6-20 words)."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        if rng.random() < pdf_fraction:
+            words = [rng.choice(_WORDS) for _ in range(rng.randint(80, 220))]
+            corpus.append(" ".join(words).capitalize() + ".")
+        else:
+            cells = [f"{rng.choice(_WORDS)}: {rng.randint(0, 10_000)}" for _ in range(rng.randint(3, 10))]
+            corpus.append(f"row {i}\n" + "\n".join(cells))
+    rng.shuffle(corpus)
+    return corpus
+
+
+def _encode(manager, corpus, lengths, batch_size, bucketing):
+    """Encodes the corpus the way the bulk ingestion path does; returns elapsed seconds."""
+    start = time.perf_counter()
+    if bucketing:
+        manager.generate_embeddings(corpus, batch_size=batch_size, token_counts=lengths, bucket_by_length=True)
+    else:
+        # One encode call per arrival-order batch, as a non-bucketing pipeline would do
+        for batch in sequential_batches(len(corpus), batch_size):
+            manager.generate_embeddings([corpus[i] for i in batch], batch_size=batch_size, bucket_by_length=False)
+    return time.perf_counter() - start
+
+
+def run(segments=2000, batch_size=32, model_name=None, pdf_fraction=0.5, seed=0):
+    from src.managers.manager import StudSarManager
+
+    if model_name is None:
+        register_stub_encoder()
+        model_name = STUB_MODEL_NAME
+    manager = StudSarManager(model_name=model_name)
+    max_len = getattr(manager.embedding_generator, "max_seq_length", None)
+
+    corpus = mixed_corpus(segments, pdf_fraction=pdf_fraction, seed=seed)
+    # +2 for [CLS]/[SEP], matching what the encoder actually pads
+    lengths = [n + 2 for n in manager.count_tokens(corpus)]
+
+    results = {"model": model_name, "segments": segments, "batch_size": batch_size, "pdf_fraction": pdf_fraction}
+    for label, bucketing in (("sequential", False), ("bucketed", True)):
+        batches = length_buckets(lengths, batch_size) if bucketing else sequential_batches(len(corpus), batch_size)
+        real, padded = padding_stats(lengths, batches, max_len)
+        _encode(manager, corpus[:batch_size], lengths[:batch_size], batch_size, bucketing) # warm-up
+        elapsed = _encode(manager, corpus, lengths, batch_size, bucketing)
+        results[label] = {
+            "real_tokens": real,
+            "padded_tokens": padded,
+            "padding_token_ratio": round(1.0 - real / padded, 4) if padded else 0.0,
+            "seconds": round(elapsed, 4),
+            "segments_per_second": round(segments / elapsed, 1) if elapsed else None,
+        }
+    seq, buck = results["sequential"], results["bucketed"]
+    results["speedup"] = round(seq["seconds"] / buck["seconds"], 2) if buck["seconds"] else None
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--pdf-fraction", type=float, default=0.5)
+    parser.add_argument("--model", default=None, help="SentenceTransformer name (default: offline stub encoder)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.segments, args.batch_size, args.model, args.pdf_fraction, args.seed)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+StudSar performance suite: ingestion throughput, search latency, persistence cost and memory.
+
+For every memory size (default 10k, 100k and 1M markers) a synthetic corpus with one
+marker per sentence is generated and measured:
+
+- ingestion: build_network_from_text end to end (segments/s), plus the same pipeline
+  split into its segment / encode / insert phases
+- search: p50 / p95 / p99 latency of StudSarManager.search for each k
+- persistence: save and load time for the legacy .pth file and the columnar directory,
+  plus the latency of the first query after loading
+- memory: peak RSS of the process that measured the size
+
+Every size runs in a fresh process (unless --no-isolate) so peak RSS is per size.
+Results are printed as JSON and can be written to a file to compare versions.
+
+    python -m benchmarks.bench_suite --sizes 10000             # quick, offline stub encoder
+    python -m benchmarks.bench_suite --output results.json     # 10k / 100k / 1M
+    python -m benchmarks.bench_suite --model all-MiniLM-L6-v2 --sizes 10000 100000
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, register_stub_encoder  # noqa: E402
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_KS = (1, 5, 10)
+
+_WORDS = ("memory marker segment network retrieval embedding semantic neural civil service policy "
+          "department budget report analysis guidance record data value model system process "
+          "hospital railway school housing council tax grant audit review strategy").split()
+
+
+def synthetic_corpus(num_sentences, seed=0, min_words=8, max_words=20):
+    """Returns (text, sentences): num_sentences capitalised sentences joined by spaces."""
+    rng = random.Random(seed)
+    sentences = []
+    for i in range(num_sentences):
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(min_words, max_words))]
+        sentences.append(" ".join(words).capitalize() + f" item {i}.")
+    return " ".join(sentences), sentences
+
+
+def percentiles(samples_ms):
+    """p50 / p95 / p99 / mean / max of a list of latencies in ms."""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {}
+    pick = lambda q: ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+    return {"p50_ms": round(pick(0.50), 3), "p95_ms": round(pick(0.95), 3), "p99_ms": round(pick(0.99), 3),
+            "mean_ms": round(sum(ordered) / len(ordered), 3), "max_ms": round(ordered[-1], 3), "samples": len(ordered)}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1) # bytes on macOS, KB on Linux
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    # Keep the JSON output clean of any console output from the code under test
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _rate(count, seconds):
+    return round(count / seconds, 1) if seconds else None
+
+
+def _new_manager(model_name, initial_capacity):
+    from src.managers.manager import StudSarManager
+    manager, _ = _timed(StudSarManager, model_name=model_name, initial_capacity=initial_capacity)
+    return manager
+
+
+def bench_ingestion(model_name, text, num_sentences, batch_size):
+    """Phase split (segment / encode / insert) and end-to-end build_network_from_text."""
+    manager = _new_manager(model_name, 1024)
+    segments, t_segment = _timed(manager.segment_text, text, use_spacy="regex", spacy_sentences_per_segment=1)
+    embeddings, t_encode = _timed(manager.generate_embeddings, segments, batch_size=batch_size)
+
+    def insert():
+        with manager._lock:
+            for segment, embedding in zip(segments, embeddings):
+                manager.studsar_network.add_marker(segment, embedding)
+    _, t_insert = _timed(insert)
+    del manager, embeddings
+    gc.collect()
+
+    manager = _new_manager(model_name, 1024)
+    _, t_build = _timed(manager.build_network_from_text, text, use_spacy_segmentation="regex", spacy_sentences_per_segment=1)
+    markers = manager.studsar_network.get_total_markers()
+    return manager, {
+        "markers": markers,
+        "expected_markers": num_sentences,
+        "build_network_from_text": {"seconds": round(t_build, 3), "segments_per_second": _rate(markers, t_build)},
+        "phases": {
+            "segment": {"seconds": round(t_segment, 3), "segments_per_second": _rate(len(segments), t_segment)},
+            "encode": {"seconds": round(t_encode, 3), "segments_per_second": _rate(len(segments), t_encode)},
+            "insert": {"seconds": round(t_insert, 3), "segments_per_second": _rate(len(segments), t_insert)},
+        },
+    }
+
+
+def bench_search(manager, sentences, ks, num_queries, seed):
+    """Latency percentiles of manager.search for each k (one warm-up query first)."""
+    rng = random.Random(seed)
+    queries = [" ".join(rng.sample(sentence.split(), k=min(5, len(sentence.split())))) for sentence in rng.choices(sentences, k=num_queries)]
+    _timed(manager.search, queries[0], k=max(ks))
+    results = {}
+    for k in ks:
+        latencies = []
+        for query in queries:
+            _, seconds = _timed(manager.search, query, k=k)
+            latencies.append(seconds * 1000.0)
+        results[f"k={k}"] = percentiles(latencies)
+    return results
+
+
+def bench_persistence(manager, query):
+    """Save / load time for both on-disk formats, and the first query after loading."""
+    from src.managers.manager import StudSarManager
+
+    workdir = tempfile.mkdtemp(prefix="studsar-bench-")
+    results = {}
+    try:
+        for label, path in (("legacy", os.path.join(workdir, "memory.pth")), ("columnar", os.path.join(workdir, "memory"))):
+            saved, t_save = _timed(manager.save, path)
+            loaded, t_load = _timed(StudSarManager.load, path)
+            if not saved or loaded is None:
+                results[label] = {"error": "save or load failed"}
+                continue
+            _, t_first = _timed(loaded.search, query, k=1)
+            size = (os.path.getsize(path) if os.path.isfile(path)
+                    else sum(f.stat().st_size for f in Path(path).iterdir()))
+            results[label] = {"save_seconds": round(t_save, 3), "load_seconds": round(t_load, 3),
+                              "first_query_ms": round(t_first * 1000.0, 3), "bytes_on_disk": size}
+            del loaded
+            gc.collect()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def run_size(size, model_name=None, ks=DEFAULT_KS, num_queries=200, batch_size=64, seed=0, stub_dim=384, stub_layers=1):
+    """Runs every measurement for one memory size and returns its results."""
+    if model_name is None:
+        register_stub_encoder(dim=stub_dim, layers=stub_layers)
+        model_name = STUB_MODEL_NAME
+    text, sentences = synthetic_corpus(size, seed=seed)
+    manager, ingestion = bench_ingestion(model_name, text, size, batch_size)
+    del text
+    search = bench_search(manager, sentences, ks, num_queries, seed)
+    persistence = bench_persistence(manager, sentences[0])
+    return {"size": size, "ingestion": ingestion, "search": search, "persistence": persistence,
+            "peak_rss_mb": peak_rss_mb()}
+
+
+def _environment(model_name):
+    import numpy
+    import torch
+    env = {"python": platform.python_version(), "platform": platform.platform(), "torch": torch.__version__,
+           "numpy": numpy.__version__, "model": model_name or STUB_MODEL_NAME}
+    try:
+        import subprocess
+        env["git_commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                                           text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        env["git_commit"] = None
+    return env
+
+
+def run(sizes=DEFAULT_SIZES, model_name=None, ks=DEFAULT_KS, num_queries=200, batch_size=64, seed=0, isolate=True,
+        stub_dim=384, stub_layers=1):
+    """Runs the suite for every size (each in its own process with isolate) and returns the results."""
+    kwargs = {"model_name": model_name, "ks": tuple(ks), "num_queries": num_queries, "batch_size": batch_size,
+              "seed": seed, "stub_dim": stub_dim, "stub_layers": stub_layers}
+    results = {"environment": _environment(model_name), "sizes": []}
+    for size in sizes:
+        if isolate:
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                results["sizes"].append(pool.apply(run_size, (size,), kwargs))
+        else:
+            results["sizes"].append(run_size(size, **kwargs))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Memory sizes (markers)")
+    parser.add_argument("--k", type=int, nargs="+", default=list(DEFAULT_KS), dest="ks", help="Search k values")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per k")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model", default=None, help="SentenceTransformer name (default: offline stub encoder)")
+    parser.add_argument("--stub-dim", type=int, default=384)
+    parser.add_argument("--stub-layers", type=int, default=1, help="Simulated encoder depth of the stub")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-isolate", action="store_true", help="Run every size in this process")
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.model, args.ks, args.queries, args.batch_size, args.seed, not args.no_isolate,
+                  args.stub_dim, args.stub_layers)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Offline stand-in for a SentenceTransformer, used by the benchmarks.
+
+StubEncoder needs no model download. Its embeddings are deterministic
+(hashed bag of words, so similar texts get similar vectors) and its compute cost
+mimics a transformer: every batch does work proportional to
+batch_size x padded_length x dim, so padding shows up in throughput exactly as
+it would with a real encoder.
+"""
+
+import hashlib
+
+import numpy as np
+import torch
+
+from src.models.registry import registry
+
+STUB_MODEL_NAME = "stub-encoder"
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with [CLS]/[SEP] special tokens."""
+    name_or_path = STUB_MODEL_NAME
+
+    def tokenize(self, text):
+        return text.split()
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+
+class StubEncoder:
+    """Minimal SentenceTransformer-compatible encoder (encode / dimension / tokenizer)."""
+    def __init__(self, dim=384, max_seq_length=256, layers=2, seed=0):
+        self.dim = dim
+        self.max_seq_length = max_seq_length
+        self.tokenizer = StubTokenizer()
+        self.model_name_or_path = STUB_MODEL_NAME
+        generator = torch.Generator().manual_seed(seed)
+        self._weights = [torch.randn(dim, dim, generator=generator) / dim ** 0.5 for _ in range(layers)]
+        self.padded_tokens = 0
+        self.real_tokens = 0
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def to(self, device):
+        return self
+
+    def _bag_of_words(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            digest = hashlib.blake2b(word.strip(".,;:!?\"'()").encode(), digest_size=8).digest()
+            vector[int.from_bytes(digest, "little") % self.dim] += 1.0
+        return vector
+
+    def _forward(self, texts):
+        """Simulated transformer cost for one padded batch."""
+        lengths = [min(len(t.split()) + 2, self.max_seq_length) for t in texts]
+        padded = max(lengths)
+        self.real_tokens += sum(lengths)
+        self.padded_tokens += padded * len(texts)
+        hidden = torch.ones(len(texts), padded, self.dim)
+        for weight in self._weights:
+            hidden = torch.tanh(hidden @ weight)
+        return hidden
+
+    def encode(self, sentences, batch_size=32, convert_to_tensor=False, convert_to_numpy=True,
+               device=None, show_progress_bar=False, normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        for i in range(0, len(texts), batch_size):
+            self._forward(texts[i:i + batch_size])
+        embeddings = np.stack([self._bag_of_words(t) for t in texts]) if texts else np.zeros((0, self.dim), dtype=np.float32)
+        embeddings += 1e-3 # Avoid all-zero vectors for empty texts
+        if normalize_embeddings:
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        if single:
+            embeddings = embeddings[0]
+        return torch.from_numpy(embeddings) if convert_to_tensor else embeddings
+
+
+def register_stub_encoder(device="cpu", **kwargs):
+    """Registers a StubEncoder in the process-wide model registry and returns it."""
+    return registry.register("embedding", STUB_MODEL_NAME, StubEncoder(**kwargs), device=device)
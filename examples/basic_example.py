@@ -8,7 +8,11 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  
 
 #  import StudSarManager
+import logging
 from src.managers.manager import StudSarManager
+from src.utils.instrumentation import set_log_level
+
+set_log_level(logging.INFO) # Show StudSar progress messages (DEBUG also shows per-query details)
 
 def run_example():
     # EXAMPLE TEXT
@@ -9,8 +9,12 @@ import os
 # Add the main directory to the path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import logging
 from src.managers.manager import StudSarManager
 from src.rag.rag_connector import RAGConnector
+from src.utils.instrumentation import set_log_level
+
+set_log_level(logging.INFO) # Show StudSar progress messages
 
 def run_rag_example():
     print("=== New era --> StudSar RAG Integration Example <-- ===\n")
@@ -0,0 +1,71 @@
+"""
+asyncio helpers for StudSarManager.
+
+Encoding and similarity scans are CPU-bound, so the async API runs them on a
+bounded thread pool. Concurrent `asearch` awaits that arrive within a short
+window are coalesced into one `search_batch` call (one encoder forward pass
+and one matrix product instead of one per caller).
+"""
+
+import asyncio
+
+
+class SearchCoalescer:
+    """
+    Collects concurrent search requests on one event loop and dispatches them
+    as micro-batches to `search_batch_fn(queries, ks)` on `executor`, with one k
+    per query so only the hits each caller receives are searched for and counted.
+    """
+    def __init__(self, search_batch_fn, executor, max_batch_size=32, max_wait_ms=2.0):
+        self._search_batch_fn = search_batch_fn
+        self._executor = executor
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._pending = [] # (query_text, k, future)
+        self._flush_handle = None
+        self.batches_dispatched = 0
+
+    async def submit(self, query_text, k=1):
+        """Queues a query and waits for its (ids, similarities, segments) result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query_text, k, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # Requests cancelled (or timed out) while queued are simply dropped
+        batch = [item for item in self._pending if not item[2].done()]
+        self._pending = []
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        queries = [query for query, _, _ in batch]
+        ks = [k for _, k, _ in batch]
+        self.batches_dispatched += 1
+        job = loop.run_in_executor(self._executor, self._search_batch_fn, queries, ks)
+
+        def _distribute(job_future):
+            if job_future.cancelled():
+                error, results = asyncio.CancelledError(), None
+            else:
+                error, results = job_future.exception(), None
+                if error is None:
+                    results = job_future.result()
+            for i, (_, k, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    ids, similarities, segments = results[i]
+                    future.set_result((ids[:k], similarities[:k], segments[:k]))
+
+        job.add_done_callback(_distribute)
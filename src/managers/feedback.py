@@ -0,0 +1,53 @@
+"""
+Asynchronous feedback ingestion: thumbs-up / thumbs-down on search results become
+marker reputation.
+
+The UI thread only enqueues (query, result marker IDs, signal); the FeedbackQueue folds
+the signals into one reputation delta per marker and a background thread applies them
+through the bulk reputation API (StudSarManager.update_reputation_many), so the scores
+are persisted by the normal save path and the write-ahead log.
+"""
+
+import numbers
+
+from src.managers.usage_buffer import UsageBuffer
+from src.utils.instrumentation import get_logger, metrics
+
+logger = get_logger("feedback")
+
+# UI signals -> reputation delta per result
+SIGNALS = {"positive": 1.0, "up": 1.0, "negative": -1.0, "down": -1.0}
+
+
+def signal_delta(signal, weight=1.0):
+    """Reputation delta of a feedback signal ("positive"/"negative", or a number)."""
+    if isinstance(signal, numbers.Number) and not isinstance(signal, bool):
+        return float(signal) * weight
+    if isinstance(signal, bool):
+        return weight if signal else -weight
+    try:
+        return SIGNALS[str(signal).lower()] * weight
+    except KeyError:
+        raise ValueError(f"Unknown feedback signal '{signal}'. Use one of {', '.join(SIGNALS)} or a number.") from None
+
+
+class FeedbackQueue(UsageBuffer):
+    """
+    Collects feedback and applies it in bulk every flush_interval seconds.
+    apply(marker_ids, deltas) receives one summed delta per marker. weight scales every signal.
+    """
+    flush_metric = "feedback_flushes"
+
+    def __init__(self, apply, flush_interval=1.0, max_pending=10_000, weight=1.0):
+        super().__init__(apply, flush_interval, max_pending, name="studsar-feedback-queue")
+        self.weight = weight
+
+    def submit(self, query, marker_ids, signal):
+        """Enqueues feedback on the results of query. Returns immediately."""
+        marker_ids = [m for m in marker_ids if m is not None]
+        if not marker_ids:
+            return
+        delta = signal_delta(signal, self.weight)
+        self.add(marker_ids, delta)
+        metrics.count("feedback_submitted")
+        logger.debug("Feedback %+.2f on %d results of %r queued.", delta, len(marker_ids), query)
@@ -1,36 +1,89 @@
 import os
+import asyncio
+import threading
+import numpy as np
 import torch
-from sentence_transformers import SentenceTransformer
-import traceback
+from concurrent.futures import ThreadPoolExecutor
 import random #This Import random for Dream Mode example
 from collections import defaultdict # this for ex studsar V2 state
+from src.managers.async_support import SearchCoalescer
+from src.managers.feedback import FeedbackQueue, signal_delta
+from src.managers.usage_buffer import UsageBuffer
+from src.models.backends import BACKEND_ALIASES, EmbeddingBackend, SentenceTransformerBackend, create_embedding_backend
 from src.models.neural import StudSarNeural
-from src.utils.text import segment_text, SPACY_AVAILABLE
-import streamlit as st
+from src.storage.columnar import is_columnar, load_columnar_into, read_manifest, save_columnar
+from src.storage.embedding_storage import storage_for_encoding
+from src.storage.wal import (OP_ADD, OP_DELETE, OP_REPUTATION, OP_UPDATE_EMBEDDING, OP_USAGE, WriteAheadLog,
+                             replay as replay_log, wal_path_for)
+from src.models.registry import registry
+from src.utils.batching import length_buckets
+from src.utils.instrumentation import get_logger, metrics
+from src.utils.text import segment_text, segment_texts, segment_text_by_tokens, count_tokens, StreamingSegmenter
+
+logger = get_logger("manager")
 
 # 1. New  ex V2 Studsar
 
-@st.cache_resource
-def load_embedding_model(model_name='all-MiniLM-L6-v2'):
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    print(f"Loading embedding model on device: {device}")
-    return SentenceTransformer(model_name, device=device)
+def load_embedding_model(model_name='all-MiniLM-L6-v2', device=None):
+    """Returns the process-wide shared SentenceTransformer for model_name."""
+    device = device if device is not None else torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    return registry.get_embedding_model(model_name, device)
+
+def _same_model(name_a, name_b):
+    """Compares model names ignoring the 'sentence-transformers/' hub prefix."""
+    strip = lambda name: (name or "").split("sentence-transformers/")[-1]
+    return strip(name_a) == strip(name_b)
 
 class StudSarManager:
     """
     Manages interaction with StudSarNeural network and auxiliary operations
     (embedding generation, segmentation, persistence).
     """
-    def __init__(self, model_name='all-MiniLM-L6-v2', initial_capacity=1024):
+    def __init__(self, model_name='all-MiniLM-L6-v2', initial_capacity=1024, async_workers=2,
+                 coalesce_window_ms=2.0, coalesce_max_batch=32, embedding_backend="torch", backend_path=None,
+                 embedding_model=None, network=None, storage=None):
+        """
+        embedding_model: an already-loaded SentenceTransformer or EmbeddingBackend used by this
+        manager instead of loading model_name (the process registry is left untouched).
+        network: an existing StudSarNeural to adopt (used by load) instead of allocating one.
+        storage: embedding storage backend of a new network ("memory", "mmap", "int8" or an
+        EmbeddingStorage, see src.storage.embedding_storage).
+        """
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"StudSarManager will use device: {self.device}")
+        logger.debug("StudSarManager will use device: %s", self.device)
         # Load model to generate markers ("understanding" phase)
-        self.embedding_generator = load_embedding_model(model_name)
+        # The backend ("torch", "torch-int8", "onnx") is SentenceTransformer-compatible
+        if isinstance(embedding_model, EmbeddingBackend):
+            self.embedding_backend = embedding_model
+        elif embedding_model is not None:
+            self.embedding_backend = SentenceTransformerBackend(model_name, self.device, model=embedding_model)
+        else:
+            self.embedding_backend = create_embedding_backend(embedding_backend, model_name, self.device, backend_path)
+        self.backend_path = backend_path
+        self.embedding_generator = self.embedding_backend
         self.embedding_dim = self.embedding_generator.get_sentence_embedding_dimension()
         # Initialize StudSar neural network
-        self.studsar_network = StudSarNeural(self.embedding_dim, initial_capacity, device=self.device).to(self.device)
+        if network is None:
+            network = StudSarNeural(self.embedding_dim, initial_capacity, device=self.device, storage=storage)
+        self.studsar_network = network.to(self.device)
         self.text_processor = self
         self.embedding_model = self.embedding_generator
+        # Guards the network against concurrent mutation from the async API / worker threads
+        self._lock = threading.RLock()
+        # Async API settings: bounded executor + coalescing of concurrent asearch() calls
+        self.async_workers = async_workers
+        self.coalesce_window_ms = coalesce_window_ms
+        self.coalesce_max_batch = coalesce_max_batch
+        self._executor = None
+        self._coalescer = None
+        self._coalescer_loop = None
+        # Incremental persistence (see enable_log): write-ahead log next to a columnar snapshot
+        self._wal = None
+        self._wal_snapshot = None
+        self.checkpoint_every = None
+        # Buffered usage accounting and feedback ingestion (see enable_usage_buffer / enable_feedback_queue)
+        self._usage_buffer = None
+        self._feedback_queue = None
         #  New  V2: Placeholder per modello di segmentazione 
         self.segmentation_model = None # Caricare qui il modello transformer addestrato
         # try:
@@ -47,253 +100,706 @@ class StudSarManager:
         #         device=0 if torch.cuda.is_available() else -1,
 
 
-        print(f"\n--- StudSarManager Initialization ---")
-        print(f"Embedding Generator Model: {model_name} (Dim: {self.embedding_dim})")
-        print(f"StudSarNeural network ready on device: {self.studsar_network.device}")
-        print(f" void non Marvel \n")
+        logger.info("StudSarManager ready: embedding model %s (dim %d, backend %s), network on %s.",
+                    model_name, self.embedding_dim, self.embedding_backend.name, self.studsar_network.device)
 
     def generate_embedding(self, text):
         """Generates embedding for a text using loaded model."""
         if not text or not isinstance(text, str): return None
         #  before encoding
         self.embedding_generator.to(self.device)
-        embedding = self.embedding_generator.encode(text, convert_to_tensor=True, device=self.device)
-        # Return as numpy array for compatibility 
-        return embedding.cpu().numpy()
+        with metrics.timer("encode"):
+            embedding = self.embedding_generator.encode(text, convert_to_tensor=True, device=self.device)
+            # Return as numpy array for compatibility 
+            return embedding.cpu().numpy()
+
+    def generate_embeddings(self, texts, batch_size=32, token_counts=None, bucket_by_length=False):
+        """
+        Generates embeddings for a list of texts in batched forward passes (numpy array, one row per text).
+        With bucket_by_length, texts are grouped by token length so each batch pads to a similar
+        length; rows are returned in the original order. Bucketing tokenizes every text first, so it
+        only pays off for bulk encoding (add_segments, ingestion), not for small query batches.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+        with metrics.timer("encode"):
+            return self._generate_embeddings(texts, batch_size, token_counts, bucket_by_length)
+
+    def _generate_embeddings(self, texts, batch_size, token_counts, bucket_by_length):
+        self.embedding_generator.to(self.device)
+        if not bucket_by_length or len(texts) <= 1:
+            embeddings = self.embedding_generator.encode(texts, batch_size=batch_size, convert_to_tensor=True,
+                                                         device=self.device, show_progress_bar=False)
+            return embeddings.cpu().numpy()
+
+        lengths = token_counts if token_counts is not None else self.count_tokens(texts)
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        for batch in length_buckets(lengths, batch_size):
+            batch_embeddings = self.embedding_generator.encode([texts[i] for i in batch], batch_size=len(batch), convert_to_tensor=True,
+                                                               device=self.device, show_progress_bar=False)
+            embeddings[batch] = batch_embeddings.cpu().numpy()
+        return embeddings
+
+    def count_tokens(self, texts):
+        """Token counts (without special tokens) of texts for the embedding model's tokenizer."""
+        tokenizer = getattr(self.embedding_generator, "tokenizer", None)
+        if tokenizer is None:
+            return [len(t.split()) for t in texts]
+        return count_tokens(tokenizer, list(texts))
+
+    def add_segments(self, segments, emotion=None, token_counts=None, batch_size=32, embeddings=None):
+        """
+        Bulk insert: encodes all segments in length-bucketed batches, then adds them to the
+        network in their original order (so marker IDs are deterministic and consecutive).
+        embeddings (one row per segment) skips encoding when the caller already encoded them.
+        Returns the list of new marker IDs (None for segments that could not be added).
+        """
+        keep = [i for i, seg in enumerate(segments) if seg and isinstance(seg, str) and seg.strip()]
+        segments = [segments[i] for i in keep]
+        if token_counts is not None:
+            token_counts = [token_counts[i] for i in keep]
+        if not segments:
+            return []
+        if embeddings is not None:
+            embeddings = np.asarray(embeddings)[keep]
+        else:
+            embeddings = self.generate_embeddings(segments, batch_size=batch_size, token_counts=token_counts,
+                                                  bucket_by_length=True)
+        with self._lock, metrics.timer("insert"):
+            self.studsar_network.to(self.device)
+            marker_ids = [self.studsar_network.add_marker(seg, embedding, emotion=emotion)
+                          for seg, embedding in zip(segments, embeddings)]
+            for marker_id, seg, embedding in zip(marker_ids, segments, embeddings):
+                if marker_id is not None:
+                    self._log(OP_ADD, embedding, id=marker_id, segment=seg, emotion=emotion)
+            self._maybe_checkpoint()
+        metrics.count("markers_added", sum(1 for marker_id in marker_ids if marker_id is not None))
+        return marker_ids
 
     # EDIT V2: Added default emotion, use new segmentation ---
-    def build_network_from_text(self, text, segment_length=100, use_spacy_segmentation=True, spacy_sentences_per_segment=3, default_emotion=None):
-        """Segments text using the configured method and populates StudSarNeural network."""
-        print("\n--- Building StudSar Network from Text ---")
+    def build_network_from_text(self, text, segment_length=100, use_spacy_segmentation=True, spacy_sentences_per_segment=3, default_emotion=None, n_process=1,
+                                stream_batch_size=64, token_budget=None, overlap_sentences=0):
+        """
+        Segments text using the configured method and populates StudSarNeural network.
+        text may also be a file object, an iterable of strings or a StreamingSegmenter:
+        it is then segmented, embedded and inserted as a bounded-memory stream.
+        token_budget (True for the encoder's max_seq_length, or an int) packs sentences
+        up to that many encoder tokens instead of using segment_length / sentence counts.
+        Streams are segmented by segment_length / sentence counts in one process: combining
+        them with token_budget or n_process > 1 raises ValueError.
+        """
+        logger.info("Building StudSar network from text...")
+        if not isinstance(text, str):
+            if token_budget or n_process != 1:
+                raise ValueError("token_budget and n_process are not supported when text is a stream; "
+                                 "pass a string or segment with segment_length / spacy_sentences_per_segment.")
+            return self._build_network_from_stream(text, segment_length, use_spacy_segmentation, spacy_sentences_per_segment,
+                                                   default_emotion, stream_batch_size)
         # Reset network with potentially new capacity if needed, keep embedding_dim
         # Pass initial capacity based on potential segment count? Or let it resize? Current: Let it resize.
         # REMOVED: self.studsar_network = StudSarNeural(self.embedding_dim, initial_capacity=initial_capacity, device=self.device).to(self.device)
         # TODO: Implement network reset logic if needed, e.g., self.studsar_network.reset_memory()
-        print("Preparing to build network...") # Placeholder message
+        token_counts = None
 
         # V2: Updated segmentation logic 
 # Use transformer model if loaded, otherwise fallback
-        if self.segmentation_model:
-             print("Using Transformer-based segmentation (placeholder)...")
-             # segments = self.segmentation_model.segment(text) #Call to the real model  
-             # Placeholder: Use standard segmentation for now until model is ready
-             segments = segment_text(text, segment_length=segment_length, use_spacy=use_spacy_segmentation, spacy_sentences_per_segment=spacy_sentences_per_segment)
-        else:
-             print("Using standard segmentation...")
-             # Use the imported segment_text function directly
-             segments = self.segment_text(text, segment_length=segment_length, use_spacy=use_spacy_segmentation, spacy_sentences_per_segment=spacy_sentences_per_segment)
+        with metrics.timer("segment"):
+            if token_budget:
+                 logger.debug("Using token-budget segmentation...")
+                 max_tokens = None if token_budget is True else token_budget
+                 token_segments = self.segment_text_by_tokens(text, max_tokens=max_tokens, overlap_sentences=overlap_sentences,
+                                                              use_spacy=use_spacy_segmentation)
+                 segments = [seg.text for seg in token_segments]
+                 token_counts = [seg.num_tokens for seg in token_segments]
+            elif self.segmentation_model:
+                 logger.debug("Using Transformer-based segmentation (placeholder)...")
+                 # segments = self.segmentation_model.segment(text) #Call to the real model  
+                 # Placeholder: Use standard segmentation for now until model is ready
+                 segments = segment_text(text, segment_length=segment_length, use_spacy=use_spacy_segmentation, spacy_sentences_per_segment=spacy_sentences_per_segment)
+            else:
+                 logger.debug("Using standard segmentation...")
+                 # Use the imported segment_text function directly
+                 segments = self.segment_text(text, segment_length=segment_length, use_spacy=use_spacy_segmentation, spacy_sentences_per_segment=spacy_sentences_per_segment, n_process=n_process)
         # END OF MODIFICATION  V2 
 
         if not segments:
-            print("No segments generated from text. Network not built.")
+            logger.warning("No segments generated from text. Network not built.")
             return
 
         # The network is already initialized in __init__. We add segments to the existing network.
-        print(f"Adding {len(segments)} segments to the network...")
-        added_count = 0
-        for i, seg in enumerate(segments):
-            if not seg.strip(): continue # Skip empty segments after join
-            embedding = self.generate_embedding(seg)
-            if embedding is not None:
-                #  EDIT V2: Pass emotion (currently None)  
-                marker_id = self.studsar_network.add_marker(seg, embedding, emotion=default_emotion)
-                #  FINE MODIFICA V2 
-                if marker_id is not None:
-                     added_count += 1
-            if (i + 1) % 50 == 0: print(f"  Processed {i+1}/{len(segments)} segments...")
+        logger.debug("Adding %d segments to the network...", len(segments))
+        # Bulk path: length-bucketed encoding, then in-order insertion
+        marker_ids = self.add_segments(segments, emotion=default_emotion, token_counts=token_counts)
+        added_count = sum(1 for marker_id in marker_ids if marker_id is not None)
 
-        print(f"Added {added_count} markers to StudSar network.")
-        print(f"Network memory now contains: {self.studsar_network.get_total_markers()} markers.")
-        print("--- Network Construction Complete ---\n")
+        logger.info("Added %d markers to StudSar network (%d in memory).", added_count, self.studsar_network.get_total_markers())
+
+    def _build_network_from_stream(self, source, segment_length, use_spacy_segmentation, spacy_sentences_per_segment, default_emotion, batch_size):
+        """segment -> embed -> insert pipeline that holds at most batch_size segments at a time."""
+        if isinstance(source, StreamingSegmenter):
+            segments = source
+        else:
+            segments = StreamingSegmenter(source, segment_length=segment_length, use_spacy=use_spacy_segmentation,
+                                          spacy_sentences_per_segment=spacy_sentences_per_segment)
+        logger.debug("Using streaming segmentation...")
+        added_count, processed, batch = 0, 0, []
+
+        def _flush(batch):
+            marker_ids = self.add_segments(batch, emotion=default_emotion, batch_size=batch_size)
+            return sum(1 for marker_id in marker_ids if marker_id is not None)
+
+        segments = iter(segments)
+        while True:
+            # Segmentation is lazy: time pulling each batch out of the stream
+            with metrics.timer("segment"):
+                for seg in segments:
+                    if not seg.strip(): continue
+                    batch.append(seg)
+                    if len(batch) >= batch_size:
+                        break
+            if not batch:
+                break
+            added_count += _flush(batch)
+            processed += len(batch)
+            batch = []
+            if processed % (batch_size * 10) == 0: logger.debug("  Processed %d segments...", processed)
+
+        logger.info("Added %d markers to StudSar network (%d in memory).", added_count, self.studsar_network.get_total_markers())
 
     def search(self, query_text, k=1):
         """Performs a search in StudSar network."""
-        print(f"\n--- Query Search ---")
-        print(f"Query: '{query_text}'")
+        logger.debug("Query search: %r", query_text)
         if not query_text or not isinstance(query_text, str):
-             print("Invalid query.")
+             logger.warning("Invalid query.")
              return [], [], []
 
         query_embedding = self.generate_embedding(query_text)
         if query_embedding is None:
-            print("Unable to generate embedding for query.")
+            logger.warning("Unable to generate embedding for query.")
             return [], [], []
 
-        # Ensure network is on the correct device
-        self.studsar_network.to(self.device)
-        marker_ids, similarities, segments = self.studsar_network.search_similar_markers(query_embedding, k=k)
-
-        if not marker_ids:
-             print("No results found.")
-        else:
-            print(f"Found {len(marker_ids)} results:")
+        with self._lock:
+            # Ensure network is on the correct device
+            self.studsar_network.to(self.device)
+            marker_ids, similarities, segments = self.studsar_network.search_similar_markers(query_embedding, k=k)
             # V2: Increment usage count for retrieved markers --- 
-            for mid in marker_ids:
-                self.studsar_network.increment_usage(mid) # Chiama il metodo in neural.py
-            
-        print("--- Search Complete ---\n")
+            self._count_usage(marker_ids)
+
+        metrics.count("searches")
+        logger.debug("Found %d results.", len(marker_ids))
         return marker_ids, similarities, segments
 
+    def search_batch(self, query_texts, k=1):
+        """
+        Searches several queries with one batched encode and one similarity pass.
+        k is the result count of every query, or a list with one count per query.
+        Returns a list with one (marker_ids, similarities, segments) tuple per query.
+        """
+        logger.debug("Batch query search (%d queries)", len(query_texts))
+        results = [([], [], []) for _ in query_texts]
+        valid = [i for i, q in enumerate(query_texts) if q and isinstance(q, str)]
+        if not valid:
+            logger.warning("No valid queries.")
+            return results
+
+        ks = list(k) if isinstance(k, (list, tuple)) else [k] * len(query_texts)
+        query_embeddings = self.generate_embeddings([query_texts[i] for i in valid])
+        for i, result in zip(valid, self.search_embeddings(query_embeddings, k=[ks[i] for i in valid])):
+            results[i] = result
+        return results
+
+    def search_embeddings(self, query_embeddings, k=1):
+        """
+        Searches with already-encoded queries (one row each) and counts usage of the hits.
+        k is the result count of every query, or a list with one count per query: the
+        similarity pass uses the largest and only the hits returned are counted.
+        Returns a list with one (marker_ids, similarities, segments) tuple per query.
+        """
+        ks = list(k) if isinstance(k, (list, tuple)) else [k] * len(query_embeddings)
+        with self._lock:
+            self.studsar_network.to(self.device)
+            batch_results = self.studsar_network.search_similar_markers_batch(query_embeddings, k=max(ks, default=1))
+            batch_results = [(ids[:n], similarities[:n], segments[:n])
+                             for (ids, similarities, segments), n in zip(batch_results, ks)]
+            self._count_usage([mid for marker_ids, _, _ in batch_results for mid in marker_ids])
+        metrics.count("searches", len(batch_results))
+        return batch_results
+
+    #  Usage and reputation accounting
+    def _count_usage(self, marker_ids):
+        """Counts search hits: queued in the usage buffer if enabled, otherwise applied in one bulk update."""
+        if not marker_ids:
+            return
+        if self._usage_buffer is not None:
+            self._usage_buffer.add(marker_ids)
+            return
+        with self._lock:
+            self.studsar_network.increment_usage_many(marker_ids)
+            self._log(OP_USAGE, ids=list(marker_ids))
+
+    def _apply_usage(self, marker_ids, counts):
+        with self._lock:
+            self.studsar_network.increment_usage_many(marker_ids, counts)
+            self._log(OP_USAGE, ids=list(marker_ids), counts=[int(c) for c in counts])
+
+    def enable_usage_buffer(self, flush_interval=1.0, max_pending=10_000):
+        """
+        Moves usage accounting off the query path: searches only queue their hit IDs and a
+        background thread applies them in bulk every flush_interval seconds (or once
+        max_pending distinct markers wait). save(), checkpoint() and close() flush first.
+        """
+        with self._lock:
+            if self._usage_buffer is None:
+                self._usage_buffer = UsageBuffer(self._apply_usage, flush_interval, max_pending)
+        return self._usage_buffer
+
+    def flush_usage(self):
+        """Applies buffered usage counts now. Returns the number of distinct markers updated."""
+        return self._usage_buffer.flush() if self._usage_buffer is not None else 0
+
+    def enable_feedback_queue(self, flush_interval=1.0, weight=1.0):
+        """
+        Starts asynchronous feedback ingestion: submit_feedback() only enqueues and a background
+        thread folds the signals into reputation deltas applied with update_reputation_many.
+        save(), checkpoint() and close() flush pending feedback first.
+        """
+        with self._lock:
+            if self._feedback_queue is None:
+                self._feedback_queue = FeedbackQueue(self.update_reputation_many, flush_interval, weight=weight)
+        return self._feedback_queue
+
+    def submit_feedback(self, query, marker_ids, signal):
+        """
+        Records user feedback ("positive"/"negative" or a number) on the results of query:
+        queued if enable_feedback_queue was called, otherwise applied immediately.
+        """
+        if self._feedback_queue is not None:
+            self._feedback_queue.submit(query, marker_ids, signal)
+            return True
+        marker_ids = [m for m in marker_ids if m is not None]
+        return self.update_reputation_many(marker_ids, signal_delta(signal)) > 0
+
+    def flush_feedback(self):
+        """Applies queued feedback now. Returns the number of markers updated."""
+        return self._feedback_queue.flush() if self._feedback_queue is not None else 0
+
+    def update_reputation_many(self, marker_ids, deltas):
+        """
+        Applies reputation feedback to many markers in one vectorized update. deltas is a
+        scalar or one delta per ID; repeated IDs accumulate. Returns the number applied.
+        """
+        marker_ids = list(marker_ids)
+        deltas = np.broadcast_to(np.asarray(deltas, dtype=np.float64), (len(marker_ids),)).tolist()
+        with self._lock:
+            applied = self.studsar_network.update_reputation_many(marker_ids, deltas)
+            if applied:
+                self._log(OP_REPUTATION, ids=marker_ids, deltas=deltas)
+        return applied
+
+    def reduce_dimensions(self, dim=128, method="pca", keep_full=True, rerank_factor=4):
+        """
+        Switches the memory to reduced-dimension mode. method="pca" fits a projection on the
+        stored markers, method="truncate" keeps the first dim components (Matryoshka models).
+        Inserts and queries are projected the same way; with keep_full, search re-ranks the
+        top k * rerank_factor candidates at full dimension. The projection is saved with the memory.
+        """
+        logger.info("Reducing memory dimension (%s, %d -> %d)...", method, self.embedding_dim, dim)
+        with self._lock:
+            projection = self.studsar_network.reduce_dimensions(dim, method=method, keep_full=keep_full, rerank_factor=rerank_factor)
+            if projection is not None and self._wal is not None:
+                self.checkpoint() # A projection change rewrites every row: fold it into a new snapshot
+        if projection is None:
+            logger.error("Dimension reduction failed.")
+        elif hasattr(projection, "explained_variance_ratio"):
+            logger.info("Explained variance retained: %.1f%%", 100 * projection.explained_variance_ratio)
+        return projection
+
     #  V2: Added emotion parameter
     def update_network(self, new_text_segment, emotion=None):
         """Adds a new segment to existing StudSar network."""
-        print("\n--- Updating StudSar Network ---")
-        print(f"Adding new segment: '{new_text_segment[:100]}...' (Emotion: {emotion})")
         if not new_text_segment or not isinstance(new_text_segment, str):
-             print("Invalid segment for update.")
+             logger.warning("Invalid segment for update.")
              return None
+        logger.debug("Adding new segment: %r (emotion: %s)", new_text_segment[:100], emotion)
 
         embedding = self.generate_embedding(new_text_segment)
         if embedding is None:
-            print("Unable to generate embedding for new segment.")
+            logger.warning("Unable to generate embedding for new segment.")
             return None
 
-        # Ensure network is on the correct device
-        self.studsar_network.to(self.device)
-        #  EDIT V2: Pass emotion (currently None) 
-        marker_id = self.studsar_network.add_marker(new_text_segment, embedding, emotion=emotion)
+        with self._lock, metrics.timer("insert"):
+            # Ensure network is on the correct device
+            self.studsar_network.to(self.device)
+            #  EDIT V2: Pass emotion (currently None) 
+            marker_id = self.studsar_network.add_marker(new_text_segment, embedding, emotion=emotion)
+            if marker_id is not None:
+                self._log(OP_ADD, embedding, id=marker_id, segment=new_text_segment, emotion=emotion)
+                self._maybe_checkpoint()
         #  END OF MODIFICATION V2 
 
         if marker_id is not None:
-            print(f"New marker added with ID {marker_id}.")
-            print(f"Network memory now contains: {self.studsar_network.get_total_markers()} markers.")
-            print("--- Update Complete ---\n")
+            metrics.count("markers_added")
+            logger.debug("New marker added with ID %d (%d in memory).", marker_id, self.studsar_network.get_total_markers())
             return marker_id
         else:
-             print("Update failed.")
-             print("--- Update Failed ---\n")
+             logger.error("Update failed.")
              return None
 
+    #  asyncio API: CPU-bound work runs on a bounded executor, never on the event loop
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.async_workers, thread_name_prefix="studsar")
+        return self._executor
+
+    async def _run_in_executor(self, timeout, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(self._get_executor(), lambda: func(*args, **kwargs))
+        return await asyncio.wait_for(job, timeout)
+
+    async def asearch(self, query_text, k=1, timeout=None):
+        """
+        Async search. Concurrent calls on the same event loop are coalesced into
+        micro-batches (see coalesce_window_ms / coalesce_max_batch).
+        Raises asyncio.TimeoutError if timeout (seconds) expires.
+        """
+        if not query_text or not isinstance(query_text, str):
+            return [], [], []
+        loop = asyncio.get_running_loop()
+        if self._coalescer is None or self._coalescer_loop is not loop:
+            self._coalescer = SearchCoalescer(self.search_batch, self._get_executor(),
+                                              max_batch_size=self.coalesce_max_batch,
+                                              max_wait_ms=self.coalesce_window_ms)
+            self._coalescer_loop = loop
+        return await asyncio.wait_for(self._coalescer.submit(query_text, k), timeout)
+
+    async def asearch_batch(self, query_texts, k=1, timeout=None):
+        """Async variant of search_batch()."""
+        return await self._run_in_executor(timeout, self.search_batch, list(query_texts), k=k)
+
+    async def aupdate_network(self, new_text_segment, emotion=None, timeout=None):
+        """Async variant of update_network()."""
+        return await self._run_in_executor(timeout, self.update_network, new_text_segment, emotion=emotion)
+
+    async def abuild_network_from_text(self, text, timeout=None, **kwargs):
+        """Async variant of build_network_from_text(); kwargs are passed through."""
+        return await self._run_in_executor(timeout, self.build_network_from_text, text, **kwargs)
+
+    def close(self):
+        """Shuts down the executor used by the async API, flushes buffered usage and syncs the write-ahead log."""
+        for buffer in (self._usage_buffer, self._feedback_queue):
+            if buffer is not None:
+                buffer.close()
+        self._usage_buffer = self._feedback_queue = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._coalescer = None
+            self._coalescer_loop = None
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+
+    def remove_markers(self, marker_ids):
+        """Deletes markers from the memory. Returns the number removed."""
+        with self._lock:
+            index = self.studsar_network.marker_id_to_index
+            present = [marker_id for marker_id in dict.fromkeys(marker_ids) if marker_id in index]
+            removed = self.studsar_network.remove_markers(present)
+            if removed:
+                self._log(OP_DELETE, ids=present)
+                self._maybe_checkpoint()
+        metrics.count("markers_removed", removed)
+        logger.info("Removed %d markers (%d in memory).", removed, self.studsar_network.get_total_markers())
+        return removed
+
+    def memory_report(self):
+        """
+        Byte breakdown of the memory per component (embeddings, over-allocated capacity,
+        segments, emotion/reputation/usage dicts, ID index); see StudSarNeural.memory_report.
+        """
+        with self._lock:
+            return self.studsar_network.memory_report()
+
+    def shrink_to_fit(self, reserve=0):
+        """Releases over-allocated buffer capacity (keeping room for reserve markers). Returns bytes freed."""
+        with self._lock:
+            freed = self.studsar_network.shrink_to_fit(reserve)
+        logger.info("Released %d bytes of unused capacity.", freed)
+        return freed
+
+    #  Incremental persistence: columnar snapshot + append-only write-ahead log
+    def _log(self, op, embedding=None, **fields):
+        """Records a mutation in the write-ahead log (no-op unless enable_log was called)."""
+        if self._wal is None:
+            return
+        if isinstance(embedding, torch.Tensor):
+            embedding = embedding.detach().float().cpu().numpy()
+        self._wal.append(op, embedding=embedding, **fields)
+
+    def _maybe_checkpoint(self):
+        if self._wal is not None and self.checkpoint_every and self._wal.records >= self.checkpoint_every:
+            self.checkpoint()
+
+    def _storage_metadata(self):
+        backend_name, model_name = self.embedding_backend.identity
+        return {
+            'embedding_model_name': model_name,
+            'embedding_backend': backend_name,
+            'embedding_backend_path': self.backend_path,
+        }
+
+    def enable_log(self, path, group_size=64, group_interval=1.0, checkpoint_every=10_000):
+        """
+        Makes the memory at path (a columnar snapshot directory) incrementally persistent:
+        a snapshot of the current memory is written once, then every mutation (add, usage,
+        reputation, delete) is appended to path + '.wal', fsynced in groups of group_size
+        records or every group_interval seconds. After checkpoint_every records the log is
+        folded into a new snapshot. load(path) replays the log and keeps logging with the
+        same settings (they are recorded in the snapshot manifest).
+        """
+        path = os.path.normpath(path)
+        if str(path).endswith((".pth", ".pt")):
+            logger.error("The write-ahead log needs a columnar snapshot directory, not a .pth file.")
+            return False
+        with self._lock:
+            if self._wal is not None:
+                self._wal.close()
+            start_lsn = read_manifest(path).get("wal_lsn", 0) if is_columnar(path) else 0
+            self._wal = WriteAheadLog(wal_path_for(path), start_lsn, group_size=group_size, group_interval=group_interval)
+            self._wal_snapshot = path
+            self.checkpoint_every = checkpoint_every
+            self.checkpoint()
+        logger.info("Write-ahead log enabled: %s", wal_path_for(path))
+        return True
+
+    def checkpoint(self):
+        """Folds the write-ahead log into a new columnar snapshot and empties the log."""
+        if self._wal is None:
+            logger.error("No write-ahead log enabled.")
+            return False
+        self.flush_usage()
+        self.flush_feedback()
+        with self._lock:
+            self._wal.sync()
+            metadata = self._storage_metadata()
+            metadata['wal_lsn'] = self._wal.lsn
+            metadata['wal_settings'] = {'group_size': self._wal.group_size, 'group_interval': self._wal.group_interval,
+                                        'checkpoint_every': self.checkpoint_every}
+            save_columnar(self.studsar_network, self._wal_snapshot, metadata=metadata)
+            self._wal.reset() # Safe: replay skips records up to wal_lsn if this is never reached
+        logger.info("Checkpoint written to: %s", self._wal_snapshot)
+        return True
+
     # NEW ADDITION V2
     def update_marker_reputation(self, marker_id, feedback_score):
         """Provides feedback to a specific marker to update its reputation."""
-        print(f"\n--- Updating Marker Reputation ---")
         if self.studsar_network:
-            # Ensure network is on the correct device
-            self.studsar_network.to(self.device)
-            success = self.studsar_network.update_marker_reputation(marker_id, feedback_score)
-            print(f"--- Reputation Update {'Complete' if success else 'Failed'} ---\n")
+            with self._lock:
+                # Ensure network is on the correct device
+                self.studsar_network.to(self.device)
+                success = self.studsar_network.update_marker_reputation(marker_id, feedback_score)
+                if success:
+                    self._log(OP_REPUTATION, id=marker_id, delta=feedback_score)
             return success
         else:
-            print("Error: StudSar network not initialized.")
-            print(f"--- Reputation Update Failed ---\n")
+            logger.error("StudSar network not initialized.")
             return False
+
+    def update_marker_embedding(self, marker_id, new_embedding):
+        """Replaces the embedding of an existing marker (e.g. Dream Mode consolidation); logged when the WAL is on."""
+        with self._lock:
+            self.studsar_network.to(self.device)
+            success = self.studsar_network.update_marker_embedding(marker_id, new_embedding)
+            if success:
+                self._log(OP_UPDATE_EMBEDDING, embedding=new_embedding, id=marker_id)
+        return success
     # END OF ADDITION V2
-    def save(self, filepath="studsar_neural_memory.pth"):
-        """Saves StudSarNeural network state and mappings."""
-        print(f"\n--- Saving StudSar State ---")
+    def save(self, filepath="studsar_neural_memory.pth", format=None):
+        """
+        Saves StudSarNeural network state and mappings.
+        format="columnar" writes a memory-mappable directory (see src.storage.columnar),
+        format="legacy" a single torch .pth file. By default, paths ending in .pth/.pt
+        use the legacy format and any other path the columnar one.
+        """
         if not self.studsar_network:
-            print("Error: StudSar network not initialized. Nothing to save.")
-            print("--- Save Failed ---\n")
+            logger.error("StudSar network not initialized. Nothing to save.")
             return False
 
+        # Backend and model that produced these embeddings (load refuses mismatches)
+        backend_name, model_name = self.embedding_backend.identity
+        self.flush_usage() # Buffered search hits and feedback are part of the saved state
+        self.flush_feedback()
+
+        if self._wal is not None and os.path.normpath(filepath) == self._wal_snapshot and format != "legacy":
+            # Changes are already in the write-ahead log: persisting costs one fsync, not a rewrite
+            self._wal.sync()
+            self._maybe_checkpoint()
+            logger.info("StudSar changes synced to write-ahead log: %s", wal_path_for(filepath))
+            return True
+
+        format = format or ("legacy" if str(filepath).endswith((".pth", ".pt")) else "columnar")
+        if format == "columnar":
+            try:
+                with self._lock:
+                    save_columnar(self.studsar_network, filepath, metadata=self._storage_metadata())
+                logger.info("StudSar state saved to: %s (columnar)", filepath)
+                return True
+            except Exception as e:
+                logger.error("Error during save: %s", e, exc_info=True)
+                return False
+
         # Ensure network is on CPU before saving state_dict and other data
         self.studsar_network.cpu()
 
-        # Get model name robustly
-        model_name = 'all-MiniLM-L6-v2' # Default
-        if hasattr(self.embedding_generator, 'tokenizer') and hasattr(self.embedding_generator.tokenizer, 'name_or_path'):
-             model_name = self.embedding_generator.tokenizer.name_or_path
-        elif hasattr(self.embedding_generator, 'model_name_or_path'): # Fallback for some models
-             model_name = self.embedding_generator.model_name_or_path
-
-        state = {
-            'network_state_dict': self.studsar_network.state_dict(),
-            'id_to_segment': self.studsar_network.id_to_segment,
-            'marker_id_to_index': self.studsar_network.marker_id_to_index,
-            'next_id': self.studsar_network.next_id,
-            'embedding_dim': self.studsar_network.embedding_dim,
+        # Network tensors and V2 dictionaries in the shared save format, plus the encoder identity
+        state = self.studsar_network.to_state()
+        state.update({
             'embedding_model_name': model_name,
-            #  NEWV2: Save V2 dictionaries 
-            'id_to_emotion': self.studsar_network.id_to_emotion,
-            'id_to_reputation': dict(self.studsar_network.id_to_reputation), # Convert defaultdict to dict for saving
-            'id_to_usage': dict(self.studsar_network.id_to_usage)           # Convert defaultdict to dict for saving
-            #  AN2 
-        }
+            'embedding_backend': backend_name,
+            'embedding_backend_path': self.backend_path,
+        })
         try:
             torch.save(state, filepath)
-            print(f"StudSar state saved to: {filepath}")
-            print("--- Save Complete ---\n")
+            logger.info("StudSar state saved to: %s", filepath)
             return True
         except Exception as e:
-            print(f"Error during save: {e}")
-            traceback.print_exc()
-            print("--- Save Failed ---\n")
+            logger.error("Error during save: %s", e, exc_info=True)
             return False
 
     @classmethod
-    def load(cls, filepath="studsar_neural_memory.pth", model_name=None):
-        """Loads state from file, including V2 attributes."""
-        print(f"\n--- Loading StudSar State ---")
+    def _open_for_state(cls, saved, model_name=None, embedding_backend=None, backend_path=None, allow_backend_mismatch=False,
+                        embedding_model=None, network=None):
+        """
+        Creates the manager for a saved memory around the already rebuilt network. saved holds the recorded
+        'embedding_model_name', 'embedding_backend', 'embedding_backend_path' and 'embedding_dim'.
+        Returns None (after logging why) if the requested backend, model or dimension does not match.
+        """
+        # Determine which embedding model to use
+        saved_model_name = saved.get('embedding_model_name', 'all-MiniLM-L6-v2') # Default if missing
+        saved_backend = saved.get('embedding_backend', 'torch') # Files written before backends existed
+        if embedding_backend and not allow_backend_mismatch and \
+                BACKEND_ALIASES.get(embedding_backend, embedding_backend) != BACKEND_ALIASES.get(saved_backend, saved_backend):
+            logger.error("Memory was produced by backend '%s', not '%s'. Pass allow_backend_mismatch=True to force.",
+                         saved_backend, embedding_backend)
+            return None
+        embedding_backend = embedding_backend or saved_backend
+        backend_path = backend_path or saved.get('embedding_backend_path')
+        if model_name is None:
+            model_name = saved_model_name
+            logger.debug("Loading will use embedding model: '%s' (from saved state or default)", model_name)
+        else:
+             logger.debug("Loading will use embedding model: '%s' (forced by user)", model_name)
+             if not _same_model(model_name, saved_model_name):
+                  logger.warning("Specified model '%s' is different from saved model '%s'.", model_name, saved_model_name)
+                  if not allow_backend_mismatch:
+                      logger.error("Memory was produced by a different model. Pass allow_backend_mismatch=True to force.")
+                      return None
+        # Create new manager instance
+        manager = cls(model_name=model_name, embedding_backend=embedding_backend, backend_path=backend_path,
+                      embedding_model=embedding_model, network=network)
+        loaded_backend, loaded_model = manager.embedding_backend.identity
+        if (loaded_backend != saved_backend or not _same_model(loaded_model, saved_model_name)) and not allow_backend_mismatch:
+            logger.error("Memory was produced by backend '%s' / model '%s', but '%s' / '%s' was requested. "
+                         "Pass allow_backend_mismatch=True to force.", saved_backend, saved_model_name, loaded_backend, loaded_model)
+            return None
+        # Verify embedding dimension consistency
+        saved_embedding_dim = saved.get('embedding_dim')
+        if saved_embedding_dim != manager.embedding_dim:
+            logger.critical("Saved embedding dimension (%s) does not match loaded model dimension (%d). Loading interrupted.",
+                            saved_embedding_dim, manager.embedding_dim)
+            return None
+        return manager
+
+    @classmethod
+    def load(cls, filepath="studsar_neural_memory.pth", model_name=None, embedding_backend=None, backend_path=None,
+             allow_backend_mismatch=False, mmap=True, embedding_model=None):
+        """
+        Loads state from file, including V2 attributes, in a single pass: the network is rebuilt
+        from the saved state and handed to the new manager, and the encoder comes from the process
+        registry (or embedding_model, an already-loaded model, when supplied).
+        filepath is a legacy .pth file or a columnar directory; columnar memories are
+        memory-mapped (mmap=True) so the first query does not wait for the whole file.
+        By default the memory is reopened with the backend and model that produced it; asking for a
+        different backend or model fails unless allow_backend_mismatch=True.
+        """
         if not os.path.exists(filepath):
-            print(f"Error: File '{filepath}' not found.")
-            print("--- Load Failed ---\n")
+            logger.error("File '%s' not found.", filepath)
             return None
+        if is_columnar(filepath):
+            return cls._load_columnar(filepath, model_name, embedding_backend, backend_path, allow_backend_mismatch, mmap,
+                                      embedding_model)
         try:
             device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
             state = torch.load(filepath, map_location=device) # Load to correct device
-            # Determine which embedding model to use
-            saved_model_name = state.get('embedding_model_name', 'all-MiniLM-L6-v2') # Default if missing
-            if model_name is None:
-                model_name = saved_model_name
-                print(f"Loading will use embedding model: '{model_name}' (from saved state or default)")
-            else:
-                 print(f"Loading will use embedding model: '{model_name}' (forced by user)")
-                 if model_name != saved_model_name:
-                      print(f"Warning: Specified model '{model_name}' is different from saved model '{saved_model_name}'.")
-            # Create new manager instance
-            manager = cls(model_name=model_name) # Initial capacity will be handled by loading state
-            # Verify embedding dimension consistency
-            saved_embedding_dim = state.get('embedding_dim')
-            if saved_embedding_dim != manager.embedding_dim:
-                print(f"CRITICAL ERROR: Saved embedding dimension ({saved_embedding_dim}) "
-                      f"does not match loaded model dimension ({manager.embedding_dim}). Loading interrupted.")
-                print("--- Load Failed ---\n")
+            # Reconstruct network (including V2 dictionaries) straight from the saved tensors and mappings
+            network = StudSarNeural.from_state(state.get('embedding_dim'), state, device=device)
+            manager = cls._open_for_state(state, model_name, embedding_backend, backend_path, allow_backend_mismatch,
+                                          embedding_model, network)
+            if manager is None:
                 return None
 
-            # Reconstruct network
-            # Determine initial capacity from loaded tensor if possible, else use default
-            initial_capacity_loaded = 1024 # Default
-            if 'network_state_dict' in state and 'memory_embeddings' in state['network_state_dict']:
-                 initial_capacity_loaded = state['network_state_dict']['memory_embeddings'].shape[0]
-                 if initial_capacity_loaded == 0: initial_capacity_loaded = 1024 # Handle empty saved state
-
-            manager.studsar_network = StudSarNeural(manager.embedding_dim, initial_capacity=initial_capacity_loaded, device=manager.device).to(manager.device)
-
-            # Load the state dict
-            manager.studsar_network.load_state_dict(state['network_state_dict'])
-
-            # Load mappings and V2 attributes
-            manager.studsar_network.id_to_segment = state.get('id_to_segment', {})
-            manager.studsar_network.marker_id_to_index = state.get('marker_id_to_index', {})
-            manager.studsar_network.next_id = state.get('next_id', 0)
-
-            #  NEWV2: Load V2 dictionaries 
-            manager.studsar_network.id_to_emotion = state.get('id_to_emotion', {})
-            # Load reputation and usage, converting back to defaultdict if needed or handling missing keys
-            manager.studsar_network.id_to_reputation = defaultdict(float, state.get('id_to_reputation', {}))
-            manager.studsar_network.id_to_usage = defaultdict(int, state.get('id_to_usage', {}))
-            print(f"Loaded {len(manager.studsar_network.id_to_emotion)} emotion tags.")
-            print(f"Loaded {len(manager.studsar_network.id_to_reputation)} reputation scores.")
-            print(f"Loaded {len(manager.studsar_network.id_to_usage)} usage counts.")
+            logger.debug("Loaded %d emotion tags, %d reputation scores, %d usage counts.",
+                         len(manager.studsar_network.id_to_emotion), len(manager.studsar_network.id_to_reputation),
+                         len(manager.studsar_network.id_to_usage))
             #  AN2 
 
-
-            print(f"StudSar state loaded from: {filepath}")
-            print(f"Number of markers loaded: {manager.studsar_network.get_total_markers()}")
-            print("--- Load Complete ---\n")
+            logger.info("StudSar state loaded from: %s (%d markers)", filepath, manager.studsar_network.get_total_markers())
             return manager
 
         except Exception as e:
-            print(f"General error during loading: {e}")
-            traceback.print_exc() # Print stack trace for debug
-            print("--- Load Failed ---\n")
+            logger.error("General error during loading: %s", e, exc_info=True)
             return None
     #  END NEW ADDITION V2  
 
-    def segment_text(self, text, segment_length=100, use_spacy=True, spacy_sentences_per_segment=3):
+    @classmethod
+    def _load_columnar(cls, path, model_name, embedding_backend, backend_path, allow_backend_mismatch, mmap, embedding_model=None):
+        """Loads a directory written by save(format="columnar")."""
+        try:
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            manifest = read_manifest(path)
+            network = StudSarNeural(manifest["embedding_dim"], initial_capacity=0, device=device,
+                                    storage=storage_for_encoding(manifest.get("dtype", "float32")))
+            manifest = load_columnar_into(network, path, mmap=mmap)
+            manager = cls._open_for_state(manifest, model_name, embedding_backend, backend_path, allow_backend_mismatch,
+                                          embedding_model, network)
+            if manager is None:
+                return None
+            log_path = wal_path_for(path)
+            if os.path.exists(log_path):
+                # Bring the snapshot up to date and keep logging to the same files
+                applied = replay_log(manager.studsar_network, log_path, manifest.get("wal_lsn", 0))
+                logger.info("Replayed %d write-ahead log records.", applied)
+                settings = manifest.get("wal_settings", {})
+                manager._wal = WriteAheadLog(log_path, manifest.get("wal_lsn", 0), group_size=settings.get("group_size", 64),
+                                             group_interval=settings.get("group_interval", 1.0))
+                manager._wal_snapshot = os.path.normpath(path)
+                manager.checkpoint_every = settings.get("checkpoint_every", 10_000)
+            logger.info("StudSar state loaded from: %s (columnar%s, %d markers)", path, ", memory-mapped" if mmap else "",
+                        manager.studsar_network.get_total_markers())
+            return manager
+        except Exception as e:
+            logger.error("General error during loading: %s", e, exc_info=True)
+            return None
+
+    def segment_text(self, text, segment_length=100, use_spacy=True, spacy_sentences_per_segment=3, n_process=1):
         """Delegates to the global segment_text function."""
-        return segment_text(text, segment_length=segment_length, use_spacy=use_spacy, spacy_sentences_per_segment=spacy_sentences_per_segment)
+        return segment_text(text, segment_length=segment_length, use_spacy=use_spacy, spacy_sentences_per_segment=spacy_sentences_per_segment, n_process=n_process)
+
+    def segment_text_by_tokens(self, text, max_tokens=None, overlap_sentences=0, use_spacy=True):
+        """
+        Packs sentences into segments that fit the embedding model's tokenizer budget
+        (default: the model's max_seq_length). Returns TokenSegment(text, num_tokens) tuples.
+        """
+        if max_tokens is None:
+            max_tokens = getattr(self.embedding_generator, "max_seq_length", None) or 256
+        return segment_text_by_tokens(text, self.embedding_generator.tokenizer, max_tokens=max_tokens,
+                                      overlap_sentences=overlap_sentences, use_spacy=use_spacy)
+
+    def segment_texts(self, texts, segment_length=100, use_spacy=True, spacy_sentences_per_segment=3, batch_size=64, n_process=1):
+        """Delegates to the global segment_texts function (batched nlp.pipe over many documents)."""
+        return segment_texts(texts, segment_length=segment_length, use_spacy=use_spacy, spacy_sentences_per_segment=spacy_sentences_per_segment,
+                             batch_size=batch_size, n_process=n_process)
 
     # NEW ADDITION V2: Hook for View  
     def visualize_graph(self, similarity_threshold=0.85, output_file="studsar_graph.png"):
@@ -301,18 +807,15 @@ class StudSarManager:
         Generates and saves a visualization of the internal semantic graph.
         Requires networkx and matplotlib/plotly.
         """
-        print("\n--- Generating Semantic Graph Visualization ---")
         if not self.studsar_network:
-            print("Error: StudSar network not initialized.")
-            print("--- Visualization Failed ---\n")
+            logger.error("StudSar network not initialized.")
             return
 
         try:
             # Import visualization utility here to avoid making it a hard dependency
             from ..utils.visualization import plot_semantic_graph
         except ImportError:
-            print("Error: Visualization requires 'networkx' and 'matplotlib'. Please install them (pip install networkx matplotlib).")
-            print("--- Visualization Failed ---\n")
+            logger.error("Visualization requires 'networkx' and 'matplotlib'. Please install them (pip install networkx matplotlib).")
             return
 
         # Ensure network is on the correct device
@@ -320,11 +823,10 @@ class StudSarManager:
         id_to_embedding_map = self.studsar_network.get_all_embeddings_and_ids()
 
         if not id_to_embedding_map:
-            print("No markers in memory to visualize.")
-            print("--- Visualization Complete (Empty Graph) ---\n")
+            logger.warning("No markers in memory to visualize.")
             return
 
-        print(f"Generating graph for {len(id_to_embedding_map)} markers...")
+        logger.info("Generating graph for %d markers...", len(id_to_embedding_map))
         try:
             plot_semantic_graph(
                 id_to_embedding_map,
@@ -334,12 +836,9 @@ class StudSarManager:
                 id_to_emotion=self.studsar_network.id_to_emotion, # Pass emotion data
                 id_to_reputation=self.studsar_network.id_to_reputation # Pass reputation data
             )
-            print(f"Semantic graph saved to '{output_file}'")
-            print("--- Visualization Complete ---\n")
+            logger.info("Semantic graph saved to '%s'", output_file)
         except Exception as e:
-            print(f"Error during graph generation or plotting: {e}")
-            traceback.print_exc()
-            print("--- Visualization Failed ---\n")
+            logger.error("Error during graph generation or plotting: %s", e, exc_info=True)
     #  END NEW ADDITION V2   
 
 
@@ -356,17 +855,12 @@ class StudSarManager:
                    usage = details_dict.get("usage_count", 0)
                    # embedding = details_dict.get("embedding") # Embedding is also available
 
-                   print(f"\n--- Marker Details (ID: {marker_id}) ---")
-                   print(f"Segment: '{segment[:100]}...'" )
-                   print(f"Emotion: {emotion}")
-                   print(f"Reputation: {reputation:.2f}")
-                   print(f"Usage Count: {usage}")
-                   # print(f"  Embedding Shape: {embedding.shape if embedding is not None else 'N/A'}") # Uncomment to see shape
-                   print(f" Void Embedding  \n")
+                   logger.debug("Marker %s: segment=%r emotion=%s reputation=%.2f usage=%d",
+                                marker_id, segment[:100], emotion, reputation, usage)
                    return details_dict # Return the full dictionary
               else:
-                   print(f"Marker ID {marker_id} not found.")
+                   logger.warning("Marker ID %s not found.", marker_id)
                    return None
          else:
-              print("Error: StudSar network not initialized.")
+              logger.error("StudSar network not initialized.")
               return None
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Prometheus metrics endpoint for a running StudSar process (standard library only).
+
+The exporter attaches a PrometheusSink to the instrumentation layer, so every timer
+(encode, similarity, topk, ...) is published as a latency histogram and every counter
+(resizes, markers_added, ...) as a counter. Gauges are read when scraped: markers and
+resident bytes of watched managers, markers per namespace, query and emotion queue depth,
+and the RAG ingestion backlog (files and segments not yet inserted).
+
+    exporter = MetricsExporter(port=9464).watch_manager(manager).start()
+    # curl http://127.0.0.1:9464/metrics
+    exporter.stop()
+"""
+
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.utils.instrumentation import PrometheusSink, get_logger, metrics
+
+logger = get_logger("metrics_exporter")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsExporter:
+    """
+    Serves GET /metrics in the Prometheus text exposition format from a background thread.
+    Gauges are registered with add_gauge() or the watch_* helpers and evaluated on each scrape.
+    """
+    def __init__(self, host="127.0.0.1", port=9464, sink=None, prefix="studsar"):
+        self.host = host
+        self.port = port
+        self.prefix = prefix
+        self._own_sink = sink is None
+        self.sink = sink if sink is not None else PrometheusSink(prefix=prefix)
+        self._gauges = {} # metric name -> {"help": str, "series": {fixed labels: (callback, label)}}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    #  gauges
+    def add_gauge(self, name, callback, help="", labels=None, label=None):
+        """
+        Registers a gauge series evaluated at scrape time. callback() returns a number, or with
+        label a {label_value: number} mapping published as one sample per value. labels are
+        fixed labels of the series: calls with the same name and different labels add series,
+        the same name and labels replace it.
+        """
+        metric = re.sub(r"[^a-zA-Z0-9_:]", "_", f"{self.prefix}_{name}")
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            gauge = self._gauges.setdefault(metric, {"help": help, "series": {}})
+            gauge["help"] = help or gauge["help"]
+            gauge["series"][key] = (callback, label)
+        return self
+
+    def watch_manager(self, manager, name="default"):
+        """Publishes markers, resident bytes and (if deferred tagging is on) emotion queue depth of a manager."""
+        labels = {"manager": name}
+        self.add_gauge("markers", lambda: manager.studsar_network.get_total_markers(), "Markers stored in the memory.", labels)
+        self.add_gauge("memory_bytes", lambda: manager.memory_report()["total_bytes"],
+                       "Approximate resident bytes of the memory (see memory_report).", labels)
+        tagger = getattr(manager, "_emotion_tagger", None)
+        if tagger is not None:
+            self.add_gauge("emotion_queue_depth", tagger.pending, "Submissions waiting for background emotion tagging.", labels)
+        return self
+
+    def watch_namespaces(self, namespaced):
+        """Publishes per-namespace markers and bytes of a NamespacedStudSar (loaded namespaces only)."""
+        def markers():
+            with namespaced._lock:
+                return {ns: m.studsar_network.get_total_markers() for ns, m in namespaced._managers.items()}
+        self.add_gauge("namespace_markers", markers, "Markers per loaded namespace.", label="namespace")
+        self.add_gauge("namespace_memory_bytes", namespaced.memory_usage, "Approximate resident bytes per loaded namespace.",
+                       label="namespace")
+        self.add_gauge("loaded_namespaces", lambda: len(namespaced.loaded_namespaces()), "Namespaces resident in memory.")
+        return self
+
+    def watch_scheduler(self, scheduler, name="default"):
+        """Publishes the queue depth and served requests of a MicroBatchScheduler."""
+        labels = {"scheduler": name}
+        self.add_gauge("query_queue_depth", lambda: scheduler.metrics()["queue_depth"],
+                       "Queries waiting in the micro-batch scheduler.", labels)
+        self.add_gauge("query_requests_served", lambda: scheduler.metrics()["requests_served"],
+                       "Queries served by the micro-batch scheduler.", labels)
+        return self
+
+    def watch_ingest(self, ingest, name="default"):
+        """
+        Publishes the ingestion backlog of a RAGConnector (files of add_documents not yet
+        inserted, segments awaiting insert) or of a bare IngestPipeline (segments only).
+        """
+        labels = {"ingest": name}
+        pipeline = getattr(ingest, "pipeline", ingest)
+        self.add_gauge("ingest_segments_pending", lambda: pipeline.pending_segments,
+                       "Segments of the running ingestion not yet inserted.", labels)
+        if hasattr(ingest, "files_pending"):
+            self.add_gauge("ingest_files_pending", lambda: ingest.files_pending,
+                           "Files of the running add_documents call not yet inserted.", labels)
+        return self
+
+    #  exposition
+    def render(self):
+        """Returns histograms, counters and gauges in the Prometheus text exposition format."""
+        lines = [self.sink.render().rstrip("\n")] if isinstance(self.sink, PrometheusSink) else []
+        with self._lock:
+            gauges = [(metric, gauge["help"], list(gauge["series"].items())) for metric, gauge in self._gauges.items()]
+        for metric, help, series in gauges:
+            samples = []
+            for fixed, (callback, label) in series:
+                try:
+                    value = callback()
+                except Exception as e:
+                    logger.warning("Gauge %s failed: %s", metric, e)
+                    continue
+                values = sorted(value.items()) if label is not None else [(None, value)]
+                for label_value, number in values:
+                    pairs = list(fixed) + ([(label, label_value)] if label is not None else [])
+                    rendered = ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs)
+                    samples.append(f"{metric}{{{rendered}}} {float(number):g}" if rendered else f"{metric} {float(number):g}")
+            if help:
+                lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines += samples
+        return "\n".join(line for line in lines if line) + "\n"
+
+    #  lifecycle
+    def start(self):
+        """Attaches the sink and starts serving (idempotent). port=0 picks a free port."""
+        if self._server is not None:
+            return self
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("%s - %s", self.address_string(), format % args)
+
+        if self.sink not in metrics.sinks:
+            metrics.add_sink(self.sink)
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="studsar-metrics-exporter", daemon=True)
+        self._thread.start()
+        logger.info("Metrics exporter listening on %s", self.url)
+        return self
+
+    def stop(self):
+        """Stops serving and detaches the sink it created."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+        if self._own_sink:
+            metrics.remove_sink(self.sink)
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
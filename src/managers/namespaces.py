@@ -0,0 +1,183 @@
+"""
+Multi-tenant StudSar: many namespaced memories sharing one encoder.
+
+Every namespace (e.g. one per department) is a regular StudSarManager with its own
+StudSarNeural, but all of them use the same embedding backend instance, so the model
+is loaded once. Idle namespaces are saved to `storage_dir/<namespace>` (columnar
+format) and unloaded when more than `max_loaded` namespaces, or more than
+`max_memory_bytes` of embeddings, are resident; they are reloaded on next use.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import torch
+
+from src.managers.manager import StudSarManager
+from src.models.backends import EmbeddingBackend, SentenceTransformerBackend, create_embedding_backend
+from src.storage.columnar import is_columnar
+from src.utils.instrumentation import get_logger
+
+logger = get_logger("namespaces")
+
+_VALID_NAMESPACE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+
+def network_memory_bytes(network):
+    """Approximate resident size of a StudSarNeural: embedding buffers plus in-memory segment text."""
+    buffers = (network.memory_embeddings, getattr(network, "full_embeddings", None))
+    total = sum(buffer.numel() * buffer.element_size() for buffer in buffers if buffer is not None)
+    if isinstance(network.id_to_segment, dict): # Columnar loads keep segments memory-mapped on disk
+        total += sum(len(segment) for segment in network.id_to_segment.values())
+    return total
+
+
+class NamespacedStudSar:
+    """
+    Holds one StudSarManager per namespace around a single shared encoder, with
+    per-namespace save/load, memory accounting and LRU unloading of idle namespaces.
+    """
+    def __init__(self, storage_dir, model_name='all-MiniLM-L6-v2', max_loaded=8, max_memory_bytes=None,
+                 initial_capacity=256, embedding_backend="torch", backend_path=None, embedding_model=None):
+        self.storage_dir = storage_dir
+        os.makedirs(storage_dir, exist_ok=True)
+        self.model_name = model_name
+        self.max_loaded = max(1, int(max_loaded))
+        self.max_memory_bytes = max_memory_bytes
+        self.initial_capacity = initial_capacity
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        if isinstance(embedding_model, EmbeddingBackend):
+            self.encoder = embedding_model
+        elif embedding_model is not None:
+            self.encoder = SentenceTransformerBackend(model_name, self.device, model=embedding_model)
+        else:
+            self.encoder = create_embedding_backend(embedding_backend, model_name, self.device, backend_path)
+        self._managers = OrderedDict() # namespace -> StudSarManager, least recently used first
+        self._lock = threading.RLock()
+        logger.info("NamespacedStudSar ready: shared encoder '%s' (%s), storage '%s'.", model_name, self.encoder.name, storage_dir)
+
+    #  namespace table
+    def _path(self, namespace):
+        if not isinstance(namespace, str) or not _VALID_NAMESPACE.match(namespace):
+            raise ValueError(f"Invalid namespace '{namespace}': use letters, digits, '_', '.', '-'.")
+        return os.path.join(self.storage_dir, namespace)
+
+    def namespaces(self):
+        """All known namespaces: loaded ones plus those saved in storage_dir."""
+        with self._lock:
+            on_disk = {name for name in os.listdir(self.storage_dir) if is_columnar(os.path.join(self.storage_dir, name))}
+            return sorted(on_disk | set(self._managers))
+
+    def loaded_namespaces(self):
+        """Resident namespaces, least recently used first."""
+        with self._lock:
+            return list(self._managers)
+
+    def get(self, namespace, create=True):
+        """Returns the manager of namespace, loading it from disk or creating it as needed."""
+        path = self._path(namespace)
+        with self._lock:
+            manager = self._managers.get(namespace)
+            if manager is not None:
+                self._managers.move_to_end(namespace)
+                return manager
+            if is_columnar(path):
+                manager = StudSarManager.load(path, embedding_model=self.encoder)
+                if manager is None:
+                    raise RuntimeError(f"Could not load namespace '{namespace}' from '{path}'.")
+            elif create:
+                manager = StudSarManager(model_name=self.model_name, initial_capacity=self.initial_capacity,
+                                         embedding_model=self.encoder)
+            else:
+                raise KeyError(namespace)
+            self._managers[namespace] = manager
+            self._evict(keep=namespace)
+            return manager
+
+    def _evict(self, keep=None):
+        """Unloads least recently used namespaces beyond max_loaded / max_memory_bytes."""
+        while len(self._managers) > 1:
+            over_count = len(self._managers) > self.max_loaded
+            over_memory = self.max_memory_bytes is not None and self.memory_usage_total() > self.max_memory_bytes
+            if not (over_count or over_memory):
+                break
+            victim = next(iter(self._managers))
+            if victim == keep:
+                break
+            self.unload(victim)
+
+    def unload(self, namespace):
+        """Saves namespace to disk and releases its memory. Returns False if it was not loaded."""
+        with self._lock:
+            manager = self._managers.pop(namespace, None)
+            if manager is None:
+                return False
+            manager.save(self._path(namespace), format="columnar")
+            manager.close()
+            logger.info("Namespace '%s' unloaded to disk.", namespace)
+            return True
+
+    def save(self, namespace=None):
+        """Saves one namespace, or every loaded one when namespace is None."""
+        with self._lock:
+            targets = [namespace] if namespace is not None else list(self._managers)
+            return all(self.get(name).save(self._path(name), format="columnar") for name in targets)
+
+    def close(self):
+        """Saves and unloads every namespace."""
+        with self._lock:
+            for namespace in list(self._managers):
+                self.unload(namespace)
+
+    #  memory accounting
+    def memory_usage(self):
+        """Approximate resident bytes per loaded namespace."""
+        with self._lock:
+            return {name: network_memory_bytes(manager.studsar_network) for name, manager in self._managers.items()}
+
+    def memory_usage_total(self):
+        return sum(self.memory_usage().values())
+
+    #  data API
+    def add_segments(self, namespace, segments, emotion=None, batch_size=32):
+        """Bulk insert into namespace; returns the new marker IDs."""
+        return self.get(namespace).add_segments(segments, emotion=emotion, batch_size=batch_size)
+
+    def update_network(self, namespace, new_text_segment, emotion=None):
+        return self.get(namespace).update_network(new_text_segment, emotion=emotion)
+
+    def _encode(self, texts):
+        self.encoder.to(self.device)
+        embeddings = self.encoder.encode(list(texts), batch_size=32, convert_to_tensor=True, device=self.device,
+                                         show_progress_bar=False)
+        return embeddings.cpu().numpy()
+
+    def search(self, query_text, namespaces=None, k=1):
+        """Searches one query; see search_batch."""
+        return self.search_batch([query_text], namespaces, k)[0]
+
+    def search_batch(self, query_texts, namespaces=None, k=1):
+        """
+        Searches several queries across one namespace (str), several (list) or the loaded
+        namespaces (None): namespaces unloaded to disk are only searched when named, so a
+        query never cycles every namespace through memory. Queries are encoded once; each
+        namespace is scanned with one batched similarity pass and the hits are merged by similarity.
+        Returns one list of (namespace, marker_id, similarity, segment) per query, best first.
+        """
+        if namespaces is None:
+            namespaces = self.loaded_namespaces()
+        elif isinstance(namespaces, str):
+            namespaces = [namespaces]
+        results = [[] for _ in query_texts]
+        valid = [i for i, q in enumerate(query_texts) if q and isinstance(q, str)]
+        if not valid or not namespaces:
+            return results
+
+        query_embeddings = self._encode([query_texts[i] for i in valid])
+        for namespace in namespaces:
+            manager = self.get(namespace, create=False)
+            for i, (ids, similarities, segments) in zip(valid, manager.search_embeddings(query_embeddings, k=k)):
+                results[i].extend((namespace, mid, float(sim), seg) for mid, sim, seg in zip(ids, similarities, segments))
+        return [sorted(hits, key=lambda hit: hit[2], reverse=True)[:k] for hits in results]
@@ -0,0 +1,172 @@
+"""
+Dynamic micro-batching query scheduler for StudSarManager.
+
+Queries from many callers that arrive a few milliseconds apart are collected
+for up to `max_wait_ms` (or until `max_batch_size` is reached), encoded together
+and scanned with a single `search_batch` call. Each caller gets its own result
+through a concurrent.futures.Future.
+"""
+
+import queue
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import Future
+
+# Upper bounds (ms) of the wait-time histogram buckets; the last bucket is +Inf
+WAIT_TIME_BUCKETS_MS = (0.5, 1.0, 2.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0)
+
+_STOP = object()
+
+
+class _Request:
+    __slots__ = ("query_text", "k", "future", "enqueued_at")
+
+    def __init__(self, query_text, k):
+        self.query_text = query_text
+        self.k = k
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatchScheduler:
+    """
+    Collects search requests and serves them in micro-batches on a background thread.
+    `manager` only needs a `search_batch(query_texts, k)` method that takes one k per query
+    (as StudSarManager.search_batch does), so only the hits each caller receives are counted.
+    """
+    def __init__(self, manager, max_batch_size=32, max_wait_ms=5.0, max_queue_size=0):
+        if not hasattr(manager, "search_batch"):
+            raise ValueError("Manager is missing required attribute: search_batch")
+        self.manager = manager
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._metrics_lock = threading.Lock()
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self._batch_sizes = Counter()
+        self._wait_buckets = [0] * (len(WAIT_TIME_BUCKETS_MS) + 1)
+        self._wait_sum_ms = 0.0
+        self._requests_served = 0
+        self._requests_failed = 0
+        self._batches = 0
+        self._max_queue_depth = 0
+
+    #  lifecycle
+    def start(self):
+        """Starts the batching thread (idempotent)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="studsar-query-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stops the batching thread after the queued requests have been served."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    #  client API
+    def submit(self, query_text, k=1):
+        """Queues a query and returns a Future resolving to (marker_ids, similarities, segments)."""
+        if self._thread is None:
+            raise RuntimeError("MicroBatchScheduler is not running; call start() first.")
+        request = _Request(query_text, k)
+        self._queue.put(request)
+        depth = self._queue.qsize()
+        with self._metrics_lock:
+            self._max_queue_depth = max(self._max_queue_depth, depth)
+        return request.future
+
+    def search(self, query_text, k=1, timeout=None):
+        """Blocking search through the scheduler (raises TimeoutError on timeout)."""
+        future = self.submit(query_text, k)
+        try:
+            return future.result(timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+    #  batching loop
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP) # Serve this batch first, stop afterwards
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._collect_batch(first)
+            # Drop requests whose callers cancelled while queued
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        dispatched_at = time.perf_counter()
+        try:
+            results = self.manager.search_batch([r.query_text for r in batch], k=[r.k for r in batch])
+        except Exception as err:
+            for r in batch:
+                r.future.set_exception(err)
+            with self._metrics_lock:
+                self._requests_failed += len(batch)
+            return
+
+        for r, (ids, similarities, segments) in zip(batch, results):
+            r.future.set_result((ids[:r.k], similarities[:r.k], segments[:r.k]))
+
+        with self._metrics_lock:
+            self._batches += 1
+            self._batch_sizes[len(batch)] += 1
+            self._requests_served += len(batch)
+            for r in batch:
+                wait_ms = (dispatched_at - r.enqueued_at) * 1000.0
+                self._wait_sum_ms += wait_ms
+                self._wait_buckets[bisect_left(WAIT_TIME_BUCKETS_MS, wait_ms)] += 1
+
+    #  metrics
+    def metrics(self):
+        """Returns a snapshot of queue depth, batch size histogram and wait-time metrics."""
+        with self._metrics_lock:
+            served = self._requests_served
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": self._batches,
+                "requests_served": served,
+                "requests_failed": self._requests_failed,
+                "mean_batch_size": served / self._batches if self._batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "wait_time_ms_buckets": dict(zip([*WAIT_TIME_BUCKETS_MS, float("inf")], self._wait_buckets)),
+                "mean_wait_time_ms": self._wait_sum_ms / served if served else 0.0,
+            }
+
+    def reset_metrics(self):
+        """Clears all collected metrics."""
+        with self._metrics_lock:
+            self._reset_metrics()
@@ -0,0 +1,77 @@
+"""
+Buffered usage accounting off the query path.
+
+Searches only add their hit IDs to an in-memory Counter; a background thread hands the
+accumulated counts to a flush callback every flush_interval seconds (or as soon as
+max_pending distinct markers are waiting), which applies them in one bulk update.
+"""
+
+import threading
+from collections import Counter
+
+from src.utils.instrumentation import get_logger, metrics
+
+logger = get_logger("usage_buffer")
+
+
+class UsageBuffer:
+    """
+    Accumulates usage hits and flushes them periodically.
+    apply(marker_ids, counts) receives the pending hits (one count per distinct ID).
+    """
+    flush_metric = "usage_flushes"
+
+    def __init__(self, apply, flush_interval=1.0, max_pending=10_000, name="studsar-usage-buffer"):
+        self._apply = apply
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def add(self, marker_ids, amount=1):
+        """Adds amount per ID (repeats accumulate). Never blocks on the memory."""
+        with self._lock:
+            if amount == 1:
+                self._pending.update(marker_ids) # Counting in C
+            else:
+                for marker_id in marker_ids:
+                    self._pending[marker_id] += amount
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def pending(self):
+        """Distinct markers with hits not yet applied."""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Applies every pending hit now. Returns the number of distinct markers flushed."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+        # Outside the lock: counts are additive, so concurrent flushes may apply in any order
+        self._apply(list(pending), list(pending.values()))
+        metrics.count(self.flush_metric)
+        return len(pending)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Error while flushing usage counts: %s", e, exc_info=True)
+
+    def close(self):
+        """Stops the flush thread and applies the remaining hits."""
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
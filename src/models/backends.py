@@ -0,0 +1,239 @@
+"""
+Pluggable embedding backends for StudSarManager.
+
+Every backend exposes the subset of the SentenceTransformer interface that
+StudSar uses (encode, get_sentence_embedding_dimension, tokenizer,
+max_seq_length, to), so the manager treats them interchangeably:
+
+- "torch":      the SentenceTransformer itself, fp32 PyTorch (default)
+- "torch-int8": the same model with its Linear layers dynamically quantized to int8 (CPU)
+- "onnx":       an ONNX export run through ONNX Runtime, loaded from a local directory
+                (see export_onnx(); a quantized export is picked up automatically)
+
+Backends are cached in the process-wide model registry.
+"""
+
+import json
+import os
+
+import numpy as np
+import torch
+
+from ..utils.instrumentation import get_logger
+from .registry import registry
+
+logger = get_logger("backends")
+
+# Written by export_onnx() next to the exported model
+ONNX_MANIFEST = "studsar_backend.json"
+
+
+class EmbeddingBackend:
+    """Base class: a SentenceTransformer-compatible encoder plus identity information."""
+    name = "base"
+
+    def __init__(self, model_name, device="cpu"):
+        self.model_name = model_name
+        self.device = device
+        self.tokenizer = None
+        self.max_seq_length = None
+
+    @property
+    def identity(self):
+        """(backend name, model name) recorded with saved memories."""
+        return self.name, self.model_name
+
+    def get_sentence_embedding_dimension(self):
+        raise NotImplementedError
+
+    def encode(self, sentences, batch_size=32, convert_to_tensor=False, convert_to_numpy=True,
+               device=None, show_progress_bar=False, normalize_embeddings=False, **kwargs):
+        raise NotImplementedError
+
+    def to(self, device):
+        return self
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Default backend: the shared fp32 SentenceTransformer from the registry."""
+    name = "torch"
+
+    def __init__(self, model_name, device="cpu", model=None):
+        super().__init__(model_name, device)
+        self.model = model if model is not None else registry.get_embedding_model(model_name, device)
+        self.tokenizer = getattr(self.model, "tokenizer", None)
+        self.max_seq_length = getattr(self.model, "max_seq_length", None)
+
+    def get_sentence_embedding_dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, sentences, **kwargs):
+        return self.model.encode(sentences, **kwargs)
+
+    def to(self, device):
+        self.model.to(device)
+        return self
+
+
+class QuantizedTorchBackend(SentenceTransformerBackend):
+    """
+    SentenceTransformer with nn.Linear layers dynamically quantized to int8.
+    Runs on CPU only; model_name may be a hub name or a local path.
+    """
+    name = "torch-int8"
+
+    def __init__(self, model_name, device="cpu"):
+        from sentence_transformers import SentenceTransformer
+        logger.info("Quantizing '%s' to dynamic int8 (CPU)...", model_name)
+        fp32_model = SentenceTransformer(model_name, device="cpu")
+        quantized = torch.quantization.quantize_dynamic(fp32_model, {torch.nn.Linear}, dtype=torch.qint8)
+        super().__init__(model_name, "cpu", model=quantized)
+
+    def encode(self, sentences, **kwargs):
+        kwargs["device"] = "cpu"
+        return self.model.encode(sentences, **kwargs)
+
+    def to(self, device):
+        return self # Quantized kernels are CPU-only
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX Runtime backend loaded from a local directory produced by export_onnx()
+    (model.onnx or model_quantized.onnx + tokenizer files + studsar_backend.json).
+    Mean pooling and optional L2 normalisation reproduce the SentenceTransformer output.
+    """
+    name = "onnx"
+
+    def __init__(self, model_path, device="cpu", prefer_quantized=True):
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise RuntimeError("The ONNX backend requires 'onnxruntime' and 'transformers' (pip install onnxruntime).") from e
+
+        manifest_path = os.path.join(model_path, ONNX_MANIFEST)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        super().__init__(manifest.get("model_name", os.path.basename(os.path.normpath(model_path))), "cpu")
+        self.model_path = model_path
+
+        candidates = ["model_quantized.onnx", "model.onnx"] if prefer_quantized else ["model.onnx", "model_quantized.onnx"]
+        onnx_file = next((os.path.join(model_path, c) for c in candidates if os.path.exists(os.path.join(model_path, c))), None)
+        if onnx_file is None:
+            raise FileNotFoundError(f"No model.onnx / model_quantized.onnx found in '{model_path}'.")
+        self.quantized = onnx_file.endswith("_quantized.onnx")
+        if self.quantized:
+            self.name = "onnx-int8"
+
+        providers = ["CUDAExecutionProvider", "CPUExecutionProvider"] if str(device).startswith("cuda") else ["CPUExecutionProvider"]
+        available = set(ort.get_available_providers())
+        self.session = ort.InferenceSession(onnx_file, providers=[p for p in providers if p in available])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.max_seq_length = manifest.get("max_seq_length", 256)
+        self.normalize = manifest.get("normalize", True)
+        self.pooling = manifest.get("pooling", "mean")
+        self._dim = manifest.get("embedding_dim") or self.session.get_outputs()[0].shape[-1]
+        logger.info("ONNX backend loaded from '%s' (dim %s, quantized=%s).", onnx_file, self._dim, self.quantized)
+
+    def get_sentence_embedding_dimension(self):
+        return int(self._dim)
+
+    def _encode_batch(self, texts):
+        inputs = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors="np")
+        feed = {k: v.astype(np.int64) for k, v in inputs.items() if k in self.input_names}
+        hidden = self.session.run(None, feed)[0]
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences, batch_size=32, convert_to_tensor=False, convert_to_numpy=True,
+               device=None, show_progress_bar=False, normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if texts:
+            embeddings = np.concatenate([self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
+        else:
+            embeddings = np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        if normalize_embeddings and not self.normalize:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        if single:
+            embeddings = embeddings[0]
+        return torch.from_numpy(embeddings) if convert_to_tensor else embeddings
+
+
+BACKENDS = {
+    SentenceTransformerBackend.name: SentenceTransformerBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+# Names recorded in saved memories that map to the same loader
+BACKEND_ALIASES = {"onnx-int8": OnnxBackend.name}
+
+
+def create_embedding_backend(backend="torch", model_name='all-MiniLM-L6-v2', device="cpu", backend_path=None):
+    """
+    Returns the (registry-cached) embedding backend. backend is one of BACKENDS;
+    backend_path is the local model directory (required for "onnx", optional for "torch-int8").
+    """
+    backend = BACKEND_ALIASES.get(backend, backend)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'. Available: {sorted(BACKENDS)}")
+    if backend == SentenceTransformerBackend.name:
+        return SentenceTransformerBackend(model_name, device)
+    if backend == OnnxBackend.name:
+        if not backend_path:
+            raise ValueError("The 'onnx' backend needs backend_path (directory created by export_onnx()).")
+        return registry.get_or_load("embedding:onnx", backend_path, lambda path, dev: OnnxBackend(path, dev), device)
+    source = backend_path or model_name
+    return registry.get_or_load("embedding:torch-int8", source, lambda name, dev: QuantizedTorchBackend(name, dev), "cpu")
+
+
+def export_onnx(model_name, output_dir, quantize=True, opset=14):
+    """
+    Exports a SentenceTransformer's transformer to output_dir/model.onnx (plus tokenizer and
+    manifest) for the "onnx" backend. With quantize, also writes an int8 dynamically
+    quantized model_quantized.onnx. Requires onnx/onnxruntime. Returns output_dir.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    dummy = tokenizer(["StudSar export"], return_tensors="pt")
+    input_names = list(dummy.keys())
+    onnx_path = os.path.join(output_dir, "model.onnx")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(transformer, tuple(dummy[name] for name in input_names), onnx_path,
+                          input_names=input_names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic_axes, opset_version=opset)
+    tokenizer.save_pretrained(output_dir)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(onnx_path, os.path.join(output_dir, "model_quantized.onnx"), weight_type=QuantType.QInt8)
+
+    normalize = any(type(module).__name__ == "Normalize" for module in st_model)
+    pooling = "cls" if any(getattr(module, "pooling_mode_cls_token", False) for module in st_model) else "mean"
+    with open(os.path.join(output_dir, ONNX_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": model_name,
+            "embedding_dim": st_model.get_sentence_embedding_dimension(),
+            "max_seq_length": st_model.max_seq_length,
+            "normalize": normalize,
+            "pooling": pooling,
+        }, f, indent=2)
+    logger.info("ONNX export of '%s' written to '%s' (quantized=%s).", model_name, output_dir, quantize)
+    return output_dir
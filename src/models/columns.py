@@ -0,0 +1,116 @@
+"""
+Dense per-marker columns (usage counts, reputation scores) of StudSarNeural.
+
+Values live in one numpy array (.array) indexed by tensor row, so bulk updates are a single
+vectorized np.add.at instead of one dictionary update per marker. The column is also a
+MutableMapping keyed by marker ID, so code written against the former defaultdicts
+(id_to_usage[marker_id] += 1, dict(id_to_usage), .get(marker_id, 0), .values()) keeps working.
+"""
+
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+class MarkerColumn(MutableMapping):
+    """
+    Column of one value per row of network (rows follow network.marker_id_to_index).
+    Stored markers without a value read as the default; iteration yields the markers whose
+    value differs from the default. Unknown marker IDs raise KeyError.
+    """
+    def __init__(self, network, dtype, default=0):
+        self._network = network
+        self.default = default
+        self.array = np.full(0, default, dtype=dtype)
+
+    @classmethod
+    def from_mapping(cls, network, dtype, mapping, default=0):
+        """Column filled from a {marker_id: value} mapping (IDs not in the network are ignored)."""
+        column = cls(network, dtype, default)
+        index = network.marker_id_to_index
+        column.reserve(len(index))
+        for marker_id, value in (mapping or {}).items():
+            row = index.get(marker_id)
+            if row is not None:
+                column.reserve(row + 1)
+                column.array[row] = value
+        return column
+
+    @classmethod
+    def from_rows(cls, network, values, default=0):
+        """Column over an array that already holds one value per tensor row."""
+        column = cls(network, values.dtype, default)
+        column.array = values
+        return column
+
+    def to_rows(self, rows):
+        """Values of the first rows rows as an array (default where never set)."""
+        result = np.full(rows, self.default, dtype=self.array.dtype)
+        stored = min(rows, len(self.array))
+        result[:stored] = self.array[:stored]
+        return result
+
+    def reserve(self, rows):
+        """Grows the array (doubling) so it holds at least rows rows."""
+        if rows > len(self.array):
+            grown = np.full(max(rows, 2 * len(self.array)), self.default, dtype=self.array.dtype)
+            grown[:len(self.array)] = self.array
+            self.array = grown
+
+    def truncate(self, rows):
+        """Drops capacity beyond rows rows. Returns the bytes freed."""
+        if len(self.array) <= rows:
+            return 0
+        freed = (len(self.array) - rows) * self.array.itemsize
+        self.array = self.array[:rows].copy()
+        return freed
+
+    def add_at(self, rows, amounts):
+        """array[rows] += amounts, accumulating repeated rows."""
+        if len(rows):
+            self.reserve(int(rows.max()) + 1)
+            np.add.at(self.array, rows, amounts)
+
+    def move(self, source_row, target_row):
+        """Copies the value of source_row to target_row and resets source_row."""
+        if source_row < len(self.array):
+            self.reserve(target_row + 1)
+            self.array[target_row] = self.array[source_row]
+            self.array[source_row] = self.default
+        elif target_row < len(self.array):
+            self.array[target_row] = self.default
+
+    def clear(self, row):
+        if row < len(self.array):
+            self.array[row] = self.default
+
+    def _row(self, marker_id):
+        row = self._network.marker_id_to_index.get(marker_id)
+        if row is None:
+            raise KeyError(marker_id)
+        return row
+
+    def __getitem__(self, marker_id):
+        row = self._row(marker_id)
+        return self.array[row].item() if row < len(self.array) else self.default
+
+    def __setitem__(self, marker_id, value):
+        row = self._row(marker_id)
+        self.reserve(row + 1)
+        self.array[row] = value
+
+    def __delitem__(self, marker_id):
+        self.clear(self._row(marker_id))
+
+    def __iter__(self):
+        values = self.array
+        for marker_id, row in list(self._network.marker_id_to_index.items()):
+            if row < len(values) and values[row] != self.default:
+                yield marker_id
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def resident_bytes(self):
+        """Bytes of the value array."""
+        return self.array.nbytes
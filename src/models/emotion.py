@@ -0,0 +1,166 @@
+"""
+Emotion tagging for StudSar markers.
+
+EmotionTagger wraps the sentiment pipeline with three cost savers:
+- batching: segments go through the pipeline batch_size at a time instead of one call each
+- caching: tags are cached by a hash of the (truncated) text, so repeated segments are free
+- deferral: submit() returns immediately and a background thread tags the segments,
+  handing the results to a callback (markers carry the PENDING_EMOTION tag meanwhile)
+"""
+
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
+
+from ..utils.instrumentation import get_logger, metrics
+
+logger = get_logger("emotion")
+
+# Tag stored on markers whose emotion is still being computed in the background
+PENDING_EMOTION = "pending"
+
+# Sentiment model labels -> StudSar emotion tags
+DEFAULT_LABEL_MAP = {"Positive": "pleasant", "Neutral": "neutral", "Negative": "unpleasant"}
+
+_STOP = object()
+
+
+class EmotionTagger:
+    """
+    Batched, cached and optionally deferred emotion tagging.
+    pipeline is a transformers sentiment-analysis pipeline (or any callable with the same
+    interface: a list of texts in, a list of {"label": ...} dicts out).
+    """
+    def __init__(self, pipeline, batch_size=32, cache_size=10_000, max_chars=512, label_map=None):
+        self.pipeline = pipeline
+        self.batch_size = max(1, int(batch_size))
+        self.cache_size = cache_size
+        self.max_chars = max_chars
+        self.label_map = label_map or DEFAULT_LABEL_MAP
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _key(self, text):
+        return hashlib.blake2b(text[:self.max_chars].encode("utf-8"), digest_size=16).digest()
+
+    def _cached(self, key):
+        with self._cache_lock:
+            tag = self._cache.get(key)
+            if tag is not None:
+                self._cache.move_to_end(key)
+            return tag
+
+    def _remember(self, key, tag):
+        with self._cache_lock:
+            self._cache[key] = tag
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _to_tag(self, output):
+        if isinstance(output, list): # Some pipeline versions wrap each result in a list
+            output = output[0]
+        return self.label_map.get(output["label"], "neutral")
+
+    #  synchronous API
+    def tag_batch(self, texts):
+        """Returns one emotion tag per text, running only uncached texts through the pipeline."""
+        keys = [self._key(t) for t in texts]
+        tags = [self._cached(k) for k in keys]
+        # Unique uncached texts, in first-seen order
+        missing = {}
+        for i, (key, tag) in enumerate(zip(keys, tags)):
+            if tag is None:
+                missing.setdefault(key, i)
+        self.cache_hits += len(texts) - len(missing)
+        self.cache_misses += len(missing)
+        metrics.count("emotion_cache_hits", len(texts) - len(missing))
+        metrics.count("emotion_cache_misses", len(missing))
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            outputs = self.pipeline([texts[i][:self.max_chars] for _, i in chunk],
+                                    batch_size=len(chunk), truncation=True, max_length=512)
+            for (key, _), output in zip(chunk, outputs):
+                self._remember(key, self._to_tag(output))
+
+        return [tag if tag is not None else self._cached(key) for key, tag in zip(keys, tags)]
+
+    def tag(self, text):
+        """Returns the emotion tag of a single text."""
+        return self.tag_batch([text])[0]
+
+    #  deferred API
+    def submit(self, marker_ids, texts, callback):
+        """
+        Queues texts for background tagging; callback(marker_ids, tags) is called from the
+        worker thread once they are tagged. Returns immediately.
+        """
+        if not texts:
+            return
+        self._start()
+        self._queue.put((list(marker_ids), list(texts), callback))
+
+    def _start(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="studsar-emotion-tagger", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            # Coalesce small submissions (e.g. single update_network calls) into one batch
+            items = [item]
+            stop = False
+            while sum(len(i[1]) for i in items) < self.batch_size:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is _STOP:
+                    stop = True
+                    break
+                items.append(extra)
+            try:
+                with metrics.timer("emotion"):
+                    tags = self.tag_batch([text for _, texts, _ in items for text in texts])
+                offset = 0
+                for marker_ids, texts, callback in items:
+                    callback(marker_ids, tags[offset:offset + len(texts)])
+                    offset += len(texts)
+            except Exception as e:
+                logger.error("Error during background emotion tagging: %s", e, exc_info=True)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                return
+
+    def pending(self):
+        """Number of submissions not yet tagged."""
+        return self._queue.unfinished_tasks
+
+    def wait(self, timeout=None):
+        """Blocks until every submitted text is tagged. Returns False on timeout."""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def close(self, timeout=None):
+        """Tags the remaining submissions and stops the worker thread."""
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
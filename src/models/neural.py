@@ -1,22 +1,37 @@
+import sys
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
-from collections import defaultdict # Import defaultdict
+
+from .columns import MarkerColumn
+from .projection import make_projection, projection_from_state
+from ..storage.embedding_storage import create_storage, storage_for_encoding
+from ..utils.instrumentation import get_logger, metrics
+
+logger = get_logger("neural")
 
 class StudSarNeural(nn.Module):
     """
     Core neural network for StudSar associative memory.
     Stores text segments and their embeddings (markers), enabling similarity search.
+    storage selects how embedding rows are held: "memory" (float32 tensor, default),
+    "mmap" (memory-mapped files), "int8" (quantized) or an EmbeddingStorage instance
+    (see src.storage.embedding_storage).
     """
-    def __init__(self, embedding_dim, initial_capacity=1024, device=None):
+    def __init__(self, embedding_dim, initial_capacity=1024, device=None, storage=None):
         super().__init__()
         self.embedding_dim = embedding_dim
         self.device = device if device else torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"StudSarNeural initialized on device: {self.device}")
+        self.storage = create_storage(storage)
 
         # Use register_buffer for tensors that are part of the state but not model parameters
-        self.register_buffer('memory_embeddings', torch.zeros(initial_capacity, self.embedding_dim, device=self.device))
+        self.register_buffer('memory_embeddings', self.storage.allocate('memory_embeddings', initial_capacity, self.embedding_dim, self.device))
+        # Reduced-dimension mode (see set_projection): memory_embeddings then holds projected
+        # markers and full_embeddings optionally keeps the originals for re-ranking
+        self.projection = None
+        self.rerank_factor = 0
+        self.register_buffer('full_embeddings', None)
 
         # Mappings stored as regular attributes (dictionaries are not parameters/buffers)
         self.id_to_segment = {}
@@ -25,55 +40,228 @@ class StudSarNeural(nn.Module):
 
         # --- NEW2 ---
         self.id_to_emotion = {} # Stores emotion tag per marker ID
-        self.id_to_reputation = defaultdict(float) # Stores reputation score per marker ID, default 0.0
-        self.id_to_usage = defaultdict(int) # Stores usage count per marker ID, default 0
+        # Reputation score and usage count per marker ID: dense columns by tensor row (see src.models.columns)
+        self._reputation = MarkerColumn(self, np.float64, 0.0)
+        self._usage = MarkerColumn(self, np.int64, 0)
         # --- AN2 ---
 
-        print(f"Embedding dimension: {self.embedding_dim}")
-        print(f"Initial capacity: {initial_capacity} markers")
+        logger.debug("StudSarNeural initialized on %s (dim %d, capacity %d markers, %s storage)",
+                     self.device, self.embedding_dim, initial_capacity, self.storage.name)
+
+    def to_state(self):
+        """
+        Save-format dictionary of the network (tensors, mappings as plain dicts, projection and
+        the row encoding under 'storage'); both managers add their embedding-model metadata.
+        """
+        state = {
+            'network_state_dict': self.state_dict(),
+            'id_to_segment': dict(self.id_to_segment), # Plain dicts (a columnar load uses lazy maps)
+            'marker_id_to_index': dict(self.marker_id_to_index),
+            'next_id': self.next_id,
+            'embedding_dim': self.embedding_dim,
+            'storage': self.storage.encoding,
+            # Reduced-dimension mode (None when the memory stores full embeddings)
+            'projection': self.projection.state() if self.projection is not None else None,
+            'rerank_factor': self.rerank_factor,
+            'id_to_emotion': dict(self.id_to_emotion),
+            'id_to_reputation': dict(self.id_to_reputation), # Non-default entries as a plain dict
+            'id_to_usage': dict(self.id_to_usage),
+        }
+        return state
+
+    @classmethod
+    def from_state(cls, embedding_dim, state, device=None, storage=None):
+        """
+        Builds a network from a saved state dictionary in one pass: the saved tensors and
+        mappings are adopted directly instead of being copied into freshly allocated buffers.
+        Reads every .pth layout: to_state() output, files written by the manager before it,
+        and the src/studsar.py layout (no marker_id_to_index, emotions inside
+        id_to_segment_metadata). storage defaults to the encoding recorded in the file;
+        a different one converts the rows.
+        """
+        saved_storage = storage_for_encoding(state.get('storage', 'float32'))
+        storage = create_storage(storage) if storage is not None else saved_storage
+        network = cls(embedding_dim, initial_capacity=0, device=device, storage=storage)
+        tensors = state.get('network_state_dict', {})
+        projection = projection_from_state(state.get('projection'))
+        if projection is not None:
+            network.projection = projection.to(network.device)
+            network.rerank_factor = state.get('rerank_factor', 0)
+            full = tensors.get('full_embeddings')
+            network.register_buffer('full_embeddings', network._adopt_rows('full_embeddings', full, saved_storage)
+                                    if full is not None else None)
+        if 'memory_embeddings' in tensors:
+            network.register_buffer('memory_embeddings',
+                                    network._adopt_rows('memory_embeddings', tensors['memory_embeddings'], saved_storage))
+        network.id_to_segment = state.get('id_to_segment', {})
+        network.next_id = state.get('next_id', 0)
+        # src/studsar.py files: marker IDs are row numbers and emotions live in the segment metadata
+        network.marker_id_to_index = state.get('marker_id_to_index', {m: m for m in range(network.next_id)})
+        network.id_to_emotion = state.get('id_to_emotion', {m: meta['emotion'] for m, meta in state.get('id_to_segment_metadata', {}).items()
+                                                             if isinstance(meta, dict) and meta.get('emotion')})
+        network.id_to_reputation = state.get('id_to_reputation', {})
+        network.id_to_usage = state.get('id_to_usage', {})
+        return network
+
+    def _adopt_rows(self, name, rows, saved_storage):
+        """Buffer for rows saved with saved_storage's encoding, converted if this network encodes differently."""
+        if saved_storage.encoding == self.storage.encoding:
+            if self.storage.encoding == 'float32':
+                rows = rows.float()
+            return self.storage.adopt(name, rows.to(self.device), self.device)
+        return self.storage.adopt(name, self.storage.encode(saved_storage.decode(rows.to(self.device))), self.device)
+
+    @property
+    def id_to_reputation(self):
+        """Reputation score per marker ID (default 0.0)."""
+        return self._reputation
+
+    @id_to_reputation.setter
+    def id_to_reputation(self, mapping):
+        self._reputation = mapping if isinstance(mapping, MarkerColumn) else MarkerColumn.from_mapping(self, np.float64, mapping, 0.0)
+
+    @property
+    def id_to_usage(self):
+        """Usage count per marker ID (default 0)."""
+        return self._usage
+
+    @id_to_usage.setter
+    def id_to_usage(self, mapping):
+        self._usage = mapping if isinstance(mapping, MarkerColumn) else MarkerColumn.from_mapping(self, np.int64, mapping, 0)
+
+    @property
+    def search_dim(self):
+        """Dimension of the vectors actually scanned by search (reduced when a projection is set)."""
+        return self.projection.dim if self.projection is not None else self.embedding_dim
 
     def _ensure_capacity(self, required_index):
         """Dynamically increases memory capacity if needed."""
         current_capacity = self.memory_embeddings.shape[0]
         if required_index >= current_capacity:
             new_capacity = max(current_capacity * 2, required_index + 1)
-            print(f"    Resizing memory_embeddings from {current_capacity} to {new_capacity}")
-            new_embeddings = torch.zeros(new_capacity, self.embedding_dim, device=self.device)
-            new_embeddings[:current_capacity] = self.memory_embeddings
-            self.register_buffer('memory_embeddings', new_embeddings) # Register new buffer
+            logger.debug("Resizing memory_embeddings from %d to %d", current_capacity, new_capacity)
+            metrics.count("resizes")
+            for name in ('memory_embeddings', 'full_embeddings'):
+                old = getattr(self, name)
+                if old is None:
+                    continue
+                self.register_buffer(name, self.storage.resize(name, old, new_capacity, self.device)) # Register new buffer
+
+    def _store_embedding(self, tensor_index, embedding):
+        """Writes a full-dimension embedding at tensor_index, projecting it in reduced mode."""
+        if self.projection is None:
+            self.memory_embeddings[tensor_index] = self.storage.encode(embedding)
+            return
+        self.memory_embeddings[tensor_index] = self.storage.encode(self.projection(embedding.unsqueeze(0))[0])
+        if self.full_embeddings is not None:
+            self.full_embeddings[tensor_index] = self.storage.encode(embedding)
+
+    def _full_embeddings(self):
+        """Full-dimension embeddings if available (None when a projection discarded them)."""
+        if self.projection is None:
+            return self.memory_embeddings
+        return self.full_embeddings
+
+    def set_projection(self, projection, keep_full=True, rerank_factor=4):
+        """
+        Switches to reduced-dimension mode: stored markers are projected with projection and
+        every later insert and query goes through the same projection.
+        keep_full keeps the full-dimension embeddings so search can re-rank the top
+        k * rerank_factor low-dimension candidates at full dimension (0 disables re-ranking);
+        without it only the reduced vectors are kept, which also shrinks memory.
+        """
+        source = self._full_embeddings()
+        if source is None:
+            logger.error("Full-dimension embeddings were discarded; the memory cannot be re-projected.")
+            return False
+        if projection.input_dim != self.embedding_dim:
+            logger.error("Projection expects dimension %d, network uses %d.", projection.input_dim, self.embedding_dim)
+            return False
+        projection.to(self.device)
+        num_markers = self.get_total_markers()
+        reduced = self.storage.allocate('memory_embeddings', source.shape[0], projection.dim, self.device)
+        if num_markers:
+            reduced[:num_markers] = self.storage.encode(projection(self.storage.decode(source[:num_markers])))
+        if not keep_full:
+            self.storage.release(source)
+        self.register_buffer('full_embeddings', source if keep_full else None)
+        self.register_buffer('memory_embeddings', reduced)
+        self.projection = projection
+        self.rerank_factor = rerank_factor if keep_full else 0
+        logger.info("Memory projected to %d dimensions (%s); full embeddings kept: %s, re-rank factor: %d.",
+                    projection.dim, projection.method, keep_full, self.rerank_factor)
+        return True
+
+    def reduce_dimensions(self, dim, method="pca", keep_full=True, rerank_factor=4):
+        """
+        Fits (PCA) or creates (Matryoshka truncation) a projection to dim dimensions
+        and applies it with set_projection. Returns the projection, or None on failure.
+        """
+        source = self._full_embeddings()
+        if source is None:
+            logger.error("Full-dimension embeddings were discarded; the memory cannot be re-projected.")
+            return None
+        try:
+            projection = make_projection(method, self.storage.decode(source[:self.get_total_markers()]), self.embedding_dim, dim)
+        except ValueError as e:
+            logger.error("%s", e)
+            return None
+        return projection if self.set_projection(projection, keep_full, rerank_factor) else None
+
+    def _top_k(self, query_embeddings, k):
+        """
+        Top-k (similarities, indices) for a (q, embedding_dim) batch of full-dimension queries:
+        cosine similarity in the search space, then optional full-dimension re-ranking.
+        """
+        num_markers = self.get_total_markers()
+        with metrics.timer("similarity"):
+            queries = query_embeddings if self.projection is None else self.projection(query_embeddings)
+            active_embeddings = self.storage.decode(self.memory_embeddings[:num_markers])
+            # Cosine similarity for the whole batch as a single matrix product
+            similarities = F.normalize(queries, dim=1) @ F.normalize(active_embeddings, dim=1).T
+        k = min(k, num_markers)
+        if self.projection is None or not self.rerank_factor or self.full_embeddings is None:
+            with metrics.timer("topk"):
+                return torch.topk(similarities, k, dim=1)
+
+        num_candidates = min(num_markers, k * self.rerank_factor)
+        with metrics.timer("topk"):
+            _, candidates = torch.topk(similarities, num_candidates, dim=1) # (q, c)
+            candidate_embeddings = F.normalize(self.storage.decode(self.full_embeddings[candidates]), dim=2) # (q, c, embedding_dim)
+            full_similarities = torch.bmm(candidate_embeddings, F.normalize(query_embeddings, dim=1).unsqueeze(2)).squeeze(2)
+            top_k_similarities, order = torch.topk(full_similarities, k, dim=1)
+            return top_k_similarities, torch.gather(candidates, 1, order)
 
     # V2: Added emotion parameter 
     def add_marker(self, segment_text, embedding, emotion=None):
         """Adds a new marker (segment + embedding) to the memory."""
         if not segment_text or embedding is None:
-            print("Error: Cannot add marker with empty segment or None embedding.")
+            logger.error("Cannot add marker with empty segment or None embedding.")
             return None
 
         if isinstance(embedding, np.ndarray):
             embedding = torch.from_numpy(embedding).to(self.device)
         elif not isinstance(embedding, torch.Tensor):
-             print(f"Error: Embedding must be a numpy array or torch tensor, got {type(embedding)}")
+             logger.error("Embedding must be a numpy array or torch tensor, got %s", type(embedding))
              return None
 
         embedding = embedding.to(self.device) # Ensure embedding is on the correct device
 
         if embedding.shape[0] != self.embedding_dim:
-             print(f"Error: Embedding dimension mismatch. Expected {self.embedding_dim}, got {embedding.shape[0]}")
+             logger.error("Embedding dimension mismatch. Expected %d, got %d", self.embedding_dim, embedding.shape[0])
              return None
 
         marker_id = self.next_id
         tensor_index = len(self.marker_id_to_index) # Next available index
         self._ensure_capacity(tensor_index) # Check capacity before adding
-        self.memory_embeddings[tensor_index] = embedding.float() # Store as float
+        self._store_embedding(tensor_index, embedding.float()) # Store as float
         self.id_to_segment[marker_id] = segment_text
         self.marker_id_to_index[marker_id] = tensor_index
 
         #  NEW ADDITIONS V2  
         if emotion:
             self.id_to_emotion[marker_id] = emotion
-        # Reputation and Usage will use defaultdict defaults (0.0 and 0)
-        # self.id_to_reputation[marker_id] = 0.0 # Explicitly set if not using defaultdict
-        # self.id_to_usage[marker_id] = 0 # Explicitly set if not using defaultdict
+        # Reputation and Usage read as the column defaults (0.0 and 0) until updated
         # e.END OF ADDITIONS V2  
 
         self.next_id += 1
@@ -93,15 +281,21 @@ class StudSarNeural(nn.Module):
         if isinstance(query_embedding, np.ndarray):
             query_embedding = torch.from_numpy(query_embedding).to(self.device)
         elif not isinstance(query_embedding, torch.Tensor):
-             print(f"Error: Query embedding must be a numpy array or torch tensor, got {type(query_embedding)}")
+             logger.error("Query embedding must be a numpy array or torch tensor, got %s", type(query_embedding))
              return [], [], []
 
         query_embedding = query_embedding.to(self.device).float() # Ensure float and device
 
+        if self.projection is not None:
+            # Reduced-dimension mode: project the query (and re-rank at full dimension)
+            top_k_similarities, top_k_indices_tensor = self._top_k(query_embedding.unsqueeze(0), k)
+            return self._to_results(top_k_indices_tensor[0].cpu().numpy(), top_k_similarities[0].cpu().numpy())
+
         # Calculate cosine similarity
         # Use only the populated part of the memory_embeddings tensor
-        active_embeddings = self.memory_embeddings[:num_markers]
-        similarities = F.cosine_similarity(query_embedding.unsqueeze(0), active_embeddings)
+        with metrics.timer("similarity"):
+            active_embeddings = self.storage.decode(self.memory_embeddings[:num_markers])
+            similarities = F.cosine_similarity(query_embedding.unsqueeze(0), active_embeddings)
 
         #  MODIFICATION V2: Consider reputation (optional, for now only usage tracking) 
         # Future: Modify similarities based on self.id_to_reputation for corresponding markers
@@ -110,19 +304,87 @@ class StudSarNeural(nn.Module):
 
         # Get top k results
         k = min(k, num_markers) # Adjust k if fewer markers than requested
-        top_k_similarities, top_k_indices_tensor = torch.topk(similarities, k)
+        with metrics.timer("topk"):
+            top_k_similarities, top_k_indices_tensor = torch.topk(similarities, k)
+
+            # Convert tensor indices back to marker IDs and get segments
+            top_k_indices = top_k_indices_tensor.cpu().numpy()
+            top_k_similarities = top_k_similarities.cpu().numpy()
+        return self._to_results(top_k_indices, top_k_similarities)
+
+    def search_similar_markers_batch(self, query_embeddings, k=1):
+        """
+        Finds the top k most similar markers for several queries in one pass.
+        Returns a list with one (ids, similarities, segments) tuple per query.
+        """
+        if isinstance(query_embeddings, np.ndarray):
+            query_embeddings = torch.from_numpy(query_embeddings)
+        elif not isinstance(query_embeddings, torch.Tensor):
+             logger.error("Query embeddings must be a numpy array or torch tensor, got %s", type(query_embeddings))
+             return []
+        if query_embeddings.dim() == 1:
+            query_embeddings = query_embeddings.unsqueeze(0)
 
-        # Convert tensor indices back to marker IDs and get segments
-        top_k_indices = top_k_indices_tensor.cpu().numpy()
+        num_queries = query_embeddings.shape[0]
+        num_markers = self.get_total_markers()
+        if num_markers == 0 or num_queries == 0:
+            return [([], [], []) for _ in range(num_queries)]
+
+        query_embeddings = query_embeddings.to(self.device).float()
+        top_k_similarities, top_k_indices = self._top_k(query_embeddings, k)
         top_k_similarities = top_k_similarities.cpu().numpy()
+        top_k_indices = top_k_indices.cpu().numpy()
 
-        # Need to map tensor indices back to marker IDs
-        index_to_marker_id = {v: k for k, v in self.marker_id_to_index.items()}
-        result_ids = [index_to_marker_id[idx] for idx in top_k_indices if idx in index_to_marker_id]
+        with metrics.timer("id_mapping"):
+            index_to_marker_id = {v: k for k, v in self.marker_id_to_index.items()}
+            return [self._map_indices(row_indices, row_similarities, index_to_marker_id)
+                    for row_indices, row_similarities in zip(top_k_indices, top_k_similarities)]
+
+    def _to_results(self, indices, similarities, index_to_marker_id=None):
+        """Maps tensor indices to (marker_ids, similarities, segments)."""
+        with metrics.timer("id_mapping"):
+            if index_to_marker_id is None:
+                index_to_marker_id = {v: k for k, v in self.marker_id_to_index.items()}
+            return self._map_indices(indices, similarities, index_to_marker_id)
+
+    def _map_indices(self, indices, similarities, index_to_marker_id):
+        result_ids = [index_to_marker_id[idx] for idx in indices if idx in index_to_marker_id]
+        result_similarities = [sim for idx, sim in zip(indices, similarities) if idx in index_to_marker_id]
         result_segments = [self.id_to_segment[m_id] for m_id in result_ids]
-        result_similarities = [sim for idx, sim in zip(top_k_indices, top_k_similarities) if idx in index_to_marker_id]
         return result_ids, result_similarities, result_segments
 
+    def _rows_of(self, marker_ids):
+        """(rows, known): tensor rows of the stored markers among marker_ids and a mask of which IDs were stored."""
+        index = self.marker_id_to_index
+        rows = np.fromiter((index.get(m, -1) for m in marker_ids), dtype=np.int64, count=len(marker_ids))
+        known = rows >= 0
+        return rows[known], known
+
+    def increment_usage_many(self, marker_ids, counts=1):
+        """
+        Adds counts (a scalar, or one count per ID) to the usage of marker_ids in one
+        vectorized update; repeated IDs accumulate and unknown IDs are skipped.
+        Returns the number of IDs applied.
+        """
+        marker_ids = list(marker_ids)
+        rows, known = self._rows_of(marker_ids)
+        counts = np.broadcast_to(np.asarray(counts, dtype=np.int64), known.shape)[known]
+        self._usage.add_at(rows, counts)
+        return len(rows)
+
+    def update_reputation_many(self, marker_ids, deltas):
+        """
+        Adds deltas (a scalar, or one delta per ID) to the reputation of marker_ids in one
+        vectorized update; repeated IDs accumulate and unknown IDs are skipped.
+        Returns the number of IDs applied.
+        """
+        marker_ids = list(marker_ids)
+        rows, known = self._rows_of(marker_ids)
+        deltas = np.broadcast_to(np.asarray(deltas, dtype=np.float64), known.shape)[known]
+        self._reputation.add_at(rows, deltas)
+        logger.debug("Updated reputation of %d markers.", len(rows))
+        return len(rows)
+
     #  NEW ADDITION V2: Increase usage count
     def increment_usage(self, marker_id):
         """Increments the usage count for a given marker ID."""
@@ -140,10 +402,10 @@ class StudSarNeural(nn.Module):
         """Updates the reputation score for a given marker ID."""
         if marker_id in self.marker_id_to_index:
             self.id_to_reputation[marker_id] += feedback_score
-            print(f"  Updated reputation for marker ID {marker_id}. New score: {self.id_to_reputation[marker_id]:.2f}")
+            logger.debug("Updated reputation for marker ID %s. New score: %.2f", marker_id, self.id_to_reputation[marker_id])
             return True
         else:
-            print(f"  Error: Marker ID {marker_id} not found for reputation update.")
+            logger.error("Marker ID %s not found for reputation update.", marker_id)
             return False
     #  END OF MODIFICATION V2 
 
@@ -153,11 +415,14 @@ class StudSarNeural(nn.Module):
          if marker_id in self.marker_id_to_index:
               tensor_index = self.marker_id_to_index[marker_id]
               # Return embedding as numpy array for easier handling outside torch environment
-              embedding = self.memory_embeddings[tensor_index].detach().cpu().numpy()
+              # Full-dimension embedding when available (reduced vector if it was discarded)
+              stored = self._full_embeddings()
+              stored = stored if stored is not None else self.memory_embeddings
+              embedding = self.storage.decode(stored[tensor_index]).detach().cpu().numpy()
               segment = self.id_to_segment.get(marker_id, "Segment not found")
               emotion = self.id_to_emotion.get(marker_id) # Can be None
-              reputation = self.id_to_reputation[marker_id] # Uses defaultdict
-              usage = self.id_to_usage[marker_id] # Uses defaultdict
+              reputation = self.id_to_reputation[marker_id] # Column default 0.0
+              usage = self.id_to_usage[marker_id] # Column default 0
               return {
                   "embedding": embedding,
                   "segment": segment,
@@ -177,7 +442,9 @@ class StudSarNeural(nn.Module):
         if num_markers == 0:
             return {}, None
 
-        active_embeddings = self.memory_embeddings[:num_markers].cpu() # Get active embeddings on CPU
+        stored = self._full_embeddings()
+        stored = stored if stored is not None else self.memory_embeddings
+        active_embeddings = self.storage.decode(stored[:num_markers]).cpu() # Get active embeddings on CPU
         index_to_marker_id = {v: k for k, v in self.marker_id_to_index.items()}
         # Create a dictionary mapping marker_id to its embedding tensor
         id_to_embedding = {index_to_marker_id[i]: active_embeddings[i] for i in range(num_markers) if i in index_to_marker_id}
@@ -191,23 +458,114 @@ class StudSarNeural(nn.Module):
             if isinstance(new_embedding, np.ndarray):
                 new_embedding = torch.from_numpy(new_embedding).to(self.device)
             elif not isinstance(new_embedding, torch.Tensor):
-                 print(f"Error: New embedding must be a numpy array or torch tensor.")
+                 logger.error("New embedding must be a numpy array or torch tensor.")
                  return False
             new_embedding = new_embedding.to(self.device).float()
             if new_embedding.shape[0] != self.embedding_dim:
-                 print(f"Error: New embedding dimension mismatch.")
+                 logger.error("New embedding dimension mismatch.")
                  return False
             tensor_index = self.marker_id_to_index[marker_id]
-            self.memory_embeddings[tensor_index] = new_embedding
-            print(f"  Updated embedding for marker ID {marker_id}.")
+            self._store_embedding(tensor_index, new_embedding)
+            logger.debug("Updated embedding for marker ID %s.", marker_id)
             # Reset usage/reputation? Or keep? Current: Keep.
             # self.id_to_usage[marker_id] = 0 # Optional: Reset usage after update
             return True
         else:
-            print(f"  Error: Marker ID {marker_id} not found for embedding update.")
+            logger.error("Marker ID %s not found for embedding update.", marker_id)
             return False
     #  END OF ADDITION V2
 
+    #  memory accounting
+    @staticmethod
+    def _mapping_bytes(mapping):
+        """Approximate bytes of a marker-keyed mapping: table plus keys and values."""
+        if hasattr(mapping, "resident_bytes"): # ColumnMap: values stay in the mapped column files
+            return mapping.resident_bytes()
+        return sys.getsizeof(mapping) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in mapping.items())
+
+    def memory_report(self):
+        """
+        Per-component byte breakdown of the memory. Buffer components are split into the
+        rows in use and the over-allocated capacity ("*_slack", see _ensure_capacity);
+        dictionaries are counted with sys.getsizeof (table, keys and values).
+        Returns {"markers", "capacity", "components": {name: bytes}, "slack_bytes", "total_bytes"}.
+        """
+        num_markers = self.get_total_markers()
+        components = {}
+        for name in ('memory_embeddings', 'full_embeddings'):
+            buffer = getattr(self, name)
+            if buffer is None:
+                continue
+            row_bytes = buffer.shape[1] * buffer.element_size()
+            components[name] = num_markers * row_bytes
+            components[f"{name}_slack"] = (buffer.shape[0] - num_markers) * row_bytes
+        if self.projection is not None:
+            components["projection"] = sum(t.numel() * t.element_size() for t in vars(self.projection).values()
+                                           if isinstance(t, torch.Tensor))
+        components["segments"] = self._mapping_bytes(self.id_to_segment)
+        components["emotions"] = self._mapping_bytes(self.id_to_emotion)
+        components["reputation"] = self._mapping_bytes(self.id_to_reputation)
+        components["usage"] = self._mapping_bytes(self.id_to_usage)
+        components["index"] = self._mapping_bytes(self.marker_id_to_index)
+        slack = sum(size for name, size in components.items() if name.endswith("_slack"))
+        return {
+            "markers": num_markers,
+            "capacity": self.memory_embeddings.shape[0],
+            "storage": self.storage.name,
+            "components": components,
+            "slack_bytes": slack,
+            "total_bytes": sum(components.values()),
+        }
+
+    def shrink_to_fit(self, reserve=0):
+        """
+        Releases unused buffer capacity, keeping room for reserve more markers.
+        Returns the number of bytes freed.
+        """
+        target = self.get_total_markers() + max(0, int(reserve))
+        freed = 0
+        for name in ('memory_embeddings', 'full_embeddings'):
+            buffer = getattr(self, name)
+            if buffer is None or buffer.shape[0] <= target:
+                continue
+            freed += (buffer.shape[0] - target) * buffer.shape[1] * buffer.element_size()
+            self.register_buffer(name, self.storage.resize(name, buffer, target, self.device)) # Copy drops the old buffer
+        for column in (self._usage, self._reputation):
+            freed += column.truncate(target)
+        if freed:
+            logger.debug("Capacity shrunk to %d markers (%d bytes freed)", target, freed)
+        return freed
+
+    def remove_markers(self, marker_ids):
+        """
+        Deletes markers and all their attributes. Rows stay contiguous: the last row is
+        moved into each freed slot. Returns the number of markers removed.
+        """
+        index_to_marker_id = {v: k for k, v in self.marker_id_to_index.items()}
+        removed = 0
+        for marker_id in marker_ids:
+            tensor_index = self.marker_id_to_index.pop(marker_id, None)
+            if tensor_index is None:
+                continue
+            last_index = len(self.marker_id_to_index) # Index of the last row before removal
+            if tensor_index != last_index:
+                moved_id = index_to_marker_id[last_index]
+                for buffer in (self.memory_embeddings, self.full_embeddings):
+                    if buffer is not None:
+                        buffer[tensor_index] = buffer[last_index]
+                for column in (self._usage, self._reputation):
+                    column.move(last_index, tensor_index)
+                self.marker_id_to_index[moved_id] = tensor_index
+                index_to_marker_id[tensor_index] = moved_id
+            else:
+                for column in (self._usage, self._reputation):
+                    column.clear(last_index)
+            index_to_marker_id.pop(last_index, None)
+            for mapping in (self.id_to_segment, self.id_to_emotion):
+                mapping.pop(marker_id, None)
+            removed += 1
+        return removed
+
     def forward(self, x):
         # This network doesn't have a traditional forward pass for training like classification models.
         # Its primary operations are add_marker and search_similar_markers.
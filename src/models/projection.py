@@ -0,0 +1,106 @@
+"""
+Dimension-reduction projections for StudSarNeural's reduced-dimension memory mode.
+
+A projection maps full encoder embeddings (e.g. 384-d) to a smaller search space.
+The same projection is applied to inserted markers and to queries, and its state
+is saved with the memory so a reloaded network projects exactly as before.
+
+- "pca":      fitted on the stored markers (mean-centred, top principal components)
+- "truncate": Matryoshka-style prefix truncation, for encoders trained so that the
+              first dimensions carry most of the signal; needs no fitting
+"""
+
+import torch
+
+
+class Projection:
+    """Base class: maps (..., input_dim) tensors to (..., dim)."""
+    method = "base"
+
+    def __init__(self, input_dim, dim):
+        if not 0 < dim <= input_dim:
+            raise ValueError(f"Reduced dimension must be in [1, {input_dim}], got {dim}.")
+        self.input_dim = input_dim
+        self.dim = dim
+
+    def __call__(self, embeddings):
+        return self.transform(embeddings)
+
+    def transform(self, embeddings):
+        raise NotImplementedError
+
+    def to(self, device):
+        return self
+
+    def state(self):
+        """Serializable state (tensors and plain values only)."""
+        return {"method": self.method, "input_dim": self.input_dim, "dim": self.dim}
+
+
+class TruncationProjection(Projection):
+    """Keeps the first dim components (Matryoshka prefix)."""
+    method = "truncate"
+
+    def transform(self, embeddings):
+        return embeddings[..., :self.dim]
+
+
+class PCAProjection(Projection):
+    """Mean-centred projection onto the top principal components of the stored markers."""
+    method = "pca"
+
+    def __init__(self, mean, components):
+        super().__init__(components.shape[1], components.shape[0])
+        self.mean = mean.float()
+        self.components = components.float() # (dim, input_dim)
+
+    @classmethod
+    def fit(cls, embeddings, dim):
+        """Fits the projection on an (n, input_dim) tensor of embeddings."""
+        embeddings = embeddings.detach().float().cpu()
+        if embeddings.shape[0] < 2:
+            raise ValueError("PCA needs at least 2 stored markers to fit.")
+        if not 0 < dim <= embeddings.shape[1]:
+            raise ValueError(f"Reduced dimension must be in [1, {embeddings.shape[1]}], got {dim}.")
+        mean = embeddings.mean(dim=0)
+        centered = embeddings - mean
+        # Eigen-decomposition of the (input_dim x input_dim) covariance: O(n * d^2), independent of n in memory
+        eigenvalues, eigenvectors = torch.linalg.eigh(centered.T @ centered)
+        order = torch.argsort(eigenvalues, descending=True)[:dim]
+        projection = cls(mean, eigenvectors[:, order].T.contiguous())
+        total = eigenvalues.clamp(min=0).sum()
+        projection.explained_variance_ratio = float(eigenvalues[order].clamp(min=0).sum() / total) if total > 0 else 1.0
+        return projection
+
+    def transform(self, embeddings):
+        return (embeddings - self.mean.to(embeddings.device)) @ self.components.to(embeddings.device).T
+
+    def to(self, device):
+        self.mean = self.mean.to(device)
+        self.components = self.components.to(device)
+        return self
+
+    def state(self):
+        state = super().state()
+        state.update({"mean": self.mean.cpu(), "components": self.components.cpu()})
+        return state
+
+
+def projection_from_state(state):
+    """Rebuilds a projection saved with Projection.state() (None stays None)."""
+    if not state:
+        return None
+    if state["method"] == TruncationProjection.method:
+        return TruncationProjection(state["input_dim"], state["dim"])
+    if state["method"] == PCAProjection.method:
+        return PCAProjection(state["mean"], state["components"])
+    raise ValueError(f"Unknown projection method '{state['method']}'.")
+
+
+def make_projection(method, embeddings, input_dim, dim):
+    """Creates a projection: "pca" is fitted on embeddings, "truncate" needs none."""
+    if method == TruncationProjection.method:
+        return TruncationProjection(input_dim, dim)
+    if method == PCAProjection.method:
+        return PCAProjection.fit(embeddings, dim)
+    raise ValueError(f"Unknown reduction method '{method}'. Use 'pca' or 'truncate'.")
@@ -0,0 +1,117 @@
+"""
+Process-wide model registry for StudSar.
+
+Loading a SentenceTransformer (or the sentiment pipeline) is expensive, so every
+StudSarManager, RAGConnector and StudSAREngine in the same process shares a
+single instance per (kind, model name, device). The registry has no dependency
+on any UI framework and is safe to use from worker threads.
+"""
+
+import threading
+
+from ..utils.instrumentation import get_logger, metrics
+
+logger = get_logger("registry")
+
+
+def default_device():
+    """Returns the preferred device name ("cuda" when available, else "cpu")."""
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+def _load_sentence_transformer(model_name, device):
+    from sentence_transformers import SentenceTransformer
+    logger.info("Loading embedding model '%s' on device: %s", model_name, device)
+    return SentenceTransformer(model_name, device=device)
+
+
+def _load_sentiment_pipeline(model_name, device):
+    from transformers import pipeline
+    logger.info("Loading sentiment pipeline '%s' on device: %s", model_name, device)
+    return pipeline(
+        task="sentiment-analysis",
+        model=model_name,
+        device=0 if str(device).startswith("cuda") else -1,
+    )
+
+
+class ModelRegistry:
+    """
+    Thread-safe cache holding one loaded model per (kind, model name, device).
+    Concurrent requests for the same key wait for a single load; different keys
+    load independently.
+    """
+    def __init__(self):
+        self._models = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(kind, model_name, device):
+        return (kind, model_name, str(device if device is not None else default_device()))
+
+    def get_or_load(self, kind, model_name, loader, device=None):
+        """Returns the cached model for the key, calling loader(model_name, device) once if missing."""
+        key = self._key(kind, model_name, device)
+        model = self._models.get(key)
+        if model is not None:
+            metrics.count("model_cache_hits")
+            return model
+        metrics.count("model_cache_misses")
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                model = loader(model_name, key[2])
+                with self._lock:
+                    self._models[key] = model
+        return model
+
+    def get_embedding_model(self, model_name='all-MiniLM-L6-v2', device=None):
+        """Returns the shared SentenceTransformer for model_name on device."""
+        return self.get_or_load("embedding", model_name, _load_sentence_transformer, device)
+
+    def get_sentiment_pipeline(self, model_name="cardiffnlp/twitter-roberta-base-sentiment-latest", device=None):
+        """Returns the shared sentiment-analysis pipeline for model_name on device."""
+        return self.get_or_load("sentiment", model_name, _load_sentiment_pipeline, device)
+
+    def register(self, kind, model_name, model, device=None):
+        """Registers an already-loaded model so later lookups reuse it."""
+        with self._lock:
+            self._models[self._key(kind, model_name, device)] = model
+        return model
+
+    def unload(self, kind, model_name, device=None):
+        """Drops a model from the registry. Returns True if it was present."""
+        with self._lock:
+            return self._models.pop(self._key(kind, model_name, device), None) is not None
+
+    def clear(self):
+        """Drops every cached model (mainly for tests)."""
+        with self._lock:
+            self._models.clear()
+            self._key_locks.clear()
+
+    def loaded_models(self):
+        """Returns the list of (kind, model name, device) keys currently loaded."""
+        with self._lock:
+            return list(self._models.keys())
+
+
+# Default registry shared by the whole process
+registry = ModelRegistry()
+
+
+def get_embedding_model(model_name='all-MiniLM-L6-v2', device=None):
+    """Shortcut for registry.get_embedding_model()."""
+    return registry.get_embedding_model(model_name, device)
+
+
+def get_sentiment_pipeline(model_name="cardiffnlp/twitter-roberta-base-sentiment-latest", device=None):
+    """Shortcut for registry.get_sentiment_pipeline()."""
+    return registry.get_sentiment_pipeline(model_name, device)
@@ -2,6 +2,7 @@
 RAG (Retrieval Augmented Generation) module for StudSar.
 Provides functionality to integrate external data sources.
 """
+from .ingest import IngestPipeline, content_hash
 from .rag_connector import RAGConnector
 
-__all__ = ['RAGConnector'] 
\ No newline at end of file
+__all__ = ['RAGConnector', 'IngestPipeline', 'content_hash']
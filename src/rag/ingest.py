@@ -0,0 +1,334 @@
+"""
+Staged bulk ingestion of document splits into a StudSar memory.
+
+    splits -> segment (batched) -> dedupe -> encode (batched) -> bulk insert -> source ranges
+
+Every stage works on batches whose sizes are configurable (stage_sizes) and reports its
+throughput. Inserted markers are described by (start_id, stop_id, split_index) ranges:
+a bulk insert assigns consecutive marker IDs, so a source of thousands of segments is
+recorded in a handful of ranges, and per-marker tags and metadata are derived from them
+instead of being stored per marker.
+
+Many files are ingested in parallel with prepare_files(): worker processes load, split,
+segment (and optionally encode) one file each, while the calling process stays the single
+writer that bulk-inserts the prepared files into the memory as they complete.
+
+This module has no LangChain dependency: splits are plain texts with metadata dicts.
+"""
+
+import hashlib
+import multiprocessing
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ..utils.instrumentation import get_logger
+from ..utils.text import segment_texts
+
+logger = get_logger("rag.ingest")
+
+# segment: splits per segmentation call, encode: segments per forward pass,
+# insert: segments encoded and inserted per bulk step (bounds the embeddings held in memory)
+DEFAULT_STAGE_SIZES = {"segment": 256, "encode": 64, "insert": 2048}
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def content_hash(text):
+    """Hash of a segment's text with whitespace and case normalised (dedupe key)."""
+    return hashlib.sha1(_WHITESPACE.sub(" ", text).strip().lower().encode("utf-8")).hexdigest()
+
+
+def to_ranges(marker_ids, split_indices):
+    """Compresses marker IDs (with the split each came from) into [start, stop, split_index] ranges."""
+    ranges = []
+    for marker_id, split_index in zip(marker_ids, split_indices):
+        if marker_id is None:
+            continue
+        if ranges and ranges[-1][1] == marker_id and ranges[-1][2] == split_index:
+            ranges[-1][1] = marker_id + 1
+        else:
+            ranges.append([marker_id, marker_id + 1, split_index])
+    return ranges
+
+
+def load_text(path):
+    """LangChain-free loader: (doc_type, splits) with one (text, metadata) split per paragraph."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        paragraphs = [p.strip() for p in _PARAGRAPH_BREAK.split(f.read()) if p.strip()]
+    return "txt", [(paragraph, {"source": path}) for paragraph in paragraphs]
+
+
+def prepare_file(path, load_fn=load_text, segment_fn=segment_texts, encoder=None, encode_batch_size=64):
+    """
+    Worker stage for one file: load and split (load_fn(path) -> (doc_type, [(text, metadata)])),
+    segment with segment_fn (None leaves segmentation to the writer), and with encoder, the
+    (backend, model_name, backend_path) of the memory's embedding backend, encode the segments
+    with that same backend. Everything passed in and returned is picklable, so this runs in
+    worker processes; the result feeds IngestPipeline.run.
+    """
+    start = time.perf_counter()
+    doc_type, splits = load_fn(path)
+    texts = [text for text, _ in splits]
+    segments = embeddings = identity = None
+    if segment_fn is not None:
+        segments, split_indices = [], []
+        for i, pieces in enumerate(segment_fn(texts) if texts else []):
+            for piece in pieces:
+                piece = piece.strip()
+                if piece:
+                    segments.append(piece)
+                    split_indices.append(i)
+        if encoder and segments:
+            from ..models.backends import create_embedding_backend
+            backend_name, model_name, backend_path = encoder
+            backend = create_embedding_backend(backend_name, model_name, "cpu", backend_path)
+            embeddings = backend.encode(segments, batch_size=encode_batch_size, convert_to_numpy=True, show_progress_bar=False)
+            identity = backend.identity
+        segments = (segments, split_indices)
+    return {
+        "path": path,
+        "type": doc_type,
+        "texts": texts,
+        "split_metadata": [dict(metadata) for _, metadata in splits],
+        "segments": segments,
+        "embeddings": embeddings,
+        "encoder": identity,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def prepare_files(paths, prepare=prepare_file, workers=None):
+    """
+    Yields (path, prepared, error) for every path, in completion order; a failing file yields
+    its exception and never affects the others. With workers > 1, prepare runs in that many
+    spawned processes (prepare must be picklable, e.g. a functools.partial of prepare_file),
+    with at most 2 * workers files in flight so prepared files never pile up ahead of the
+    writer. Otherwise files are prepared one by one in this process.
+    """
+    paths = list(paths)
+    if not workers or workers <= 1:
+        for path in paths:
+            try:
+                yield path, prepare(path), None
+            except Exception as err:
+                yield path, None, err
+        return
+
+    pending = iter(paths)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        in_flight = {}
+        def _submit():
+            for path in pending:
+                in_flight[pool.submit(prepare, path)] = path
+                if len(in_flight) >= 2 * workers:
+                    break
+        _submit()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = in_flight.pop(future)
+                error = future.exception()
+                yield path, None if error else future.result(), error
+            _submit()
+
+
+class _StageClock:
+    """Accumulates seconds and item counts per stage."""
+    def __init__(self):
+        self.stats = {}
+
+    def add(self, stage, seconds, items):
+        entry = self.stats.setdefault(stage, {"seconds": 0.0, "items": 0})
+        entry["seconds"] += seconds
+        entry["items"] += items
+
+    def report(self):
+        for entry in self.stats.values():
+            entry["seconds"] = round(entry["seconds"], 6)
+            entry["items_per_second"] = round(entry["items"] / entry["seconds"], 1) if entry["seconds"] else None
+        return self.stats
+
+
+class IngestPipeline:
+    """
+    Runs the ingestion stages against manager (a StudSarManager, or any object with
+    update_network; generate_embeddings + add_segments enable the bulk path).
+    segment_fn(texts) returns the segment list of every text (one batched call per
+    stage_sizes["segment"] texts). With dedupe, segments whose normalised text was already
+    ingested in the same run (or is in known_hashes) are skipped.
+    pending_segments is the ingest backlog: segments of the current run not yet inserted.
+    """
+    def __init__(self, manager, segment_fn, stage_sizes=None, dedupe=True):
+        self.manager = manager
+        self.segment_fn = segment_fn
+        self.stage_sizes = {**DEFAULT_STAGE_SIZES, **(stage_sizes or {})}
+        self.dedupe = dedupe
+        self.pending_segments = 0
+
+    def segment(self, texts, clock=None):
+        """(segments, split_indices) of texts, in order, without empty segments."""
+        segments, split_indices = [], []
+        start = time.perf_counter()
+        for offset in range(0, len(texts), max(1, int(self.stage_sizes["segment"]))):
+            chunk = texts[offset:offset + self.stage_sizes["segment"]]
+            for i, pieces in enumerate(self.segment_fn(chunk)):
+                for piece in pieces:
+                    piece = piece.strip()
+                    if piece:
+                        segments.append(piece)
+                        split_indices.append(offset + i)
+        if clock is not None:
+            clock.add("segment", time.perf_counter() - start, len(texts))
+        return segments, split_indices
+
+    def _insert(self, segments, embeddings, emotion, clock, marker_ids=None):
+        """
+        Encodes (unless embeddings are given) and inserts segments in insert-sized batches.
+        Returns the new marker IDs, collected in marker_ids as they are inserted.
+        """
+        marker_ids = [] if marker_ids is None else marker_ids
+        bulk = hasattr(self.manager, "add_segments") and hasattr(self.manager, "generate_embeddings")
+        insert_size = max(1, int(self.stage_sizes["insert"]))
+        try:
+            for offset in range(0, len(segments), insert_size):
+                batch = segments[offset:offset + insert_size]
+                self.pending_segments = len(segments) - offset
+                if bulk:
+                    if embeddings is not None:
+                        batch_embeddings = embeddings[offset:offset + len(batch)]
+                    else:
+                        start = time.perf_counter()
+                        batch_embeddings = self.manager.generate_embeddings(batch, batch_size=self.stage_sizes["encode"],
+                                                                            bucket_by_length=True)
+                        clock.add("encode", time.perf_counter() - start, len(batch))
+                    start = time.perf_counter()
+                    marker_ids += self.manager.add_segments(batch, emotion=emotion, embeddings=batch_embeddings)
+                    clock.add("insert", time.perf_counter() - start, len(batch))
+                else:
+                    # Managers without the bulk API: one encode + insert per segment
+                    start = time.perf_counter()
+                    for segment in batch:
+                        try:
+                            marker_ids.append(self.manager.update_network(segment, emotion=emotion))
+                        except Exception as err:
+                            logger.error("Memorise error: %s", err, exc_info=True)
+                            marker_ids.append(None)
+                    clock.add("insert", time.perf_counter() - start, len(batch))
+        finally:
+            self.pending_segments = 0
+        return marker_ids
+
+    def _insert_or_roll_back(self, segments, embeddings, emotion, clock):
+        """_insert that removes the markers it already inserted when a batch fails, then re-raises."""
+        marker_ids = []
+        try:
+            return self._insert(segments, embeddings, emotion, clock, marker_ids)
+        except Exception:
+            added = [marker_id for marker_id in marker_ids if marker_id is not None]
+            if added:
+                self.manager.remove_markers(added)
+            raise
+
+    def run(self, texts, emotion=None, known_hashes=None, segments=None, embeddings=None):
+        """
+        Ingests texts (the splits of one source). segments may carry an already computed
+        (segments, split_indices) pair and embeddings their rows, e.g. from prepare_file, to
+        skip segmentation and encoding.
+        If an insert fails, the markers already inserted are removed before the error is raised.
+        Returns {"marker_ids", "split_indices", "ranges", "hashes", "segments", "duplicates", "stats"};
+        split_indices and hashes describe the inserted segments, in marker order.
+        """
+        clock = _StageClock()
+        segments, split_indices = segments if segments is not None else self.segment(texts, clock)
+
+        start = time.perf_counter()
+        hashes = [content_hash(segment) for segment in segments]
+        duplicates = 0
+        if self.dedupe:
+            seen = set(known_hashes or ())
+            keep = []
+            for i, digest in enumerate(hashes):
+                if digest not in seen:
+                    seen.add(digest)
+                    keep.append(i)
+            duplicates = len(segments) - len(keep)
+            if embeddings is not None:
+                embeddings = embeddings[keep]
+            segments = [segments[i] for i in keep]
+            split_indices = [split_indices[i] for i in keep]
+            hashes = [hashes[i] for i in keep]
+        clock.add("dedupe", time.perf_counter() - start, len(segments) + duplicates)
+
+        marker_ids = self._insert_or_roll_back(segments, embeddings, emotion, clock)
+        inserted = [(m, i, h) for m, i, h in zip(marker_ids, split_indices, hashes) if m is not None]
+        return {
+            "marker_ids": [m for m, _, _ in inserted],
+            "split_indices": [i for _, i, _ in inserted],
+            "ranges": to_ranges(marker_ids, split_indices),
+            "hashes": [h for _, _, h in inserted],
+            "segments": len(inserted),
+            "duplicates": duplicates,
+            "stats": clock.report(),
+        }
+
+    def refresh(self, texts, previous, emotion=None):
+        """
+        Re-ingests a changed source. previous maps the content hash of the source's markers to
+        their marker IDs (a list: without dedupe a chunk may occur several times). Every new
+        occurrence of a known hash keeps one of its markers, with its ID, usage and reputation;
+        only the remaining segments are encoded and inserted, and markers left over are removed.
+        New markers are inserted before any marker is removed, and removed again if the insert
+        fails, so an error leaves the memory as it was.
+        Returns {"marker_ids", "split_indices", "hashes" (of the inserted segments), "segments",
+        "duplicates", "kept", "removed", "ranges" (all the source's markers), "chunks"
+        ({hash: [marker_id, ...]} afterwards), "stats"}.
+        """
+        clock = _StageClock()
+        segments, split_indices = self.segment(texts, clock)
+
+        start = time.perf_counter()
+        available = {digest: list(ids) for digest, ids in previous.items()}
+        seen, kept, chunks = set(), [], {}
+        fresh, fresh_indices, fresh_hashes = [], [], []
+        duplicates = 0
+        for segment, split_index in zip(segments, split_indices):
+            digest = content_hash(segment)
+            if self.dedupe and digest in seen:
+                duplicates += 1
+            elif available.get(digest):
+                marker_id = available[digest].pop(0)
+                kept.append((marker_id, split_index))
+                chunks.setdefault(digest, []).append(marker_id)
+            else:
+                fresh.append(segment)
+                fresh_indices.append(split_index)
+                fresh_hashes.append(digest)
+            seen.add(digest)
+        clock.add("dedupe", time.perf_counter() - start, len(segments))
+
+        inserted = self._insert_or_roll_back(fresh, None, emotion, clock) # On failure the source keeps its previous markers
+        new = [(m, i, h) for m, i, h in zip(inserted, fresh_indices, fresh_hashes) if m is not None]
+        for marker_id, _, digest in new:
+            chunks.setdefault(digest, []).append(marker_id)
+
+        start = time.perf_counter()
+        removed = [marker_id for ids in available.values() for marker_id in ids]
+        if removed:
+            self.manager.remove_markers(removed)
+        clock.add("delete", time.perf_counter() - start, len(removed))
+
+        pairs = sorted(kept + [(m, i) for m, i, _ in new])
+        return {
+            "marker_ids": [m for m, _, _ in new],
+            "split_indices": [i for _, i, _ in new],
+            "hashes": [h for _, _, h in new],
+            "segments": len(new),
+            "duplicates": duplicates,
+            "kept": len(kept),
+            "removed": len(removed),
+            "ranges": to_ranges([m for m, _ in pairs], [i for _, i in pairs]),
+            "chunks": chunks,
+            "stats": clock.report(),
+        }
@@ -4,19 +4,18 @@
 # web pages and even DB rows, then memorise every meaningful
 # segment inside the same neural memory used for day-to-day queries.
 from __future__ import annotations
+import bisect
+import functools
+import glob
 import importlib.util
 import logging
 import os
 from typing import Any, Dict, List, Optional
 
-#  logging 
-logger = logging.getLogger("studsar.rag")
-if not logger.handlers:
-    _h = logging.StreamHandler()
-    _h.setFormatter(
-        logging.Formatter("%(asctime)s — %(name)s — %(levelname)s — %(message)s")
-    )
-    logger.addHandler(_h)
+from ..utils.instrumentation import get_logger
+
+#  logging (shares the "studsar" handler, see src.utils.instrumentation)
+logger = get_logger("rag")
 logger.setLevel(logging.INFO)
 
 #  dependency verification 
@@ -58,7 +57,6 @@ if DEPS_OK:
             WebBaseLoader,
         )
         from langchain.text_splitter import RecursiveCharacterTextSplitter
-        from sentence_transformers import SentenceTransformer
 
         try:
             from langchain_core.documents import Document
@@ -69,6 +67,35 @@ if DEPS_OK:
         logger.error("Dependency import failed after check: %s", e)
         DEPS_OK = False
 
+from ..models.registry import registry
+from ..utils.text import segment_texts
+from .ingest import IngestPipeline, prepare_file, prepare_files
+
+DOCUMENT_TYPES = {".pdf": "pdf", ".txt": "txt", ".csv": "csv"}
+
+
+def _document_loader(file_path: str):
+    """(loader, doc_type) for a PDF / TXT / CSV file. Raises ValueError for other extensions."""
+    doc_type = DOCUMENT_TYPES.get(os.path.splitext(file_path)[1].lower())
+    if doc_type == "pdf":
+        return PyPDFLoader(file_path), doc_type
+    if doc_type == "txt":
+        return TextLoader(file_path, autodetect_encoding=True), doc_type
+    if doc_type == "csv":
+        return CSVLoader(file_path, autodetect_encoding=True), doc_type
+    raise ValueError(f"Unsupported file type: {os.path.splitext(file_path)[1].lower()}")
+
+
+def load_document_splits(file_path: str, chunk_size: int = 1000, chunk_overlap: int = 200):
+    """
+    Worker-side loader for add_documents: (doc_type, [(text, metadata)]) of a file, split like
+    RAGConnector.text_splitter. Module-level so worker processes can unpickle it.
+    """
+    loader, doc_type = _document_loader(file_path)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                                              separators=["\n\n", "\n", ". ", " ", ""], length_function=len)
+    return doc_type, [(split.page_content, split.metadata) for split in splitter.split_documents(loader.load())]
+
 # StudSar_V3  forward declaration ...import 
 try:
     from ..managers.manager import StudSarManager as Manager
@@ -90,7 +117,7 @@ class RAGConnector:
     without using an external vector DB. Everything lives inside
     the same neural network.
     """
-    def __init__(self, studsar_manager: Manager, embedding_model_name: str = "all-MiniLM-L6-v2") -> None:
+    def __init__(self, studsar_manager: Manager, embedding_model_name: str = "all-MiniLM-L6-v2", stage_sizes: Optional[Dict[str, int]] = None) -> None:
         if not DEPS_OK:
             raise RuntimeError("RAGConnector initialised without its optional dependencies.")
 
@@ -107,17 +134,26 @@ class RAGConnector:
             self.embedding_model = self.text_processor.embedding_model
             logger.info("Embedding model reused from StudSar text_processor.")
         else:
-            self.embedding_model = SentenceTransformer(embedding_model_name)
-            logger.info("Embedding model %s loaded locally.", embedding_model_name)
+            self.embedding_model = registry.get_embedding_model(embedding_model_name)
+            logger.info("Embedding model %s taken from the shared model registry.", embedding_model_name)
 
+        self.chunk_size, self.chunk_overlap = 1000, 200
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
             separators=["\n\n", "\n", ". ", " ", ""],
             length_function=len,
         )
 
         self.external_sources: Dict[str, Dict[str, Any]] = {}
+        # Staged ingestion (segment → dedupe → encode → insert); see src.rag.ingest for stage_sizes
+        self.pipeline = IngestPipeline(self.manager, self._segment_texts, stage_sizes=stage_sizes)
+        self.last_ingest_stats: Optional[Dict[str, Any]] = None
+        # source_id → {"ranges": [[start_id, stop_id, split_index], ...], "base_meta", "split_metadata"}
+        self.source_markers: Dict[str, Dict[str, Any]] = {}
+        self._range_index: Optional[List[tuple]] = None
+        # Ingest backlog of add_documents (files not yet inserted), published by MetricsExporter.watch_ingest
+        self.files_pending = 0
         logger.info("RAGConnector ready – unified memory online.")
 
     #  internal helpers 
@@ -129,38 +165,113 @@ class RAGConnector:
             logger.error("Load/split error: %s", err, exc_info=True)
             return []
 
-    def _memorize_splits(self, splits: List[Document], source_id: str, base_meta: Dict[str, Any]) -> int:
-        count = 0
-        for idx, split in enumerate(splits):
+    def _segment_texts(self, contents: List[str]) -> List[List[str]]:
+        """I segment a batch of split texts in one call when the text processor supports it."""
+        if hasattr(self.text_processor, "segment_texts"):
+            try:
+                return self.text_processor.segment_texts(contents)
+            except Exception as err:
+                logger.error("Batch segmentation error: %s – falling back to per-split segmentation.", err, exc_info=True)
+
+        all_pieces = []
+        for content in contents:
             try:
                 # Use StudSar's text processor for segmentation
-                pieces = self.text_processor.segment_text(split.page_content)
+                all_pieces.append(self.text_processor.segment_text(content))
             except Exception as err:
                 logger.error("Segmentation error: %s", err, exc_info=True)
-                pieces = [split.page_content]
+                all_pieces.append([content])
+        return all_pieces
 
-            for seg in pieces:
-                seg = seg.strip()
-                if not seg:
-                    continue
-
-                tags = [
-                    f"external_source_id:{source_id}",
-                    f"source_type:{base_meta.get('type', 'unknown')}",
-                ]
+    def _memorize_splits(self, splits: List[Document], source_id: str, base_meta: Dict[str, Any]) -> int:
+        return self._memorize(source_id, base_meta, [split.page_content for split in splits],
+                              [dict(split.metadata) for split in splits])
+
+    def _memorize(self, source_id: str, base_meta: Dict[str, Any], texts: List[str], split_metadata: List[Dict[str, Any]],
+                  prepared: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Runs the ingestion pipeline for one source (prepared: a prepare_file result from a worker).
+        On failure the pipeline removes whatever it inserted, so the source memorises nothing.
+        """
+        emotion = base_meta.get("emotion", "neutral")
+        try:
+            if prepared is None:
+                result = self.pipeline.run(texts, emotion=emotion)
+            else:
+                result = self.pipeline.run(texts, emotion=emotion, segments=prepared["segments"], embeddings=prepared["embeddings"])
+                result["stats"]["prepare"] = {"seconds": round(prepared["seconds"], 6), "items": len(texts),
+                                              "items_per_second": round(len(texts) / prepared["seconds"], 1) if prepared["seconds"] else None}
+        except Exception as err:
+            logger.error("Memorise error (%s): %s", source_id, err, exc_info=True)
+            return 0
+
+        result["chunks"] = {}
+        for digest, marker_id in zip(result["hashes"], result["marker_ids"]):
+            result["chunks"].setdefault(digest, []).append(marker_id)
+        self._record_source(source_id, base_meta, split_metadata, result)
+        return result["segments"]
+
+    def _record_source(self, source_id: str, base_meta: Dict[str, Any], split_metadata: List[Dict[str, Any]],
+                       result: Dict[str, Any]) -> None:
+        """Stores a pipeline result as the source's marker ranges, chunk hashes and ingest stats."""
+        # Tags and metadata are not stored per marker: they derive from the source's marker ranges.
+        # chunks ({content hash: [marker_id, ...]}) lets update_external_source re-ingest only what changed.
+        self.source_markers[source_id] = {
+            "ranges": result["ranges"],
+            "base_meta": dict(base_meta),
+            "split_metadata": split_metadata,
+            "chunks": result["chunks"],
+        }
+        self._range_index = None
+        self.last_ingest_stats = {
+            "segments": result["segments"],
+            "duplicates": result["duplicates"],
+            "stages": result["stats"],
+        }
+        if "kept" in result:
+            self.last_ingest_stats.update(kept=result["kept"], removed=result["removed"])
+        for stage, entry in result["stats"].items():
+            logger.info("Ingest %s – %s: %d items in %.3fs (%s items/s).",
+                        source_id, stage, entry["items"], entry["seconds"], entry["items_per_second"])
+
+    #  marker → source lookup
+    def _source_range(self, marker_id: int) -> Optional[tuple]:
+        """(source_id, split_index) of the range holding marker_id, by bisection over all ranges."""
+        if self._range_index is None:
+            self._range_index = sorted(
+                (start, stop, source_id, split_index)
+                for source_id, info in self.source_markers.items()
+                for start, stop, split_index in info["ranges"]
+            )
+        pos = bisect.bisect_right(self._range_index, (marker_id, float("inf"))) - 1
+        if pos >= 0:
+            start, stop, source_id, split_index = self._range_index[pos]
+            if start <= marker_id < stop:
+                return source_id, split_index
+        return None
 
-                meta = {**base_meta, **getattr(split, "metadata", {}), "original_split_index": idx}
-                if "page" not in meta and hasattr(split, "metadata") and "page" in split.metadata:
-                    meta["page"] = split.metadata["page"]
+    def marker_source(self, marker_id: int) -> Optional[str]:
+        """ID of the external source a marker was ingested from (None for other markers)."""
+        found = self._source_range(marker_id)
+        return found[0] if found else None
 
-                try:
-                    # Use StudSar's update_network method with emotion support
-                    emotion = base_meta.get("emotion", "neutral")
-                    self.manager.update_network(seg, emotion=emotion)
-                    count += 1
-                except Exception as err:
-                    logger.error("Memorise error (%s): %s", source_id, err, exc_info=True)
-        return count
+    def marker_tags(self, marker_id: int) -> List[str]:
+        """Source tags of a marker: external_source_id:<id> and source_type:<type>."""
+        found = self._source_range(marker_id)
+        if not found:
+            return []
+        source_id = found[0]
+        return [f"external_source_id:{source_id}",
+                f"source_type:{self.source_markers[source_id]['base_meta'].get('type', 'unknown')}"]
+
+    def marker_metadata(self, marker_id: int) -> Dict[str, Any]:
+        """Metadata of a marker: its source metadata, its split's metadata and the split index."""
+        found = self._source_range(marker_id)
+        if not found:
+            return {}
+        source_id, split_index = found
+        info = self.source_markers[source_id]
+        return {**info["base_meta"], **info["split_metadata"][split_index], "original_split_index": split_index}
 
     #  public ingestion API 
     def add_document(self, file_path: str, *, source_id: Optional[str] = None, metadata_extra: Optional[Dict[str, Any]] = None) -> Optional[str]:
@@ -176,18 +287,11 @@ class RAGConnector:
         if source_id in self.external_sources:
             logger.warning("Source ID %s already exists – overwriting.", source_id)
 
-        ext = os.path.splitext(file_path)[1].lower()
-        loader, doc_type = None, "unknown"
         try:
-            if ext == ".pdf":
-                loader, doc_type = PyPDFLoader(file_path), "pdf"
-            elif ext == ".txt":
-                loader, doc_type = TextLoader(file_path, autodetect_encoding=True), "txt"
-            elif ext == ".csv":
-                loader, doc_type = CSVLoader(file_path, autodetect_encoding=True), "csv"
-            else:
-                logger.error("Unsupported file type: %s", ext)
-                return None
+            loader, doc_type = _document_loader(file_path)
+        except ValueError as err:
+            logger.error("%s", err)
+            return None
         except Exception as err:
             logger.error("Loader init failed: %s", err, exc_info=True)
             return None
@@ -201,6 +305,10 @@ class RAGConnector:
         meta = {"original_path": file_path, "type": doc_type, **(metadata_extra or {})}
         memorised = self._memorize_splits(splits, source_id, meta)
 
+        return self._register_document(source_id, file_path, doc_type, memorised, metadata_extra)
+
+    def _register_document(self, source_id: str, file_path: str, doc_type: str, memorised: int,
+                           metadata_extra: Optional[Dict[str, Any]]) -> Optional[str]:
         if memorised == 0:
             logger.warning("No segments memorised from '%s'.", file_path)
             return None
@@ -210,10 +318,110 @@ class RAGConnector:
             "type": doc_type,
             "segments_memorized": memorised,
             "metadata_extra": metadata_extra,
+            "ingest_stats": self.last_ingest_stats,
         }
         logger.info("Document '%s' (%s segments) added with source ID: %s.", file_path, memorised, source_id)
         return source_id
 
+    def add_documents(
+        self,
+        paths: List[str],
+        *,
+        workers: Optional[int] = None,
+        encode_in_workers: bool = False,
+        metadata_extra: Optional[Dict[str, Any]] = None,
+        progress: Optional[callable] = None,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Add many documents (PDF, TXT, CSV) at once. With workers > 1, worker processes load,
+        split and segment the files in parallel, with the same segmentation as add_document;
+        with encode_in_workers they also encode them, each worker loading the manager's own
+        embedding backend. This process is the single writer that bulk-inserts each file as
+        soon as it is ready. A file that fails never stops the others.
+        progress(done, total, path, source_id, error) is called after every file.
+        Returns {path: source_id, or None if the file could not be added}.
+        """
+        paths = list(paths)
+        results: Dict[str, Optional[str]] = {}
+        if not DEPS_OK:
+            logger.error("Cannot add documents, dependencies not satisfied.")
+            return {path: None for path in paths}
+
+        prepare = functools.partial(
+            prepare_file,
+            load_fn=functools.partial(load_document_splits, chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap),
+            segment_fn=self._worker_segment_fn(),
+            encoder=self._worker_encoder() if encode_in_workers else None,
+            encode_batch_size=self.pipeline.stage_sizes["encode"],
+        )
+        logger.info("Adding %d documents with %s worker process(es)...", len(paths), workers or 1)
+        self.files_pending = len(paths)
+        try:
+            self._write_prepared(paths, prepare_files(paths, prepare, workers=workers), results, metadata_extra, progress)
+        finally:
+            self.files_pending = 0
+        return results
+
+    def _worker_segment_fn(self):
+        """
+        Picklable segmenter equivalent to _segment_texts, or None to segment in the writer.
+        StudSarManager.segment_texts delegates to the package's segment_texts with the same
+        defaults; any other text processor cannot be shipped to a worker process.
+        """
+        method = getattr(type(self.text_processor), "segment_texts", None)
+        if method is not None and method is getattr(Manager, "segment_texts", None):
+            return segment_texts
+        return None
+
+    def _worker_encoder(self) -> Optional[tuple]:
+        """(backend, model_name, backend_path) that lets a worker rebuild the manager's embedding backend."""
+        backend = getattr(self.manager, "embedding_backend", None)
+        if backend is None or not hasattr(backend, "identity"):
+            logger.warning("The manager has no embedding backend workers can rebuild; encoding in the writer.")
+            return None
+        return (*backend.identity, getattr(self.manager, "backend_path", None))
+
+    def _check_worker_embeddings(self, prepared: Dict[str, Any]) -> None:
+        """Drops worker embeddings that do not come from the manager's backend (the writer re-encodes)."""
+        if prepared["embeddings"] is None:
+            return
+        expected = self.manager.embedding_backend.identity
+        dim = getattr(self.manager, "embedding_dim", None)
+        if tuple(prepared["encoder"]) != tuple(expected) or (dim is not None and prepared["embeddings"].shape[-1] != dim):
+            logger.warning("Worker embeddings of '%s' come from %s (dim %d), not %s (dim %s); re-encoding in the writer.",
+                           prepared["path"], prepared["encoder"], prepared["embeddings"].shape[-1], expected, dim)
+            prepared["embeddings"] = None
+
+    def _write_prepared(self, paths, prepared_files, results, metadata_extra, progress) -> None:
+        """Single writer of add_documents: inserts and registers each prepared file as it arrives."""
+        for path, prepared, error in prepared_files:
+            source_id = None
+            if error is not None:
+                logger.error("Could not prepare '%s': %s", path, error)
+            elif not prepared["texts"]:
+                logger.warning("No split content obtained from '%s'.", path)
+            else:
+                self._check_worker_embeddings(prepared)
+                source_id = f"file_{os.path.basename(path)}_{len(self.external_sources)+1}"
+                meta = {"original_path": path, "type": prepared["type"], **(metadata_extra or {})}
+                memorised = self._memorize(source_id, meta, prepared["texts"], prepared["split_metadata"], prepared)
+                source_id = self._register_document(source_id, path, prepared["type"], memorised, metadata_extra)
+            results[path] = source_id
+            self.files_pending = len(paths) - len(results)
+            if progress is not None:
+                try:
+                    progress(len(results), len(paths), path, source_id, error)
+                except Exception as err:
+                    logger.error("Progress callback error: %s", err, exc_info=True)
+
+    def add_directory(self, path: str, pattern: str = "*", *, recursive: bool = True, **kwargs) -> Dict[str, Optional[str]]:
+        """Add every supported document under path whose name matches pattern (see add_documents for kwargs)."""
+        matches = glob.glob(os.path.join(path, "**", pattern) if recursive else os.path.join(path, pattern), recursive=recursive)
+        paths = sorted(p for p in matches if os.path.isfile(p) and os.path.splitext(p)[1].lower() in DOCUMENT_TYPES)
+        if not paths:
+            logger.warning("No supported documents matching '%s' in '%s'.", pattern, path)
+        return self.add_documents(paths, **kwargs)
+
     def query(self, prompt: str, k: int = 5) -> List[Dict[str, Any]]:
         """Query StudSar's memory via RAG."""
         if not DEPS_OK:
@@ -296,6 +504,7 @@ class RAGConnector:
                 **meta,
                 "segments_memorized": memorised,
                 "total_splits_processed": len(splits),
+                "ingest_stats": self.last_ingest_stats,
                 # "added_at": self.manager.get_timestamp(), # Metodo non trovato in StudSarManager
             }
             logger.info("Web %s → %d segments memorised.", url, memorised)
@@ -353,6 +562,7 @@ class RAGConnector:
                 **base_meta,
                 "segments_memorized": memorised,
                 "total_rows_processed": len(rows),
+                "ingest_stats": self.last_ingest_stats,
                 # "added_at": self.manager.get_timestamp(), # Metodo non trovato in StudSarManager
             }
             logger.info("DB source %s → %d segments memorised.", source_id, memorised)
@@ -378,27 +588,22 @@ class RAGConnector:
 
         logger.info("Searching external sources with query: '%s...', filters: %s", query[:50], tags)
         try:
-            # Use StudSar's search method
-            ids, similarities, segments = self.manager.search(query, k=limit)
-            
-            # Convert to expected format and filter by tags if needed
+            # Filters drop hits, so over-fetch to still fill the limit
+            ids, similarities, segments = self.manager.search(query, k=limit * 4 if tags else limit)
+
             raw = []
-            for i, (marker_id, sim, seg) in enumerate(zip(ids, similarities, segments)):
-                marker_details = self.manager.get_marker_details(marker_id)
-                if marker_details:
-                    # Check if this marker has external source tags
-                    marker_tags = getattr(marker_details, 'tags', [])
-                    if tags:
-                        # Filter by required tags
-                        if not any(tag in marker_tags for tag in tags):
-                            continue
-                    
-                    raw.append({
-                        "text": seg,
-                        "score": sim,
-                        "tags": marker_tags,
-                        "metadata": getattr(marker_details, 'metadata', {})
-                    })
+            for marker_id, sim, seg in zip(ids, similarities, segments):
+                marker_tags = self.marker_tags(marker_id)
+                if tags and not any(tag in marker_tags for tag in tags):
+                    continue
+                raw.append({
+                    "text": seg,
+                    "score": sim,
+                    "tags": marker_tags,
+                    "metadata": self.marker_metadata(marker_id),
+                })
+                if len(raw) >= limit:
+                    break
         except Exception as err:
             logger.error("Search failed: %s", err, exc_info=True)
             return []
@@ -426,16 +631,20 @@ class RAGConnector:
 
         logger.info("Removing source '%s' from RAG tracking.", source_id)
 
-        if purge_memory and hasattr(self.manager, "delete_segments_by_tag"):
+        if purge_memory and hasattr(self.manager, "remove_markers"):
+            info = self.source_markers.get(source_id, {})
+            marker_ids = [m for start, stop, _ in info.get("ranges", []) for m in range(start, stop)]
             try:
-                deleted = self.manager.delete_segments_by_tag(f"external_source_id:{source_id}")
+                deleted = self.manager.remove_markers(marker_ids) if marker_ids else 0
                 logger.info("Purged %d segments for %s from core memory.", deleted, source_id)
             except Exception as err:
                 logger.error("Error purging segments for '%s': %s", source_id, err, exc_info=True)
         elif purge_memory:
-            logger.warning("StudSar manager doesn't support 'delete_segments_by_tag'. Memory purge skipped.")
+            logger.warning("StudSar manager doesn't support 'remove_markers'. Memory purge skipped.")
 
         self.external_sources.pop(source_id, None)
+        self.source_markers.pop(source_id, None)
+        self._range_index = None
         logger.info("Source %s removed from RAG tracking.", source_id)
         return True
 
@@ -453,36 +662,53 @@ class RAGConnector:
             # self.external_sources[source_id]["updated_at"] = self.manager.get_timestamp() # Metodo non trovato in StudSarManager
             logger.info("Metadata updated for %s", source_id)
 
-        # If content update is requested
+        # If content update is requested: incremental re-ingestion by chunk content hash
         if content_path:
             src_type = self.external_sources[source_id]["type"]
             logger.info("Updating content for source '%s' (type: %s) from new path: %s", source_id, src_type, content_path)
-            
-            # Remove existing source with memory purge
-            self.remove_external_source(source_id, purge_memory=True)
-
-            # Re-add with the same ID and updated metadata
-            new_metadata_extra = {k: v for k, v in source_info_original.items() 
-                                if k not in ['type', 'path', 'url', 'added_at', 'segments_memorized', 
-                                           'total_splits_processed', 'db_connection', 'query']}
-            if metadata_update:
-                new_metadata_extra.update(metadata_update)
-            if src_type in {"pdf", "txt", "csv"}:
-                re_id = self.add_document(content_path, source_id=source_id, metadata_extra=new_metadata_extra)
-            elif src_type == "web":
-                re_id = self.add_web_content(content_path, source_id=source_id, metadata_extra=new_metadata_extra)
-            else:
+            if src_type not in {"pdf", "txt", "csv", "web"}:
                 logger.error("Content refresh not supported for type %s", src_type)
-                # Restore original info if re-adding fails
                 self.external_sources[source_id] = source_info_original
                 return False
-            if re_id == source_id:
-                logger.info("Source '%s' content updated successfully.", source_id)
-                return True
-            else:
-                logger.error("Failed to update content for source '%s'.", source_id)
+
+            try:
+                if src_type == "web":
+                    loader, doc_type, location = WebBaseLoader(web_path=content_path), "web", "original_url"
+                else:
+                    (loader, doc_type), location = _document_loader(content_path), "original_path"
+            except Exception as err:
+                logger.error("Loader init failed for '%s': %s", content_path, err, exc_info=True)
+                self.external_sources[source_id] = source_info_original
+                return False
+            splits = self._load_and_split(loader)
+            if not splits:
+                logger.error("No split content obtained from '%s'; source '%s' left unchanged.", content_path, source_id)
+                self.external_sources[source_id] = source_info_original
                 return False
 
+            info = self.source_markers.get(source_id, {})
+            base_meta = {**info.get("base_meta", {}), **(metadata_update or {}), location: content_path, "type": doc_type}
+            try:
+                result = self.pipeline.refresh([split.page_content for split in splits], info.get("chunks", {}),
+                                               emotion=base_meta.get("emotion", "neutral"))
+            except Exception as err:
+                logger.error("Failed to update content for source '%s': %s", source_id, err, exc_info=True)
+                self.external_sources[source_id] = source_info_original
+                return False
+            self._record_source(source_id, base_meta, [dict(split.metadata) for split in splits], result)
+
+            self.external_sources[source_id].update({
+                "path" if location == "original_path" else location: content_path,
+                "type": doc_type,
+                "segments_memorized": sum(len(ids) for ids in result["chunks"].values()),
+                "ingest_stats": self.last_ingest_stats,
+            })
+            logger.info("Source '%s' content updated: %d segments kept, %d added, %d removed.",
+                        source_id, result["kept"], result["segments"], result["removed"])
+            return True
+
+        if metadata_update and source_id in self.source_markers:
+            self.source_markers[source_id]["base_meta"].update(metadata_update)
         return True
 
     # diagnostics and stats
@@ -529,8 +755,7 @@ if __name__ == "__main__":
     # quick smoke-test with the in-file MockManager
     class _MockTP:
         def __init__(self):
-            from sentence_transformers import SentenceTransformer
-            self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+            self.embedding_model = registry.get_embedding_model("all-MiniLM-L6-v2")
 
         def segment_text(self, txt: str) -> List[str]:
             return [t.strip() for t in txt.split(".") if t.strip()]
@@ -558,6 +783,8 @@ if __name__ == "__main__":
             """Mock search that returns ids, similarities, segments."""
             ids, similarities, segments = [], [], []
             for i, e in enumerate(self._memory_db):
+                if e is None:
+                    continue
                 if query and query.lower() not in e["text"].lower():
                     continue
                 ids.append(i)
@@ -578,10 +805,13 @@ if __name__ == "__main__":
             from datetime import datetime
             return datetime.now().isoformat()
 
-        def delete_segments_by_tag(self, tag):
-            before = len(self._memory_db)
-            self._memory_db = [e for e in self._memory_db if tag not in e.get("tags", [])]
-            return before - len(self._memory_db)
+        def remove_markers(self, marker_ids):
+            removed = 0
+            for marker_id in set(marker_ids):
+                if 0 <= marker_id < len(self._memory_db) and self._memory_db[marker_id] is not None:
+                    self._memory_db[marker_id] = None # IDs are list positions: keep them stable
+                    removed += 1
+            return removed
 
     print("RAGConnector smoke test starting...")
     mgr = _MockManager()
@@ -0,0 +1,11 @@
+"""
+Storage module: on-disk formats for StudSar memories and storage backends of the embedding buffers.
+"""
+from .embedding_storage import (EmbeddingStorage, Int8Storage, MemmapStorage, STORAGES, create_storage,
+                                storage_for_encoding)
+from .columnar import ColumnMap, is_columnar, load_columnar_into, read_manifest, save_columnar
+from .wal import WriteAheadLog, read_records, wal_path_for
+
+__all__ = ['EmbeddingStorage', 'Int8Storage', 'MemmapStorage', 'STORAGES', 'create_storage', 'storage_for_encoding',
+           'ColumnMap', 'is_columnar', 'load_columnar_into', 'read_manifest', 'save_columnar',
+           'WriteAheadLog', 'read_records', 'wal_path_for']
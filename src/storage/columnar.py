@@ -0,0 +1,262 @@
+"""
+Columnar, memory-mappable on-disk format for StudSarNeural memories.
+
+A memory is a directory:
+
+    manifest.json          format/version, model + backend identity, dims, counts, emotion vocabulary
+    embeddings.npy         (N, search_dim) float32, row i = tensor index i (manifest dtype "int8":
+                           (N, search_dim + 4) int8 rows ending in their float32 scale)
+    full_embeddings.npy    (N, embedding_dim) rows in the same encoding, only in reduced-dimension mode with keep_full
+    projection.npz         projection tensors, only in reduced-dimension mode
+    marker_ids.npy         (N,) int64 marker ID of every row
+    segments.bin           UTF-8 segment texts, concatenated
+    segment_offsets.npy    (N + 1,) int64 byte offsets into segments.bin
+    usage.npy              (N,) int64 usage counts
+    reputation.npy         (N,) float64 reputation scores
+    emotion_codes.npy      (N,) int16 index into the manifest's emotion vocabulary (-1 = no tag)
+
+Every file is a flat array, so saving costs a few large writes instead of pickling
+millions of Python objects. Loading memory-maps the arrays: segments and emotion tags are
+decoded on first access, so the first query runs before the whole memory is paged in.
+"""
+
+import json
+import os
+import shutil
+import sys
+from collections.abc import MutableMapping
+
+import numpy as np
+import torch
+
+from ..models.columns import MarkerColumn
+from ..models.projection import projection_from_state
+
+FORMAT_NAME = "studsar-columnar"
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+_NO_EMOTION = -1
+
+
+def is_columnar(path):
+    """True if path is a directory written by save_columnar()."""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST))
+
+
+def read_manifest(path):
+    """Returns the manifest dictionary of a columnar memory."""
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError(f"'{path}' is not a {FORMAT_NAME} directory.")
+    if manifest.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"'{path}' uses format version {manifest['version']}; this StudSar reads up to {FORMAT_VERSION}.")
+    return manifest
+
+
+class ColumnMap(MutableMapping):
+    """
+    Dictionary view over one column of a loaded memory (marker ID -> value).
+    Values are decoded from the (memory-mapped) column on access; writes and deletes
+    go to an in-memory overlay, so the network can keep mutating it like a dict.
+    """
+    def __init__(self, marker_ids, decode, present=None):
+        self._ids = marker_ids
+        self._decode = decode # row -> value
+        self._present = present # optional boolean row mask (rows without a value)
+        self._overlay = {}
+        self._deleted = set()
+        # Marker IDs are usually 0..N-1, which makes the ID -> row lookup arithmetic
+        self._contiguous = len(marker_ids) == 0 or (marker_ids[0] == 0 and marker_ids[-1] == len(marker_ids) - 1
+                                                    and bool(np.all(np.diff(marker_ids) == 1)))
+        self._rows = None if self._contiguous else {int(m): r for r, m in enumerate(marker_ids.tolist())}
+
+    def _row(self, marker_id):
+        if self._contiguous:
+            return marker_id if isinstance(marker_id, (int, np.integer)) and 0 <= marker_id < len(self._ids) else None
+        return self._rows.get(marker_id)
+
+    def _base_has(self, row):
+        return row is not None and (self._present is None or bool(self._present[row]))
+
+    def __getitem__(self, marker_id):
+        if marker_id in self._overlay:
+            return self._overlay[marker_id]
+        row = self._row(marker_id)
+        if marker_id in self._deleted or not self._base_has(row):
+            raise KeyError(marker_id)
+        return self._decode(row)
+
+    def __setitem__(self, marker_id, value):
+        self._overlay[marker_id] = value
+        self._deleted.discard(marker_id)
+
+    def __delitem__(self, marker_id):
+        if marker_id in self._overlay:
+            del self._overlay[marker_id]
+            if self._base_has(self._row(marker_id)):
+                self._deleted.add(marker_id)
+            return
+        if marker_id in self._deleted or not self._base_has(self._row(marker_id)):
+            raise KeyError(marker_id)
+        self._deleted.add(marker_id)
+
+    def _base_ids(self):
+        ids = self._ids if self._present is None else self._ids[np.asarray(self._present)]
+        return ids.tolist()
+
+    def __iter__(self):
+        for marker_id in self._base_ids():
+            if marker_id not in self._deleted and marker_id not in self._overlay:
+                yield marker_id
+        yield from list(self._overlay)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, marker_id):
+        if marker_id in self._overlay:
+            return True
+        return marker_id not in self._deleted and self._base_has(self._row(marker_id))
+
+    def resident_bytes(self):
+        """Approximate process memory of the in-memory parts (overlay, deletions, row index); mapped columns excluded."""
+        total = sys.getsizeof(self._overlay) + sys.getsizeof(self._deleted)
+        total += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self._overlay.items())
+        if self._rows is not None:
+            total += sys.getsizeof(self._rows) + sum(sys.getsizeof(k) for k in self._rows)
+        return total
+
+
+def _write_array(directory, name, array):
+    np.save(os.path.join(directory, name), np.ascontiguousarray(array))
+
+
+def save_columnar(network, path, metadata=None):
+    """
+    Writes network to the directory path (replacing it atomically if it exists).
+    metadata (model name, backend, ...) is stored in the manifest.
+    """
+    num_markers = network.get_total_markers()
+    ids = np.zeros(num_markers, dtype=np.int64)
+    for marker_id, row in network.marker_id_to_index.items():
+        ids[row] = marker_id
+    id_list = ids.tolist()
+
+    encoded = [network.id_to_segment.get(m, "").encode("utf-8") for m in id_list]
+    offsets = np.zeros(num_markers + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+
+    emotions = [network.id_to_emotion.get(m) for m in id_list]
+    vocabulary = sorted({e for e in emotions if e})
+    code_of = {e: i for i, e in enumerate(vocabulary)}
+    emotion_codes = np.array([code_of[e] if e else _NO_EMOTION for e in emotions], dtype=np.int16)
+    usage = network.id_to_usage.to_rows(num_markers).astype(np.int64) # Dense columns are already in row order
+    reputation = network.id_to_reputation.to_rows(num_markers).astype(np.float64)
+
+    path = os.path.normpath(path)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    _write_array(tmp_path, "embeddings.npy", network.memory_embeddings[:num_markers].detach().cpu().numpy())
+    projection = network.projection
+    if projection is not None:
+        if network.full_embeddings is not None:
+            _write_array(tmp_path, "full_embeddings.npy", network.full_embeddings[:num_markers].detach().cpu().numpy())
+        np.savez(os.path.join(tmp_path, "projection.npz"),
+                 **{k: v.numpy() for k, v in projection.state().items() if isinstance(v, torch.Tensor)})
+    _write_array(tmp_path, "marker_ids.npy", ids)
+    with open(os.path.join(tmp_path, "segments.bin"), "wb") as f:
+        for chunk in encoded:
+            f.write(chunk)
+    _write_array(tmp_path, "segment_offsets.npy", offsets)
+    _write_array(tmp_path, "usage.npy", usage)
+    _write_array(tmp_path, "reputation.npy", reputation)
+    _write_array(tmp_path, "emotion_codes.npy", emotion_codes)
+
+    manifest = dict(metadata or {})
+    manifest.update({
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "count": num_markers,
+        "next_id": network.next_id,
+        "embedding_dim": network.embedding_dim,
+        "search_dim": network.search_dim,
+        "dtype": network.storage.encoding, # Rows as stored: float32, or int8 values plus a float32 scale
+        "emotion_vocabulary": vocabulary,
+        "projection": {k: v for k, v in projection.state().items() if not isinstance(v, torch.Tensor)} if projection is not None else None,
+        "rerank_factor": network.rerank_factor,
+    })
+    with open(os.path.join(tmp_path, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Swap directories: the previous version is only removed once the new one is in place
+    old_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if os.path.exists(old_path):
+        shutil.rmtree(old_path, ignore_errors=True)
+    return manifest
+
+
+def _load_matrix(path, name, mmap, device):
+    array = np.load(os.path.join(path, name), mmap_mode="c" if mmap else None)
+    if str(device).startswith("cpu"):
+        return torch.from_numpy(array) # Shares the (copy-on-write) mapping, pages load on demand
+    return torch.from_numpy(np.asarray(array)).to(device)
+
+
+def load_columnar_into(network, path, mmap=True):
+    """
+    Fills an empty StudSarNeural from the columnar memory at path and returns the manifest.
+    With mmap, embeddings, segments and tags are read from memory-mapped files on demand.
+    """
+    manifest = read_manifest(path)
+    if manifest["embedding_dim"] != network.embedding_dim:
+        raise ValueError(f"Memory has embedding dimension {manifest['embedding_dim']}, network uses {network.embedding_dim}.")
+    if manifest.get("dtype", "float32") != network.storage.encoding:
+        raise ValueError(f"Memory stores {manifest.get('dtype')} rows, network storage encodes {network.storage.encoding}.")
+    mode = "r" if mmap else None
+
+    ids = np.load(os.path.join(path, "marker_ids.npy"), mmap_mode=mode)
+    offsets = np.load(os.path.join(path, "segment_offsets.npy"), mmap_mode=mode)
+    if mmap and os.path.getsize(os.path.join(path, "segments.bin")) > 0:
+        arena = np.memmap(os.path.join(path, "segments.bin"), dtype=np.uint8, mode="r")
+    else:
+        with open(os.path.join(path, "segments.bin"), "rb") as f:
+            arena = np.frombuffer(f.read(), dtype=np.uint8)
+    codes = np.load(os.path.join(path, "emotion_codes.npy"), mmap_mode=mode)
+    usage = np.load(os.path.join(path, "usage.npy"), mmap_mode=mode)
+    reputation = np.load(os.path.join(path, "reputation.npy"), mmap_mode=mode)
+    vocabulary = manifest.get("emotion_vocabulary", [])
+    id_array = np.asarray(ids)
+
+    projection_meta = manifest.get("projection")
+    if projection_meta:
+        tensors = {}
+        projection_file = os.path.join(path, "projection.npz")
+        if os.path.exists(projection_file):
+            with np.load(projection_file) as data:
+                tensors = {k: torch.from_numpy(data[k]) for k in data.files}
+        network.projection = projection_from_state({**projection_meta, **tensors}).to(network.device)
+        network.rerank_factor = manifest.get("rerank_factor", 0)
+        full_file = "full_embeddings.npy"
+        has_full = os.path.exists(os.path.join(path, full_file))
+        network.register_buffer("full_embeddings", _load_matrix(path, full_file, mmap, network.device) if has_full else None)
+    network.register_buffer("memory_embeddings", _load_matrix(path, "embeddings.npy", mmap, network.device))
+
+    network.marker_id_to_index = dict(zip(id_array.tolist(), range(len(id_array))))
+    network.id_to_segment = ColumnMap(id_array, lambda row: bytes(arena[offsets[row]:offsets[row + 1]]).decode("utf-8"))
+    network.id_to_emotion = ColumnMap(id_array, lambda row: vocabulary[codes[row]], present=np.asarray(codes) != _NO_EMOTION)
+    # Usage and reputation are stored in row order: they become the network's dense columns as is
+    network.id_to_usage = MarkerColumn.from_rows(network, np.array(usage, dtype=np.int64), 0)
+    network.id_to_reputation = MarkerColumn.from_rows(network, np.array(reputation, dtype=np.float64), 0.0)
+    network.next_id = manifest["next_id"]
+    return manifest
@@ -0,0 +1,181 @@
+"""
+Storage backends for the embedding buffers of StudSarNeural.
+
+The network keeps its markers in row-major buffers (memory_embeddings and, in reduced
+mode, full_embeddings). A storage backend decides how those rows are held:
+
+- "memory": float32 tensor in RAM (or on the GPU), the default
+- "mmap":   float32 rows in memory-mapped files under a directory; the OS pages them in
+            and out, so memories larger than RAM stay searchable (CPU only)
+- "int8":   symmetric int8 quantization with one float32 scale per row (about 4x smaller);
+            rows are dequantized when scanned, trading some search time for memory
+
+Buffers are always plain torch tensors, so row moves, slicing and state_dict() work the
+same for every backend; only allocation, resizing and the row encoding differ.
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+import torch
+
+_SCALE_BYTES = 4 # One float32 scale stored in the trailing int8 columns of each row
+
+
+class EmbeddingStorage:
+    """In-RAM float32 rows. Base class for the other backends."""
+    name = "memory"
+    encoding = "float32" # Row encoding written to save files ("float32" or "int8")
+
+    def width(self, dim):
+        """Stored columns for vectors of dimension dim."""
+        return dim
+
+    def allocate(self, name, rows, dim, device):
+        """New zeroed buffer for rows vectors of dimension dim (name identifies the buffer)."""
+        return torch.zeros(rows, self.width(dim), device=device)
+
+    def resize(self, name, buffer, rows, device):
+        """Buffer with rows rows holding the first min(rows, len(buffer)) rows of buffer."""
+        resized = torch.zeros(rows, buffer.shape[1], dtype=buffer.dtype, device=device)
+        keep = min(rows, buffer.shape[0])
+        resized[:keep] = buffer[:keep]
+        return resized
+
+    def adopt(self, name, buffer, device):
+        """Takes over a buffer already in this encoding (e.g. read from a save file)."""
+        return buffer.to(device)
+
+    def encode(self, vectors):
+        """float (..., dim) vectors -> stored rows."""
+        return vectors.float()
+
+    def decode(self, rows):
+        """Stored rows -> float32 (..., dim) vectors (no copy for float32 storage)."""
+        return rows
+
+    def release(self, buffer):
+        """Called when buffer is no longer used by the network."""
+
+    def close(self):
+        """Frees resources held outside the buffers (files, directories)."""
+
+
+def _remove_files(files, directory=None):
+    """Unlinks the files of a MemmapStorage (and its directory when the storage created it)."""
+    for path in list(files.values()):
+        try:
+            os.remove(path)
+        except OSError: # Still mapped on platforms that forbid unlinking open files
+            pass
+    files.clear()
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class MemmapStorage(EmbeddingStorage):
+    """
+    float32 rows in memory-mapped files under directory (a temporary directory by default).
+    Every allocation gets a new file; the file of a replaced buffer is unlinked, which is
+    safe while views of it are still mapped. close(), or garbage collection of the storage,
+    removes the remaining files and the temporary directory. Rows live in CPU memory only.
+    """
+    name = "mmap"
+
+    def __init__(self, directory=None):
+        owned = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="studsar-mmap-")
+        os.makedirs(self.directory, exist_ok=True)
+        self._generation = itertools.count()
+        self._files = {} # data_ptr() of a mapped buffer -> its file
+        self._finalizer = weakref.finalize(self, _remove_files, self._files, self.directory if owned else None)
+
+    @staticmethod
+    def _check_device(device):
+        if device is not None and torch.device(device).type != "cpu":
+            raise ValueError(f"The 'mmap' storage keeps rows in memory-mapped CPU files; device '{device}' is not supported.")
+
+    def _map(self, name, rows, width):
+        if rows == 0:
+            return torch.zeros(0, width)
+        path = os.path.join(self.directory, f"{name}.{next(self._generation)}.f32")
+        mapped = torch.from_numpy(np.memmap(path, dtype=np.float32, mode="w+", shape=(rows, width)))
+        self._files[mapped.data_ptr()] = path
+        return mapped
+
+    def allocate(self, name, rows, dim, device):
+        self._check_device(device)
+        return self._map(name, rows, self.width(dim))
+
+    def resize(self, name, buffer, rows, device):
+        self._check_device(device)
+        resized = self._map(name, rows, buffer.shape[1])
+        keep = min(rows, buffer.shape[0])
+        resized[:keep] = buffer[:keep].cpu()
+        self.release(buffer)
+        return resized
+
+    def adopt(self, name, buffer, device):
+        self._check_device(device)
+        resized = self._map(name, buffer.shape[0], buffer.shape[1])
+        resized[:] = buffer.cpu()
+        return resized
+
+    def release(self, buffer):
+        path = self._files.pop(buffer.data_ptr(), None)
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError: # Still mapped on platforms that forbid unlinking open files
+                pass
+
+    def close(self):
+        """Removes every file of this storage, and its directory if it was a temporary one."""
+        self._finalizer()
+
+
+class Int8Storage(EmbeddingStorage):
+    """Each row holds dim int8 values followed by its float32 scale reinterpreted as 4 int8 columns."""
+    name = "int8"
+    encoding = "int8"
+
+    def width(self, dim):
+        return dim + _SCALE_BYTES
+
+    def allocate(self, name, rows, dim, device):
+        return torch.zeros(rows, self.width(dim), dtype=torch.int8, device=device)
+
+    def encode(self, vectors):
+        vectors = vectors.float()
+        scale = (vectors.abs().amax(dim=-1, keepdim=True) / 127.0).clamp_min(1e-12)
+        quantized = torch.round(vectors / scale).clamp_(-127, 127).to(torch.int8)
+        return torch.cat([quantized, scale.contiguous().view(torch.int8)], dim=-1)
+
+    def decode(self, rows):
+        scale = rows[..., -_SCALE_BYTES:].contiguous().view(torch.float32)
+        return rows[..., :-_SCALE_BYTES].float() * scale
+
+
+STORAGES = {"memory": EmbeddingStorage, "mmap": MemmapStorage, "int8": Int8Storage}
+
+
+def create_storage(storage=None, path=None):
+    """
+    Returns a storage backend: an EmbeddingStorage instance is used as is, a name
+    ("memory", "mmap", "int8") creates one (path is the directory of "mmap").
+    """
+    if isinstance(storage, EmbeddingStorage):
+        return storage
+    storage = storage or "memory"
+    if storage not in STORAGES:
+        raise ValueError(f"Unknown storage '{storage}'. Available: {', '.join(STORAGES)}")
+    return MemmapStorage(path) if storage == "mmap" else STORAGES[storage]()
+
+
+def storage_for_encoding(encoding):
+    """Storage able to hold rows saved with encoding (as recorded in save files)."""
+    return Int8Storage() if encoding == "int8" else EmbeddingStorage()
@@ -0,0 +1,176 @@
+"""
+Append-only write-ahead log (WAL) of StudSar memory mutations.
+
+The log sits next to a columnar snapshot (`<snapshot>.wal`) and records every change
+made after that snapshot, so persisting a change costs one small append instead of a
+full rewrite. Records are written to the OS immediately and fsynced in groups
+(every group_size records or group_interval seconds, and on sync()/close()).
+
+Record layout (little endian):
+
+    uint32 payload length | uint32 crc32(payload) | payload
+    payload = uint32 header length | JSON header | optional float32 embedding bytes
+
+Headers carry a monotonically increasing log sequence number ("lsn"). A snapshot
+stores the last lsn it contains, so replay skips records that are already folded in
+and a crash between writing a checkpoint and truncating the log is harmless.
+A torn record at the end of the file (crash mid-append) ends replay and is cut off.
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+_RECORD = struct.Struct("<II")
+_HEADER_LEN = struct.Struct("<I")
+
+# Operations
+OP_ADD = "add"
+OP_UPDATE_EMBEDDING = "update_embedding"
+OP_REPUTATION = "reputation"
+OP_USAGE = "usage"
+OP_DELETE = "delete"
+
+
+def wal_path_for(snapshot_path):
+    """Path of the log belonging to a snapshot directory."""
+    return os.path.normpath(snapshot_path) + ".wal"
+
+
+def _encode(header, embedding=None):
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    blob = b"" if embedding is None else np.ascontiguousarray(embedding, dtype=np.float32).tobytes()
+    payload = _HEADER_LEN.pack(len(header_bytes)) + header_bytes + blob
+    return _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(path):
+    """
+    Returns ([(header, embedding or None), ...], valid_bytes) for the log at path.
+    Reading stops at the first torn or corrupt record; valid_bytes is where it starts.
+    """
+    records = []
+    if not os.path.exists(path):
+        return records, 0
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + _RECORD.size <= len(data):
+        length, crc = _RECORD.unpack_from(data, offset)
+        start, end = offset + _RECORD.size, offset + _RECORD.size + length
+        if end > len(data) or zlib.crc32(data[start:end]) != crc:
+            break
+        payload = data[start:end]
+        (header_len,) = _HEADER_LEN.unpack_from(payload)
+        header = json.loads(payload[_HEADER_LEN.size:_HEADER_LEN.size + header_len].decode("utf-8"))
+        blob = payload[_HEADER_LEN.size + header_len:]
+        records.append((header, np.frombuffer(blob, dtype=np.float32).copy() if blob else None))
+        offset = end
+    return records, offset
+
+
+class WriteAheadLog:
+    """
+    Appends mutation records to a log file with group fsync.
+    start_lsn is the last sequence number already covered by the snapshot.
+    """
+    def __init__(self, path, start_lsn=0, group_size=64, group_interval=1.0):
+        self.path = path
+        self.group_size = max(1, int(group_size))
+        self.group_interval = group_interval
+        records, valid_bytes = read_records(path)
+        self.lsn = max([start_lsn] + [h["lsn"] for h, _ in records])
+        self.records = sum(1 for h, _ in records if h["lsn"] > start_lsn) # Not yet in a snapshot
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+        if self._file.tell() != valid_bytes:
+            # Drop a torn tail left by a crash so new records follow valid ones
+            self._file.truncate(valid_bytes)
+            self._file.seek(valid_bytes)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, op, embedding=None, **fields):
+        """Appends one record and returns its lsn."""
+        with self._lock:
+            self.lsn += 1
+            self._file.write(_encode(dict(fields, op=op, lsn=self.lsn), embedding))
+            self._file.flush() # Survives a process crash; fsync below covers power loss
+            self.records += 1
+            self._unsynced += 1
+            if self._unsynced >= self.group_size or time.monotonic() - self._last_sync >= self.group_interval:
+                self._sync_locked()
+            return self.lsn
+
+    def _sync_locked(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """Forces pending records to disk."""
+        with self._lock:
+            self._file.flush()
+            self._sync_locked()
+
+    def reset(self):
+        """Empties the log after a checkpoint (sequence numbers keep increasing)."""
+        with self._lock:
+            self._file.truncate(0)
+            self._file.seek(0)
+            os.fsync(self._file.fileno())
+            self.records = 0
+            self._unsynced = 0
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._sync_locked()
+                self._file.close()
+
+
+def replay(network, path, start_lsn=0):
+    """
+    Applies the records of the log at path with lsn > start_lsn to network.
+    Returns the number of records applied.
+    """
+    records, _ = read_records(path)
+    applied = 0
+    for header, embedding in records:
+        if header["lsn"] <= start_lsn:
+            continue
+        apply_record(network, header, embedding)
+        applied += 1
+    return applied
+
+
+def apply_record(network, header, embedding=None):
+    """Re-executes one logged mutation on network."""
+    op = header["op"]
+    if op == OP_ADD:
+        marker_id = header["id"]
+        if marker_id in network.marker_id_to_index:
+            return # Already present
+        network.next_id = marker_id # add_marker assigns next_id
+        network.add_marker(header["segment"], embedding, emotion=header.get("emotion"))
+        network.next_id = max(network.next_id, marker_id + 1)
+    elif op == OP_UPDATE_EMBEDDING:
+        network.update_marker_embedding(header["id"], embedding)
+    elif op == OP_REPUTATION:
+        if "ids" in header: # Bulk feedback (update_reputation_many)
+            network.update_reputation_many(header["ids"], header["deltas"])
+        elif header["id"] in network.marker_id_to_index:
+            network.id_to_reputation[header["id"]] += header["delta"]
+    elif op == OP_USAGE:
+        network.increment_usage_many(header["ids"], header.get("counts", 1))
+    elif op == OP_DELETE:
+        network.remove_markers(header["ids"])
+    else:
+        raise ValueError(f"Unknown log operation '{op}'.")
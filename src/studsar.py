@@ -1,12 +1,13 @@
+import logging
 import os
 import pickle
 import numpy as np
 import torch
-import torch.nn as nn
-import torch.nn.functional as F
-from sentence_transformers import SentenceTransformer
 # new imports 
-from transformers import pipeline, Pipeline
+from src.models import neural
+from src.models.registry import registry
+from src.models.emotion import EmotionTagger, PENDING_EMOTION
+from src.utils.instrumentation import get_logger, metrics
 """
 StudSar - AI semantic memory system based on custom neural network.
 Implemented with PyTorch and SentenceTransformers
@@ -17,163 +18,68 @@ import warnings
 warnings.filterwarnings("ignore", category=UserWarning) # Example for common PyTorch/SentenceTransformers warnings
 
 #  Language Model Configuration 
-# Attempted to import spaCy, but handled as optional
-try:
-    import spacy
-    SPACY_MODEL_NAME = "en_core_web_sm"
-    try:
-        nlp = spacy.load(SPACY_MODEL_NAME)
-        print(f"SpaCy model '{SPACY_MODEL_NAME}' loaded.")
-        SPACY_AVAILABLE = True
-    except Exception as e:
-        nlp = None
-        SPACY_AVAILABLE = False
-        print(f"SpaCy model '{SPACY_MODEL_NAME}' not loaded ({e}). Word segmentation will be used as fallback.")
-except ImportError:
-    spacy = None
-    nlp = None
-    SPACY_AVAILABLE = False
-    print("SpaCy not installed. Word segmentation will be used as fallback.")
-    print("To install spaCy (optional): pip install spacy && python -m spacy download en_core_web_sm")
-
-# The segmentation Function 
-def segment_text(text, segment_length=100, use_spacy=True, spacy_sentences_per_segment=3):
-    """Segments the text (words or sentences via spaCy)."""
-    segments = []
-    #Only use spaCy if it is available and the user wants to use it  
-    if use_spacy and SPACY_AVAILABLE and nlp:
-        try:
-            doc = nlp(text)
-            sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
-            if not sentences: return []
-            for i in range(0, len(sentences), spacy_sentences_per_segment):
-                segments.append(" ".join(sentences[i:i + spacy_sentences_per_segment]))
-        except Exception as e:
-            print(f"SpaCy error, fallback to words: {e}")
-            use_spacy = False # Force fallback
-   
-    # Fallback to true word-based segmentation 
-    if not (use_spacy and SPACY_AVAILABLE and nlp): 
-        words = text.split()
-        if not words: return []
-        for i in range(0, len(words), segment_length):
-            segments.append(" ".join(words[i:i + segment_length]))
-    # Filter empty segments
-    segments = [seg for seg in segments if seg.strip()]
-    print(f"Text segmented into {len(segments)} blocks.")
-    return segments
+# spaCy loading and segmentation are shared with the package (sentence-only pipeline, batched nlp.pipe)
+from src.utils.text import segment_text
+
+logger = get_logger("studsar")
 
 #  StudSar Neural Network 
-class StudSarNeural(nn.Module):
+class StudSarNeural(neural.StudSarNeural):
     """
-    StudSar Neural Network implemented as PyTorch nn.Module.
-    Stores associative markers (embeddings) and enables similarity search.
+    StudSar Neural Network with the original interface of this module, on top of the
+    package engine (src.models.neural): same buffers, storage backends and save format.
+    Every marker also keeps a metadata dict (emotion tags, etc.) and get_marker_by_id
+    returns an (embedding, segment) tuple.
     """
-    def __init__(self, embedding_dim, initial_capacity=1024, device=None): #Remember you who are reading that here you can change the number --> int__cap ... 
-        super().__init__()
-
-        self.embedding_dim = embedding_dim
-        self.device = device if device else torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"StudSarNeural will use device: {self.device}")
-
-        # Main memory: a tensor for embeddings. Not a trainable layer by default.
-        # We use a registered buffer so it's saved with state_dict but isn't a parameter.
-        # We initialize it empty and expand it dynamically (less efficient, but more flexible).
-        self.register_buffer('memory_embeddings', torch.empty((0, self.embedding_dim), device=self.device, dtype=torch.float32))
-
-        # Mapping from internal ID (tensor index) to original segment
-        self.id_to_segment = {}
+    def __init__(self, embedding_dim, initial_capacity=1024, device=None, storage=None): #Remember you who are reading that here you can change the number --> int__cap ... 
+        super().__init__(embedding_dim, initial_capacity, device=device, storage=storage)
         # Mapping from internal ID to segment metadata (emotion tags, etc.)
         self.id_to_segment_metadata = {}
-        # Counter for next available ID
-        self.next_id = 0
 
-        print(f"StudSarNeural network initialized with embedding dimension {self.embedding_dim}.")
-        print(f"Initial memory capacity: Dynamic (grows on-demand)")
+    @classmethod
+    def from_state(cls, embedding_dim, state, device=None, storage=None):
+        """Reads files of this module and of the package manager (metadata rebuilt from the emotion tags)."""
+        network = super().from_state(embedding_dim, state, device=device, storage=storage)
+        network.id_to_segment_metadata = state.get('id_to_segment_metadata') or {
+            marker_id: {"emotion": network.id_to_emotion[marker_id]} if marker_id in network.id_to_emotion else {}
+            for marker_id in network.id_to_segment}
+        return network
+
+    def to_state(self):
+        state = super().to_state()
+        state['id_to_segment_metadata'] = self.id_to_segment_metadata
+        return state
 
     def add_marker(self, segment_text, embedding_vector, metadata=None):
         """Adds a marker (embedding) to the network's memory."""
         if not isinstance(embedding_vector, np.ndarray):
-             print("Error: embedding_vector is not a numpy ndarray.")
-             return None
-        if embedding_vector.shape[0] != self.embedding_dim:
-             print(f"Error: Embedding dimension ({embedding_vector.shape[0]}) does not match network dimension ({self.embedding_dim}).") 
+             logger.error("embedding_vector is not a numpy ndarray.")
              return None
-
-        # Convert to tensor and move to correct device
-        embedding_tensor = torch.tensor(embedding_vector, dtype=torch.float32).to(self.device)
-
-        # Add embedding to memory tensor
-        # Dynamic expansion: create a new larger tensor and copy data
-        # Warning: Potentially expensive operation for very frequent updates!
-        new_memory = torch.cat((self.memory_embeddings, embedding_tensor.unsqueeze(0)), dim=0)
-        # Deregister old buffer and register new one (necessary when changing tensor)
-        if hasattr(self, 'memory_embeddings'):
-             del self._buffers['memory_embeddings']
-        self.register_buffer('memory_embeddings', new_memory)
-
-        # Store mapping
-        current_id = self.next_id
-        self.id_to_segment[current_id] = segment_text
-        
-        # Store metadata if provided
-        if metadata is not None:
+        metadata = metadata if metadata is not None else {}
+        current_id = super().add_marker(segment_text, embedding_vector, emotion=metadata.get("emotion"))
+        if current_id is not None:
+            # Store metadata if provided
             self.id_to_segment_metadata[current_id] = metadata
-        else:
-            self.id_to_segment_metadata[current_id] = {}
-
-        self.next_id += 1
         return current_id
 
-    def search_similar_markers(self, query_embedding, k=1):
-        """
-        Finds k most similar markers in network memory.
-        Returns indices, similarities and corresponding segments.
-        """
-        if self.next_id == 0: # Empty memory
-            return [], [], []
-
-        if not isinstance(query_embedding, np.ndarray):
-             print("Error: query_embedding is not a numpy ndarray.")
-             return [], [], []
-
-        # Convert query to tensor and move to device
-        query_tensor = torch.tensor(query_embedding, dtype=torch.float32).to(self.device).unsqueeze(0) # Shape: (1, embedding_dim)
-
-        try:
-            similarities = F.cosine_similarity(query_tensor, self.memory_embeddings, dim=1)
-
-        except Exception as e:
-             print(f"Error during similarity calculation: {e}")
-             return [], [], []
-
-        # Find top k indices and values
-        # Make sure k is not greater than available elements
-        actual_k = min(k, self.next_id)
-        if actual_k <= 0: return [], [], [] # Invalid k
-
-        top_k_similarities, top_k_indices = torch.topk(similarities, k=actual_k)
-
-        # Retrieve corresponding segments
-        top_k_segments = [self.id_to_segment[idx.item()] for idx in top_k_indices]
+    def set_emotion(self, marker_id, tag):
+        """Records an emotion tag in the marker metadata and the engine's emotion map."""
+        self.id_to_segment_metadata.setdefault(marker_id, {})["emotion"] = tag
+        self.id_to_emotion[marker_id] = tag
 
-        # Move results to CPU and convert to list/numpy if needed for output
-        top_k_indices_list = top_k_indices.cpu().tolist()
-        top_k_similarities_list = top_k_similarities.cpu().tolist()
-
-        return top_k_indices_list, top_k_similarities_list, top_k_segments
+    def remove_markers(self, marker_ids):
+        marker_ids = list(marker_ids)
+        removed = super().remove_markers(marker_ids)
+        for marker_id in marker_ids:
+            self.id_to_segment_metadata.pop(marker_id, None)
+        return removed
 
     def get_marker_by_id(self, marker_id):
         """Retrieves embedding and segment given an ID."""
-        if marker_id < 0 or marker_id >= self.next_id:
+        details = super().get_marker_by_id(marker_id)
+        if details is None:
             return None, None
-        embedding = self.memory_embeddings[marker_id].cpu().numpy()
-        segment = self.id_to_segment.get(marker_id, None)
-        return embedding, segment
-
-    def get_total_markers(self):
-        """Returns total number of stored markers."""
-        return self.next_id
+        return details["embedding"], details["segment"]
 
 
 # --- StudSar Manager Class ---
@@ -182,159 +88,185 @@ class StudSarManager:
     Manages interaction with StudSarNeural network and auxiliary operations
     (embedding generation, segmentation, persistence).
     """
-    def __init__(self, model_name='all-MiniLM-L6-v2', initial_capacity=1024):
+    def __init__(self, model_name='all-MiniLM-L6-v2', initial_capacity=1024, defer_emotions=False, emotion_batch_size=32,
+                 embedding_model=None, load_emotion_model=True, network=None, storage=None):
+        """
+        embedding_model: an already-loaded SentenceTransformer used instead of loading model_name (not registered).
+        load_emotion_model=False: search-only mode, the sentiment pipeline is never loaded.
+        network: an existing StudSarNeural to adopt (used by load) instead of allocating one.
+        storage: embedding storage backend of new networks ("memory", "mmap", "int8", see src.storage.embedding_storage).
+        """
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"StudSarManager will use device: {self.device}")
+        logger.debug("StudSarManager will use device: %s", self.device)
+        self.model_name = model_name
         # Load model 
-        self.embedding_generator = SentenceTransformer(model_name, device=self.device)
+        if embedding_model is not None:
+            self.embedding_generator = embedding_model
+        else:
+            self.embedding_generator = registry.get_embedding_model(model_name, self.device)
         self.embedding_dim = self.embedding_generator.get_sentence_embedding_dimension()
 
         # Initialize StudSar neural network
-        self.studsar_network = StudSarNeural(self.embedding_dim, initial_capacity, device=self.device).to(self.device)
+        if network is None:
+            network = StudSarNeural(self.embedding_dim, initial_capacity, device=self.device, storage=storage)
+        self.studsar_network = network.to(self.device)
+        self.storage = self.studsar_network.storage # Reused when build_network_from_text resets the network
         
         #  sentiment classifier "this optional"
-        try:
-            self._emotion_pipe: Pipeline = pipeline(
-                task="sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                device=0 if torch.cuda.is_available() else -1,
-            )
-            print("Sentiment pipeline loaded_emotion tagging enabled.")
-        except Exception as e:
-            self._emotion_pipe = None
-            print(f"Sentiment pipeline unavailable ({e}); emotion tags disabled.")
+        self._emotion_pipe = None
+        if not load_emotion_model:
+            logger.info("Search-only mode: sentiment pipeline not loaded, emotion tags disabled.")
+        else:
+            try:
+                self._emotion_pipe = registry.get_sentiment_pipeline(
+                    "cardiffnlp/twitter-roberta-base-sentiment-latest", self.device
+                )
+                logger.debug("Sentiment pipeline loaded, emotion tagging enabled.")
+            except Exception as e:
+                logger.warning("Sentiment pipeline unavailable (%s); emotion tags disabled.", e)
+        # Batched + cached tagging; with defer_emotions markers are stored as "pending"
+        # and a background worker fills the tags in
+        self._emotion_tagger = EmotionTagger(self._emotion_pipe, batch_size=emotion_batch_size) if self._emotion_pipe else None
+        self.defer_emotions = defer_emotions
+
+        logger.info("StudSarManager ready: embedding model %s (dim %d), network on %s.",
+                    model_name, self.embedding_dim, self.studsar_network.device)
+
 
-        print(f"\n--- StudSarManager Initialization ---")
-        print(f"Embedding Generator Model: {model_name} (Dim: {self.embedding_dim})")
-        print(f"StudSarNeural network ready on device: {self.studsar_network.device}")
-        print(f" Ye void bro \n")
-        
     def generate_embedding(self, text):
         """Generates embedding for a text using loaded model."""
         if not text or not isinstance(text, str): return None
-        embedding = self.embedding_generator.encode(text, convert_to_numpy=True)
+        with metrics.timer("encode"):
+            embedding = self.embedding_generator.encode(text, convert_to_numpy=True)
         return embedding
         
     # helper
-    def _get_emotion(self, text: str) -> str | None:
-        if not self._emotion_pipe:
-            return None
-        label = self._emotion_pipe(text[:512], truncation=True, max_length=512)[0]["label"]
-        # map model's labels → our tags
-        return {"Positive": "pleasant", "Neutral": "neutral", "Negative": "unpleasant"}.get(label, "neutral")
+    def _tag_markers(self, marker_ids, texts):
+        """Tags new markers now (batched) or, with defer_emotions, in the background."""
+        if not self._emotion_tagger or not marker_ids:
+            return
+        network = self.studsar_network
+        if self.defer_emotions:
+            for marker_id in marker_ids:
+                network.set_emotion(marker_id, PENDING_EMOTION)
+            # Bound to this network: a rebuild in the meantime must not receive stale tags
+            self._emotion_tagger.submit(marker_ids, texts, lambda ids, tags: self._set_emotions(network, ids, tags))
+        else:
+            with metrics.timer("emotion"):
+                tags = self._emotion_tagger.tag_batch(texts)
+            self._set_emotions(network, marker_ids, tags)
+
+    @staticmethod
+    def _set_emotions(network, marker_ids, tags):
+        for marker_id, tag in zip(marker_ids, tags):
+            if tag:
+                network.set_emotion(marker_id, tag)
+
+    def wait_for_emotions(self, timeout=None):
+        """Blocks until deferred emotion tags are filled in. Returns False on timeout."""
+        return self._emotion_tagger.wait(timeout) if self._emotion_tagger else True
 
     def build_network_from_text(self, text, segment_length=100, use_spacy_segmentation=True, spacy_sentences_per_segment=3):
         """Segments text and populates StudSarNeural network."""
-        print("\n--- Building StudSar Network from Text ---")
-        self.studsar_network = StudSarNeural(self.embedding_dim, device=self.device).to(self.device)
-        print("StudSarNeural network reset.")
+        logger.info("Building StudSar network from text (network reset)...")
+        self.studsar_network = StudSarNeural(self.embedding_dim, device=self.device, storage=self.storage).to(self.device)
 
-        segments = segment_text(text, segment_length, use_spacy_segmentation, spacy_sentences_per_segment)
+        with metrics.timer("segment"):
+            segments = segment_text(text, segment_length, use_spacy_segmentation, spacy_sentences_per_segment)
         if not segments:
-            print("No segments generated. Network construction interrupted.")
+            logger.warning("No segments generated. Network construction interrupted.")
             return
 
-        print(f"Generating and adding markers for {len(segments)} segments...")
-        added_count = 0
-        for i, seg in enumerate(segments):
-            if not seg.strip(): continue # Skip empty segments after join
-            embedding = self.generate_embedding(seg)
-            if embedding is not None:
-                emotion = self._get_emotion(seg)
-                metadata = {"emotion": emotion} if emotion else {}
-                
-                marker_id = self.studsar_network.add_marker(seg, embedding, metadata)
+        segments = [seg for seg in segments if seg.strip()] # Skip empty segments after join
+        logger.debug("Generating and adding markers for %d segments...", len(segments))
+        with metrics.timer("encode"):
+            embeddings = self.embedding_generator.encode(segments, convert_to_numpy=True)
+        added_ids, added_segments = [], []
+        with metrics.timer("insert"):
+            for i, (seg, embedding) in enumerate(zip(segments, embeddings)):
+                marker_id = self.studsar_network.add_marker(seg, embedding, {})
                 if marker_id is not None:
-                     added_count += 1
-            if (i + 1) % 50 == 0: print(f"  Processed {i+1}/{len(segments)} segments...")
+                    added_ids.append(marker_id)
+                    added_segments.append(seg)
+                if (i + 1) % 50 == 0: logger.debug("  Processed %d/%d segments...", i + 1, len(segments))
+        metrics.count("markers_added", len(added_ids))
+        # Emotions in batches (or in the background with defer_emotions)
+        self._tag_markers(added_ids, added_segments)
 
-        print(f"Added {added_count} markers to StudSar network.")
-        print(f"Network memory now contains: {self.studsar_network.get_total_markers()} markers.")
-        print("*** Network Construction Complete ***\n")
+        logger.info("Added %d markers to StudSar network (%d in memory).", len(added_ids), self.studsar_network.get_total_markers())
 
 
     def search(self, query_text, k=1):
         """Performs a search in StudSar network."""
-        print(f"\n--- Query Search ---")
-        print(f"Query: '{query_text}'")
+        logger.debug("Query search: %r", query_text)
         if not query_text or not isinstance(query_text, str):
-             print("Invalid query.")
+             logger.warning("Invalid query.")
              return [], [], [], []
 
         query_embedding = self.generate_embedding(query_text)
         if query_embedding is None:
-            print("Unable to generate embedding for query.")
+            logger.warning("Unable to generate embedding for query.")
             return [], [], [], []
 
         indices, similarities, segments = self.studsar_network.search_similar_markers(query_embedding, k=k)
         emotions = [self.studsar_network.id_to_segment_metadata.get(i, {}).get("emotion") for i in indices]
 
-        if not indices:
-             print("No results found.")
-        else:
-            print(f"Found {len(indices)} results:")
+        metrics.count("searches")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %d results.", len(indices))
             for i, (idx, sim, seg, emo) in enumerate(zip(indices, similarities, segments, emotions), 1):
-                print(f"{i}. ID={idx}  sim={sim:.4f}  emo={emo or '-'}  text='{seg[:90]}…'")
-
-        print("--- Search Complete ---\n")
+                logger.debug("%d. ID=%s  sim=%.4f  emo=%s  text=%r", i, idx, sim, emo or '-', seg[:90])
         return indices, similarities, segments, emotions
 
     def update_network(self, new_text_segment):
         """Adds a new segment to existing StudSar network."""
-        print("\n--- Updating StudSar Network ---")
-        print(f"Adding new segment: '{new_text_segment[:100]}...'") #here you can always change the number
         if not new_text_segment or not isinstance(new_text_segment, str):
-             print("Invalid segment for update.")
+             logger.warning("Invalid segment for update.")
              return None
+        logger.debug("Adding new segment: %r", new_text_segment[:100]) #here you can always change the number
 
         embedding = self.generate_embedding(new_text_segment)
         if embedding is None:
-            print("Unable to generate embedding for new segment.")
+            logger.warning("Unable to generate embedding for new segment.")
             return None
-            
-        emotion = self._get_emotion(new_text_segment)
-        metadata = {"emotion": emotion} if emotion else {}
 
-        marker_id = self.studsar_network.add_marker(new_text_segment, embedding, metadata)
+        with metrics.timer("insert"):
+            marker_id = self.studsar_network.add_marker(new_text_segment, embedding, {})
 
         if marker_id is not None:
-            print(f"New marker added with ID {marker_id}.")
-            print(f"Network memory now contains: {self.studsar_network.get_total_markers()} markers.")
-            print("--- Update Complete ---\n")
+            metrics.count("markers_added")
+            self._tag_markers([marker_id], [new_text_segment])
+            logger.debug("New marker added with ID %d (%d in memory).", marker_id, self.studsar_network.get_total_markers())
             return marker_id
         else:
-             print("Update failed.")
-             print(" *** Update Failed *** \n")
+             logger.error("Update failed.")
              return None
 
     def save(self, filepath="studsar_neural_memory.pth"):
         """Saves StudSarNeural network state and mappings."""
-        print(f"\n---> Saving StudSar State <---")
-        state = {
-            'network_state_dict': self.studsar_network.state_dict(),
-            'id_to_segment': self.studsar_network.id_to_segment,
-            'id_to_segment_metadata': self.studsar_network.id_to_segment_metadata,
-            'next_id': self.studsar_network.next_id,
-            'embedding_dim': self.studsar_network.embedding_dim,
-            'embedding_model_name': 'all-MiniLM-L18-10-v3' # Save actual model name instead of class name
-        }
+        # Let deferred tags land so they are persisted instead of "pending"
+        self.wait_for_emotions()
+        # Shared save format: readable by this module and by src.managers.manager.StudSarManager.load
+        state = self.studsar_network.to_state()
+        state['embedding_model_name'] = self.model_name # Save actual model name instead of class name
         try:
             torch.save(state, filepath)
-            print(f"StudSar state saved to: {filepath}")
-            print("---> Save Complete <---\n")
+            logger.info("StudSar state saved to: %s", filepath)
             return True
         except Exception as e:
-            print(f"Error during save: {e}")
-            print("---> Save Failed <---\n")
+            logger.error("Error during save: %s", e)
             return False
 
     @classmethod
-    def load(cls, filepath="studsar_neural_memory.pth", model_name=None):
-        """Loads state from file."""
-        print(f"\n---> Loading StudSar State <---")
+    def load(cls, filepath="studsar_neural_memory.pth", model_name=None, defer_emotions=False, embedding_model=None,
+             search_only=False):
+        """
+        Loads state from file in a single pass: the network is rebuilt from the saved tensors and
+        handed to the new manager. embedding_model reuses an already-loaded SentenceTransformer;
+        search_only skips the sentiment pipeline entirely.
+        """
         if not os.path.exists(filepath):
-            print(f"Error: File '{filepath}' not found.")
-            print("--->> Load Failed <<---\n")
+            logger.error("File '%s' not found.", filepath)
             return None
 
         try:
@@ -345,56 +277,44 @@ class StudSarManager:
             saved_model_name = state.get('embedding_model_name', state.get('embedding_generator_name'))
             if model_name is None:
                 model_name = saved_model_name if saved_model_name and saved_model_name != 'SentenceTransformer' else 'all-MiniLM-L6-v2' # Use saved or default
-                print(f"Loading will use embedding model: '{model_name}' (detected or default)")
+                logger.debug("Loading will use embedding model: '%s' (detected or default)", model_name)
             else:
-                 print(f"Loading will use embedding model: '{model_name}' (forced by user)")
+                 logger.debug("Loading will use embedding model: '%s' (forced by user)", model_name)
                  if saved_model_name and model_name != saved_model_name and saved_model_name != 'SentenceTransformer':
-                      print(f"Warning: Specified model '{model_name}' is different from saved model '{saved_model_name}'.")
+                      logger.warning("Specified model '%s' is different from saved model '%s'.", model_name, saved_model_name)
+
 
+            # Reconstruct network straight from the saved state (no throw-away allocation)
+            saved_embedding_dim = state.get('embedding_dim')
+            network = StudSarNeural.from_state(saved_embedding_dim, state, device=device)
 
-            # Create new manager instance
-            manager = cls(model_name=model_name)
+            # Create new manager instance around it
+            manager = cls(model_name=model_name, defer_emotions=defer_emotions, embedding_model=embedding_model,
+                          load_emotion_model=not search_only, network=network)
 
             # Verify embedding dimension consistency
-            saved_embedding_dim = state.get('embedding_dim')
             if saved_embedding_dim != manager.embedding_dim:
-                print(f"CRITICAL ERROR: Saved embedding dimension ({saved_embedding_dim}) "
-                      f"does not match loaded model dimension ({manager.embedding_dim}). Loading interrupted.")
-                print("--- Load Failed ---\n")
+                logger.critical("Saved embedding dimension (%s) does not match loaded model dimension (%d). Loading interrupted.",
+                                saved_embedding_dim, manager.embedding_dim)
                 return None
-
-            # Reconstruct network and load state
-            manager.studsar_network = StudSarNeural(manager.embedding_dim, device=manager.device).to(manager.device)
-            
-            # Prepare memory_embeddings with correct size before loading state_dict
-            if 'network_state_dict' in state and 'memory_embeddings' in state['network_state_dict']:
-                memory_shape = state['network_state_dict']['memory_embeddings'].shape
-                if memory_shape[0] > 0:  # If there are embeddings to load
-                    # Pre-allocate memory_embeddings with correct shape
-                    manager.studsar_network.register_buffer('memory_embeddings', 
-                                                           torch.zeros(memory_shape, device=manager.device))
-                    print(f"Pre-allocated memory_embeddings with shape {memory_shape}")
-            
-            # Now load the state dict
-            manager.studsar_network.load_state_dict(state['network_state_dict'])
-            manager.studsar_network.id_to_segment = state.get('id_to_segment', {})
-            manager.studsar_network.id_to_segment_metadata = state.get('id_to_segment_metadata', {})
-            manager.studsar_network.next_id = state.get('next_id', 0)
-
-            print(f"StudSar state loaded from: {filepath}")
-            print(f"Number of markers loaded: {manager.studsar_network.get_total_markers()}")
-            print("-*- Load Complete -*-\n")
+            # Markers saved while still "pending" are tagged again
+            pending = [(i, manager.studsar_network.id_to_segment[i])
+                       for i, meta in manager.studsar_network.id_to_segment_metadata.items()
+                       if meta.get("emotion") == PENDING_EMOTION and i in manager.studsar_network.id_to_segment]
+            if pending:
+                manager._tag_markers([i for i, _ in pending], [seg for _, seg in pending])
+
+            logger.info("StudSar state loaded from: %s (%d markers)", filepath, manager.studsar_network.get_total_markers())
             return manager
 
         except Exception as e:
-            print(f"General error during loading: {e}")
-            import traceback
-            traceback.print_exc() # Print stack trace for debug
-            print("-#-> Load Failed <-#-\n")
+            logger.error("General error during loading: %s", e, exc_info=True)
             return None
 
 #  Usage Example 
 if __name__ == "__main__":
+    from src.utils.instrumentation import set_log_level
+    set_log_level(logging.INFO)
 
     # EXAMPLE TEXT
     example_text = (
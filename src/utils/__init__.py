@@ -1,4 +1,8 @@
 """
 Utils module: contains utility functions for studsar.
 """
-from .text import segment_text, SPACY_AVAILABLE
\ No newline at end of file
+from .text import (segment_text, segment_texts, iter_segments, StreamingSegmenter, segment_text_by_tokens,
+                   TokenSegment, SPACY_AVAILABLE, REGEX_SEGMENTATION)
+from .sentences import RegexSentenceSplitter, split_sentences
+from .instrumentation import (metrics, Instrumentation, MetricsSink, InMemorySink, LoggingSink, PrometheusSink,
+                              get_logger, set_log_level)
@@ -0,0 +1,42 @@
+"""
+Length-bucketed batching helpers for StudSar's bulk encoding paths.
+
+Every encoder batch is padded to its longest member. Grouping segments of
+similar token length into the same batch removes most of that padding; the
+original order is restored afterwards so marker IDs stay deterministic.
+"""
+
+
+def length_buckets(lengths, batch_size):
+    """
+    Returns batches of indices (into lengths) grouped by length: indices are
+    sorted by decreasing length and cut into consecutive batches of batch_size.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def sequential_batches(count, batch_size):
+    """Batches of indices in original order (no bucketing)."""
+    return [list(range(i, min(i + batch_size, count))) for i in range(0, count, batch_size)]
+
+
+def padding_stats(lengths, batches, max_length=None):
+    """
+    Returns (real_tokens, padded_tokens) for the given batches, where every batch
+    is padded to its longest member (capped at max_length when given).
+    """
+    real = padded = 0
+    for batch in batches:
+        batch_lengths = [min(lengths[i], max_length) if max_length else lengths[i] for i in batch]
+        if not batch_lengths:
+            continue
+        real += sum(batch_lengths)
+        padded += max(batch_lengths) * len(batch_lengths)
+    return real, padded
+
+
+def padding_ratio(lengths, batches, max_length=None):
+    """Fraction of encoded positions that are padding (0.0 = no padding)."""
+    real, padded = padding_stats(lengths, batches, max_length)
+    return 1.0 - real / padded if padded else 0.0
@@ -0,0 +1,233 @@
+"""
+Instrumentation for StudSar: levelled logging and lightweight metrics.
+
+Logging: every module logs through a child of the "studsar" logger (get_logger), which
+has one stderr handler and shows warnings and errors by default. Progress banners and
+per-result lines are INFO / DEBUG and cost a single level check unless enabled with
+set_log_level(logging.INFO) (or DEBUG).
+
+Metrics: the hot paths report phase timings (segment, encode, emotion, insert,
+similarity, topk, id_mapping) and counters (markers_added, resizes, cache hits...) to
+the process-wide `metrics` object. Nothing is measured until a sink is attached:
+
+    from src.utils.instrumentation import metrics, InMemorySink
+    sink = metrics.add_sink(InMemorySink())
+    ...
+    sink.snapshot()   # {"counters": {...}, "timers": {"encode": {"count": ..., ...}}}
+
+Sinks: InMemorySink (snapshot), LoggingSink (one log record per event) and
+PrometheusSink (histograms rendered in the Prometheus text exposition format).
+"""
+
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+
+ROOT_LOGGER_NAME = "studsar"
+
+# Timer names used by the pipeline (any other name works too)
+TIMERS = ("segment", "encode", "emotion", "insert", "similarity", "topk", "id_mapping")
+
+_root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+if not _root_logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s — %(name)s — %(levelname)s — %(message)s"))
+    _root_logger.addHandler(_handler)
+    _root_logger.setLevel(logging.WARNING)
+
+
+def get_logger(name):
+    """Returns the 'studsar.<name>' logger."""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def set_log_level(level, name=None):
+    """Sets the level of the whole 'studsar' hierarchy, or of one 'studsar.<name>' logger."""
+    (get_logger(name) if name else _root_logger).setLevel(level)
+
+
+#  sinks
+class MetricsSink:
+    """Receives timing and counter events. Subclasses override timing() and count()."""
+    def timing(self, name, seconds):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+
+class InMemorySink(MetricsSink):
+    """Aggregates events in memory: counter totals and per-timer count / total / max."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timers = {} # name -> [count, total_seconds, max_seconds]
+
+    def timing(self, name, seconds):
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                self._timers[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Returns {"counters": {name: total}, "timers": {name: {count, total_seconds, mean_seconds, max_seconds}}}."""
+        with self._lock:
+            timers = {name: {"count": count, "total_seconds": total, "mean_seconds": total / count, "max_seconds": peak}
+                      for name, (count, total, peak) in self._timers.items()}
+            return {"counters": dict(self._counters), "timers": timers}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+class LoggingSink(MetricsSink):
+    """Writes every event as a log record (DEBUG on 'studsar.metrics' by default)."""
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or get_logger("metrics")
+        self.level = level
+
+    def timing(self, name, seconds):
+        self.logger.log(self.level, "timer %s %.6fs", name, seconds)
+
+    def count(self, name, value=1):
+        self.logger.log(self.level, "counter %s +%s", name, value)
+
+
+# Histogram bucket upper bounds in seconds (Prometheus client defaults, plus sub-millisecond ones)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PrometheusSink(InMemorySink):
+    """InMemorySink that also keeps a latency histogram per timer and renders the Prometheus text format."""
+    def __init__(self, prefix=ROOT_LOGGER_NAME, buckets=DEFAULT_BUCKETS):
+        super().__init__()
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._histograms = {}
+
+    def timing(self, name, seconds):
+        super().timing(name, seconds)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = [0] * (len(self.buckets) + 1) # Last slot: +Inf
+            histogram[bisect_left(self.buckets, seconds)] += 1
+
+    def reset(self):
+        super().reset()
+        with self._lock:
+            self._histograms.clear()
+
+    def _metric_name(self, name, suffix):
+        return re.sub(r"[^a-zA-Z0-9_:]", "_", f"{self.prefix}_{name}_{suffix}")
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {name: (stats[0], stats[1], list(self._histograms.get(name, ()))) for name, stats in self._timers.items()}
+        lines = []
+        for name in sorted(counters):
+            metric = self._metric_name(name, "total")
+            lines += [f"# TYPE {metric} counter", f"{metric} {counters[name]}"]
+        for name in sorted(timers):
+            count, total, histogram = timers[name]
+            metric = self._metric_name(name, "seconds")
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, hits in zip(self.buckets, histogram):
+                cumulative += hits
+                lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+            lines += [f'{metric}_bucket{{le="+Inf"}} {count}', f"{metric}_sum {total:.9f}", f"{metric}_count {count}"]
+        return "\n".join(lines) + "\n"
+
+
+#  instrumentation entry point
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.timing(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Instrumentation:
+    """
+    Dispatches timings and counters to the attached sinks. With no sink attached
+    timer() returns a shared no-op context manager and count() returns immediately.
+    """
+    def __init__(self):
+        self._sinks = ()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self._sinks)
+
+    @property
+    def sinks(self):
+        return self._sinks
+
+    def add_sink(self, sink):
+        """Attaches sink and returns it."""
+        with self._lock:
+            self._sinks = self._sinks + (sink,)
+        return sink
+
+    def remove_sink(self, sink):
+        with self._lock:
+            self._sinks = tuple(s for s in self._sinks if s is not sink)
+
+    def clear_sinks(self):
+        with self._lock:
+            self._sinks = ()
+
+    def timer(self, name):
+        """Context manager timing its block under name."""
+        return _Timer(self, name) if self._sinks else _NULL_TIMER
+
+    def timing(self, name, seconds):
+        for sink in self._sinks:
+            sink.timing(name, seconds)
+
+    def count(self, name, value=1):
+        for sink in self._sinks:
+            sink.count(name, value)
+
+
+# Process-wide instrumentation used by StudSar
+metrics = Instrumentation()
@@ -0,0 +1,98 @@
+"""
+Rule-based sentence boundary detection for StudSar.
+
+A pure-Python alternative to spaCy's sentence segmentation: precompiled regular
+expressions plus an abbreviation list. It needs no model download and is more
+than an order of magnitude faster than a spaCy pipeline, at the cost of some
+accuracy on unusual punctuation.
+"""
+
+import re
+
+# Lower-cased abbreviations (without the final dot) that do not end a sentence
+DEFAULT_ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "rev", "hon", "gen", "col", "lt", "sgt", "capt",
+    "inc", "ltd", "co", "corp", "plc", "llc", "dept", "univ", "assn", "bros",
+    "vs", "etc", "approx", "ca", "cf", "al", "fig", "figs", "eq", "eqs", "no", "nos", "vol", "vols",
+    "pp", "p", "ch", "sec", "art", "ed", "eds", "est", "min", "max", "avg", "misc", "ref", "refs",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+    "mon", "tue", "wed", "thu", "fri", "sat", "sun",
+    "e.g", "i.e", "u.s", "u.k", "u.n", "e.u", "a.m", "p.m", "ph.d", "m.sc", "b.sc",
+})
+
+# Sentence-final punctuation, optional closing quotes/brackets, then whitespace
+# and something that can start a sentence (capital letter, digit, opening quote/bracket).
+_BOUNDARY = re.compile(r"""([.!?…]+)(["'’”)\]]*)(\s+)(?=["'‘“(\[]?[A-Z0-9À-Ý])""")
+# Blank lines always separate sentences
+_PARAGRAPH = re.compile(r"\n\s*\n")
+# The word (possibly dotted, like "e.g") right before the final punctuation
+_LAST_WORD = re.compile(r"([\w.]+)$")
+# Only this many characters before a boundary are inspected for an abbreviation
+_MAX_WORD_LOOKBACK = 32
+
+
+class RegexSentenceSplitter:
+    """
+    Splits text into sentences with precompiled patterns.
+    A boundary is sentence-final punctuation followed by whitespace and an
+    uppercase letter / digit, unless the preceding word is a known abbreviation
+    or a single-letter initial ("J. R. R. Tolkien").
+    """
+    def __init__(self, abbreviations=None):
+        self.abbreviations = frozenset(a.lower().rstrip(".") for a in (abbreviations or DEFAULT_ABBREVIATIONS))
+
+    def _is_abbreviation(self, text, punct_start):
+        match = _LAST_WORD.search(text, max(0, punct_start - _MAX_WORD_LOOKBACK), punct_start)
+        if not match:
+            return False
+        word = match.group(1).lower().strip(".")
+        if not word:
+            return False
+        if len(word) == 1 and word.isalpha():
+            return True # Initials
+        return word in self.abbreviations
+
+    def spans(self, text):
+        """Returns (start, end) character offsets of every sentence in text."""
+        spans = []
+        for p_start, p_end in self._paragraph_spans(text):
+            start = p_start
+            for match in _BOUNDARY.finditer(text, p_start, p_end):
+                if match.group(1) == "." and self._is_abbreviation(text, match.start(1)):
+                    continue
+                end = match.end(2)
+                spans.append((start, end))
+                start = match.end(3)
+            spans.append((start, p_end))
+        return [(s, e) for s, e in spans if text[s:e].strip()]
+
+    @staticmethod
+    def _paragraph_spans(text):
+        start = 0
+        for match in _PARAGRAPH.finditer(text):
+            yield start, match.start()
+            start = match.end()
+        yield start, len(text)
+
+    def split(self, text):
+        """Returns the list of stripped sentences in text."""
+        return [text[s:e].strip() for s, e in self.spans(text)]
+
+    def split_with_tail(self, text):
+        """
+        Returns (complete sentences, offset of the last sentence). The last sentence
+        may be cut by a chunk boundary, so streaming callers carry text[offset:] over.
+        """
+        spans = self.spans(text)
+        if not spans:
+            return [], len(text)
+        return [text[s:e].strip() for s, e in spans[:-1]], spans[-1][0]
+
+
+# Shared default instance
+default_splitter = RegexSentenceSplitter()
+
+
+def split_sentences(text):
+    """Splits text into sentences with the default RegexSentenceSplitter."""
+    return default_splitter.split(text)
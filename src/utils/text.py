@@ -2,33 +2,69 @@
 Text segmentation utility module in StudSar.
 """
 
+import logging
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
+import re
+from typing import NamedTuple
+from .sentences import default_splitter as regex_splitter
+from .instrumentation import get_logger
+
+logger = get_logger("text")
+
+# Value of use_spacy that selects the spaCy-free rule-based sentence segmenter
+REGEX_SEGMENTATION = "regex"
+
+# Pipeline components that are not needed to find sentence boundaries.
+# Sentence splitting only needs the lightweight "senter" (or the parser as last resort).
+NON_SENTENCE_COMPONENTS = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+
+# Paragraph breaks: sentences never cross them, so paragraphs can be processed as separate docs
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+def load_sentence_pipeline(model_name):
+    """
+    Loads a spaCy pipeline reduced to sentence segmentation: every component except
+    the senter is excluded. Falls back to the full pipeline if the model has no senter.
+    """
+    try:
+        sent_nlp = spacy.load(model_name, exclude=NON_SENTENCE_COMPONENTS)
+        if "senter" in sent_nlp.disabled:
+            sent_nlp.enable_pipe("senter")
+        if not sent_nlp.has_pipe("senter"):
+            raise ValueError(f"'{model_name}' has no senter component")
+        sent_nlp("Sanity check. Two sentences.") # Fails early if the senter depends on an excluded component
+        return sent_nlp
+    except OSError:
+        raise # Model not installed
+    except Exception as e:
+        logger.warning("Sentence-only pipeline unavailable (%s); using the full '%s' pipeline.", e, model_name)
+        return spacy.load(model_name)
+
 # Here I made an attempt to import spaCy, but it handled as optional
 try:
     import spacy
     SPACY_MODEL_NAME = "en_core_web_sm"
     try:
-        nlp = spacy.load(SPACY_MODEL_NAME)
-        print(f"SpaCy model '{SPACY_MODEL_NAME}' loaded.")
+        nlp = load_sentence_pipeline(SPACY_MODEL_NAME)
+        logger.debug("SpaCy model '%s' loaded (sentence segmentation only: %s).", SPACY_MODEL_NAME, nlp.pipe_names)
         SPACY_AVAILABLE = True
     except Exception as e:
         nlp = None
         SPACY_AVAILABLE = False
-        print(f"SpaCy model '{SPACY_MODEL_NAME}' not loaded ({e}). Word segmentation will be used as fallback.")
+        logger.info("SpaCy model '%s' not loaded (%s). Regex sentence segmentation will be used as fallback.", SPACY_MODEL_NAME, e)
 except ImportError:
     spacy = None
     nlp = None
     SPACY_AVAILABLE = False
-    print("SpaCy not installed. Word segmentation will be used as fallback.")
-    print("To install spaCy (optional): pip install spacy && python -m spacy download en_core_web_sm")
+    logger.info("SpaCy not installed. Regex sentence segmentation will be used as fallback. "
+                "To install spaCy (optional): pip install spacy && python -m spacy download en_core_web_sm")
 
 # NEWV2: Placeholder for Transformer Segmentation 
 def segment_text_transformer_placeholder(text):
     """Placeholder function for transformer-based segmentation."""
-    print("\n--- Using Transformer Segmentation (Placeholder) ---")
-    print("WARNING: Transformer segmentation model not implemented. Falling back to basic segmentation.")
+    logger.warning("Transformer segmentation model not implemented. Falling back to basic segmentation.")
     # In a real implementation:
     # - Load the fine-tuned transformer model.
     # - Tokenize the input text.
@@ -40,27 +76,280 @@ def segment_text_transformer_placeholder(text):
     return segment_text(text, use_spacy=False) # Use word-based as fallback here
 #  end  
 
-def segment_text(text, segment_length=100, use_spacy=True, spacy_sentences_per_segment=3):
-    """Segments the text (words or sentences via spaCy)."""
-    segments = []
-    #  heare -> spaCy for the user
-    if use_spacy and SPACY_AVAILABLE and nlp:
+def _split_paragraphs(text):
+    """Splits text on blank lines, dropping empty paragraphs."""
+    return [p for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
+
+def _group_sentences(sentences, sentences_per_segment):
+    """Joins consecutive sentences into segments of sentences_per_segment sentences."""
+    return [" ".join(sentences[i:i + sentences_per_segment]) for i in range(0, len(sentences), sentences_per_segment)]
+
+def _sentence_mode(use_spacy):
+    """
+    Resolves the use_spacy argument: True -> "spacy" (or "regex" when spaCy is not
+    available, so sentences are never cut in half), "regex" -> "regex", False -> None (word windows).
+    """
+    if use_spacy == REGEX_SEGMENTATION:
+        return REGEX_SEGMENTATION
+    if use_spacy:
+        return "spacy" if (SPACY_AVAILABLE and nlp) else REGEX_SEGMENTATION
+    return None
+
+def _word_segments(text, segment_length):
+    """Fixed-size word windows (fallback when spaCy is unavailable)."""
+    words = text.split()
+    return [" ".join(words[i:i + segment_length]) for i in range(0, len(words), segment_length)]
+
+def iter_spacy_sentences(texts, batch_size=64, n_process=1):
+    """
+    Yields the list of sentences of every text in texts, in order.
+    Each text is split into paragraphs and all paragraphs go through a single
+    nlp.pipe() call, so long texts and many documents are processed in batches
+    (and across n_process worker processes when n_process > 1).
+    """
+    paragraph_counts = []
+    def _paragraphs():
+        for text in texts:
+            paragraphs = _split_paragraphs(text or "")
+            paragraph_counts.append(len(paragraphs))
+            yield from paragraphs
+
+    docs = nlp.pipe(_paragraphs(), batch_size=batch_size, n_process=n_process)
+    text_index, sentences = 0, []
+    for doc in docs:
+        # Emit every finished text (including texts with no paragraphs) before consuming this doc
+        while len(paragraph_counts) > text_index and paragraph_counts[text_index] == 0:
+            yield sentences
+            text_index, sentences = text_index + 1, []
+        sentences.extend(sent.text.strip() for sent in doc.sents if sent.text.strip())
+        paragraph_counts[text_index] -= 1
+    while text_index < len(paragraph_counts):
+        yield sentences
+        text_index, sentences = text_index + 1, []
+
+def _segment_texts(texts, segment_length, use_spacy, spacy_sentences_per_segment, batch_size, n_process):
+    texts = list(texts)
+    results = None
+    mode = _sentence_mode(use_spacy)
+    if mode == REGEX_SEGMENTATION:
+        results = [_group_sentences(regex_splitter.split(text or ""), spacy_sentences_per_segment) for text in texts]
+    elif mode == "spacy":
         try:
-            doc = nlp(text)
-            sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
-            if not sentences: return []
-            for i in range(0, len(sentences), spacy_sentences_per_segment):
-                segments.append(" ".join(sentences[i:i + spacy_sentences_per_segment]))
+            results = [_group_sentences(sentences, spacy_sentences_per_segment)
+                       for sentences in iter_spacy_sentences(texts, batch_size=batch_size, n_process=n_process)]
         except Exception as e:
-            print(f"SpaCy error, fallback to words: {e}")
-            use_spacy = False # Force fallback
+            logger.warning("SpaCy error, fallback to words: %s", e)
+            results = None
     # Fallback to word-based segmentation
-    if not (use_spacy and SPACY_AVAILABLE and nlp): 
-        words = text.split()
-        if not words: return []
-        for i in range(0, len(words), segment_length):
-            segments.append(" ".join(words[i:i + segment_length]))
+    if results is None:
+        results = [_word_segments(text or "", segment_length) for text in texts]
     # Filter empty segments
-    segments = [seg for seg in segments if seg.strip()]
-    print(f"Text segmented into {len(segments)} blocks.")
-    return segments
\ No newline at end of file
+    return [[seg for seg in segments if seg.strip()] for segments in results]
+
+def segment_texts(texts, segment_length=100, use_spacy=True, spacy_sentences_per_segment=3, batch_size=64, n_process=1):
+    """
+    Segments many texts at once. Returns one list of segments per input text.
+    With spaCy, all texts are processed through one batched nlp.pipe() call.
+    use_spacy=True uses spaCy, use_spacy="regex" the rule-based sentence splitter
+    and use_spacy=False fixed windows of segment_length words.
+    """
+    results = _segment_texts(texts, segment_length, use_spacy, spacy_sentences_per_segment, batch_size, n_process)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%d texts segmented into %d blocks.", len(results), sum(len(r) for r in results))
+    return results
+
+def segment_text(text, segment_length=100, use_spacy=True, spacy_sentences_per_segment=3, batch_size=64, n_process=1):
+    """Segments the text (words, sentences via spaCy, or sentences via regex with use_spacy="regex")."""
+    segments = _segment_texts([text], segment_length, use_spacy, spacy_sentences_per_segment, batch_size, n_process)[0]
+    logger.debug("Text segmented into %d blocks.", len(segments))
+    return segments
+
+#  Streaming segmentation (bounded memory for very large texts)
+def _iter_chunks(source, chunk_size):
+    """Yields text chunks from a string, a file object (read in chunk_size pieces) or an iterable of strings."""
+    if isinstance(source, str):
+        for i in range(0, len(source), chunk_size):
+            yield source[i:i + chunk_size]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk.decode("utf-8", errors="replace") if isinstance(chunk, bytes) else chunk
+    else:
+        for chunk in source:
+            yield chunk.decode("utf-8", errors="replace") if isinstance(chunk, bytes) else chunk
+
+def _spacy_split(buffer):
+    """Returns (complete sentences, offset of the trailing possibly-incomplete sentence)."""
+    sents = list(nlp(buffer).sents)
+    if not sents:
+        return [], len(buffer)
+    complete = [sent.text.strip() for sent in sents[:-1] if sent.text.strip()]
+    return complete, sents[-1].start_char
+
+class StreamingSegmenter:
+    """
+    Iterable that reads text incrementally and yields segments without ever
+    materialising the whole text, its Doc or the full segment list.
+    The trailing (possibly cut) sentence or word of every chunk is carried over
+    and completed with the next chunk, so chunk boundaries never split sentences.
+    Output matches segment_text() for the same settings (up to paragraph handling).
+    """
+    def __init__(self, source, segment_length=100, use_spacy=True, spacy_sentences_per_segment=3,
+                 chunk_size=64 * 1024, max_carry_chars=None):
+        self.source = source
+        self.segment_length = segment_length
+        self.use_spacy = use_spacy
+        self.spacy_sentences_per_segment = spacy_sentences_per_segment
+        self.chunk_size = chunk_size
+        # A "sentence" longer than this is flushed as-is so memory stays bounded
+        self.max_carry_chars = max_carry_chars or 8 * chunk_size
+
+    def _splitter(self):
+        mode = _sentence_mode(self.use_spacy)
+        if mode == "spacy":
+            return _spacy_split
+        if mode == REGEX_SEGMENTATION:
+            return regex_splitter.split_with_tail
+        return None
+
+    def __iter__(self):
+        splitter = self._splitter()
+        if splitter is None:
+            yield from self._iter_word_segments()
+        else:
+            yield from self._iter_sentence_segments(splitter)
+
+    def _iter_sentence_segments(self, splitter):
+        per_segment = self.spacy_sentences_per_segment
+        pending, carry = [], ""
+        for chunk in _iter_chunks(self.source, self.chunk_size):
+            buffer = carry + chunk
+            sentences, tail_start = splitter(buffer)
+            carry = buffer[tail_start:]
+            if len(carry) > self.max_carry_chars:
+                sentences.append(carry.strip())
+                carry = ""
+            for sentence in sentences:
+                if not sentence:
+                    continue
+                pending.append(sentence)
+                if len(pending) == per_segment:
+                    yield " ".join(pending)
+                    pending = []
+        if carry.strip():
+            final, tail_start = splitter(carry)
+            pending.extend(final)
+            if carry[tail_start:].strip():
+                pending.append(carry[tail_start:].strip())
+        for i in range(0, len(pending), per_segment):
+            yield " ".join(pending[i:i + per_segment])
+
+    def _iter_word_segments(self):
+        words, carry = [], ""
+        for chunk in _iter_chunks(self.source, self.chunk_size):
+            buffer = carry + chunk
+            # Keep a word that may continue in the next chunk
+            cut = max(buffer.rfind(" "), buffer.rfind("\n"), buffer.rfind("\t"), buffer.rfind("\r"))
+            if cut < 0 and len(buffer) <= self.max_carry_chars:
+                carry = buffer
+                continue
+            carry = buffer[cut + 1:] if cut >= 0 else ""
+            words.extend(buffer[:cut + 1].split() if cut >= 0 else [buffer])
+            while len(words) >= self.segment_length:
+                yield " ".join(words[:self.segment_length])
+                del words[:self.segment_length]
+        words.extend(carry.split())
+        for i in range(0, len(words), self.segment_length):
+            yield " ".join(words[i:i + self.segment_length])
+
+def iter_segments(source, segment_length=100, use_spacy=True, spacy_sentences_per_segment=3, chunk_size=64 * 1024):
+    """Streaming counterpart of segment_text(): yields segments from a string, file object or iterable of strings."""
+    return iter(StreamingSegmenter(source, segment_length=segment_length, use_spacy=use_spacy,
+                                   spacy_sentences_per_segment=spacy_sentences_per_segment, chunk_size=chunk_size))
+
+
+#  Token-budget segmentation (aligned to the encoder's max_seq_length)
+class TokenSegment(NamedTuple):
+    """A segment and its length in encoder tokens (special tokens included)."""
+    text: str
+    num_tokens: int
+
+def count_tokens(tokenizer, texts):
+    """Token counts (without special tokens) for a list of texts, batched when the tokenizer allows it."""
+    if not texts:
+        return []
+    if callable(tokenizer):
+        try:
+            return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+        except (TypeError, KeyError):
+            pass
+    return [len(tokenizer.tokenize(t)) for t in texts]
+
+def _num_special_tokens(tokenizer):
+    if hasattr(tokenizer, "num_special_tokens_to_add"):
+        return tokenizer.num_special_tokens_to_add(pair=False)
+    return 2 # [CLS] ... [SEP]
+
+def _split_long_sentence(sentence, tokenizer, budget):
+    """Splits a sentence that exceeds the budget into word windows that fit."""
+    words = sentence.split()
+    pieces, current, current_tokens = [], [], 0
+    for word, n in zip(words, count_tokens(tokenizer, words)):
+        if current and current_tokens + n > budget:
+            pieces.append((" ".join(current), current_tokens))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += n
+    if current:
+        pieces.append((" ".join(current), current_tokens))
+    return pieces
+
+def _split_sentences(text, use_spacy):
+    mode = _sentence_mode(use_spacy) or REGEX_SEGMENTATION
+    if mode == "spacy":
+        try:
+            return next(iter_spacy_sentences([text]))
+        except Exception as e:
+            logger.warning("SpaCy error, fallback to regex sentences: %s", e)
+    return regex_splitter.split(text)
+
+def segment_text_by_tokens(text, tokenizer, max_tokens=256, overlap_sentences=0, use_spacy=True):
+    """
+    Packs whole sentences into segments of at most max_tokens encoder tokens
+    (special tokens included), so nothing is silently truncated by the encoder.
+    Sentences longer than the budget are split into word windows.
+    overlap_sentences repeats the last N sentences of a segment at the start of the next one.
+    Returns a list of TokenSegment(text, num_tokens).
+    Token counts are per sentence, so for BPE tokenizers they can be off by a token at joins.
+    """
+    special = _num_special_tokens(tokenizer)
+    budget = max_tokens - special
+    if budget <= 0:
+        raise ValueError(f"max_tokens ({max_tokens}) must exceed the {special} special tokens.")
+
+    sentences = _split_sentences(text, use_spacy)
+    units = [] # (sentence text, token count), every unit fits in the budget
+    for sentence, n in zip(sentences, count_tokens(tokenizer, sentences)):
+        if n > budget:
+            units.extend(_split_long_sentence(sentence, tokenizer, budget))
+        elif n > 0:
+            units.append((sentence, n))
+
+    segments, current = [], []
+    current_tokens = 0
+    for unit in units:
+        if current and current_tokens + unit[1] > budget:
+            segments.append(TokenSegment(" ".join(u[0] for u in current), current_tokens + special))
+            # Carry the overlap, but always leave room for the new unit
+            current = current[-overlap_sentences:] if overlap_sentences > 0 else []
+            current_tokens = sum(u[1] for u in current)
+            while current and current_tokens + unit[1] > budget:
+                current_tokens -= current.pop(0)[1]
+        current.append(unit)
+        current_tokens += unit[1]
+    if current:
+        segments.append(TokenSegment(" ".join(u[0] for u in current), current_tokens + special))
+    logger.debug("Text segmented into %d token-budgeted blocks (max %d tokens).", len(segments), max_tokens)
+    return segments
@@ -11,6 +11,14 @@ sys.path.insert(0, project_root)
 
 # Import the updated StudSAREngine
 from studsar_rag import StudSAREngine
+from src.managers.feedback import FeedbackQueue
+
+
+@st.cache_resource
+def get_feedback_queue(knowledge_base_path: str = "knowledge_base.json") -> FeedbackQueue:
+    """One feedback queue per server process: 👍/👎 become reputation of the knowledge-base entries."""
+    return FeedbackQueue(StudSAREngine(knowledge_base_path).update_reputation_many)
+
 
 # Initialize session state variables
 if 'studsar_engine' not in st.session_state:
@@ -356,18 +364,25 @@ with st.sidebar:
 # Main chat interface
 st.markdown("### 💬 Chat with StudSAR")
 
-def render_feedback_buttons(message_id: str):
+def submit_feedback(message_id: str, signal: str, query: str, sources: List[Dict]):
+    """Records feedback once per message and hands it to the background feedback queue."""
+    if st.session_state.user_feedback.get(message_id) == signal:
+        return
+    st.session_state.user_feedback[message_id] = signal
+    get_feedback_queue().submit(query, [source["key"] for source in sources if source.get("key")], signal)
+
+def render_feedback_buttons(message_id: str, query: str = "", sources: List[Dict] = None):
     """Render feedback buttons for a message."""
     col1, col2, col3 = st.columns([1, 1, 8])
     
     with col1:
         if st.button("👍", key=f"thumbs_up_{message_id}"):
-            st.session_state.user_feedback[message_id] = "positive"
+            submit_feedback(message_id, "positive", query, sources or [])
             st.success("Thank you for your feedback!")
     
     with col2:
         if st.button("👎", key=f"thumbs_down_{message_id}"):
-            st.session_state.user_feedback[message_id] = "negative"
+            submit_feedback(message_id, "negative", query, sources or [])
             st.info("Thank you for your feedback! We'll work to improve.")
 
 # Display chat history
@@ -387,7 +402,7 @@ for i, message in enumerate(st.session_state.messages):
             st.markdown(f'<span class="{confidence_class}">Confidence: {confidence:.2f}</span>', unsafe_allow_html=True)
             
             # Render feedback buttons
-            render_feedback_buttons(f"msg_{i}")
+            render_feedback_buttons(f"msg_{i}", message["metadata"].get("query", ""), message["metadata"].get("sources", []))
             
             # Display sources if enabled
             if st.session_state.show_sources and message["metadata"].get("sources"):
@@ -429,6 +444,7 @@ def process_query(prompt: str):
                 "sources": sources,
                 "confidence": confidence,
                 "query_type": query_type,
+                "query": prompt,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -439,7 +455,7 @@ def process_query(prompt: str):
             })
             
             # Render feedback buttons
-            render_feedback_buttons(f"msg_{len(st.session_state.messages)-1}")
+            render_feedback_buttons(f"msg_{len(st.session_state.messages)-1}", prompt, sources)
             
             # Display sources if enabled
             if st.session_state.show_sources and sources:
@@ -0,0 +1,9 @@
+"""
+App-local copy of the StudSar package. Modules this copy does not ship (utils,
+managers.feedback, ...) are resolved from the StudSar package at the repository root.
+"""
+import os
+
+_CORE_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "src")
+if os.path.isdir(_CORE_SRC):
+    __path__.append(_CORE_SRC)
@@ -0,0 +1,7 @@
+# Managers missing from this copy (feedback, usage_buffer, ...) come from the StudSar package (see src/__init__.py)
+import os
+
+_CORE_MANAGERS = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+                              "src", "managers")
+if os.path.isdir(_CORE_MANAGERS):
+    __path__.append(_CORE_MANAGERS)
@@ -1,15 +1,71 @@
 import json
+import math
 import re
 import os
-from typing import Dict, List, Tuple, Any
+import threading
+from typing import Dict, List, Tuple, Any, Iterable
+
+
+class ReputationStore:
+    """Reputation score per knowledge-base entry, learned from user feedback and kept in a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.scores = self._load()
+
+    def _load(self) -> Dict[str, float]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return {str(k): float(v) for k, v in json.load(f).items()}
+        except (ValueError, OSError) as e:
+            print(f"Could not read reputation scores from {self.path}: {e}. Starting from zero.")
+        return {}
+
+    def get(self, key: str) -> float:
+        return self.scores.get(key, 0.0)
+
+    def update_reputation_many(self, keys: Iterable[str], deltas: Iterable[float]) -> int:
+        """Adds one delta per key in a single update and saves the scores. Returns the number of keys updated."""
+        with self._lock:
+            updated = 0
+            for key, delta in zip(keys, deltas):
+                self.scores[key] = self.scores.get(key, 0.0) + float(delta)
+                updated += 1
+            if updated:
+                self.save()
+        return updated
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.scores, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+_reputation_stores: Dict[str, ReputationStore] = {}
+_reputation_stores_lock = threading.Lock()
+
+
+def reputation_store(path: str) -> ReputationStore:
+    """Process-wide store for path, shared by every engine (and Streamlit session) using it."""
+    path = os.path.abspath(path)
+    with _reputation_stores_lock:
+        if path not in _reputation_stores:
+            _reputation_stores[path] = ReputationStore(path)
+        return _reputation_stores[path]
+
 
 class StudSAREngine:
     """Enhanced StudSAR RAG implementation with improved features."""
     
-    def __init__(self, knowledge_base_path: str = "knowledge_base.json"):
+    def __init__(self, knowledge_base_path: str = "knowledge_base.json", reputation_path: str = None):
         self.knowledge_base_path = knowledge_base_path
         self.knowledge_base = self.load_knowledge_base()
         self.query_history = []
+        # Feedback-learned reputation per entry key (see update_reputation_many)
+        self.reputation = reputation_store(reputation_path or os.path.splitext(knowledge_base_path)[0] + "_reputation.json")
         
     def load_knowledge_base(self) -> Dict[str, Dict[str, str]]:
         """Load knowledge base from JSON file or use default if file doesn't exist."""
@@ -133,6 +189,8 @@ class StudSAREngine:
             score += self._calculate_semantic_relevance(query_words, content_words)
             
             if score > 0:
+                # Reputation from user feedback re-weights matching entries (bounded to 0x..2x)
+                score *= 1 + math.tanh(self.reputation.get(key) * 0.1)
                 scored_entries.append((score, content, key, url))
         
         return scored_entries
@@ -354,6 +412,10 @@ I'm here to help you navigate the complexities of the UK Civil Service. Please a
         
         return sources
     
+    def update_reputation_many(self, keys: Iterable[str], deltas: Iterable[float]) -> int:
+        """Bulk reputation update of knowledge-base entries (the target of the app's feedback queue)."""
+        return self.reputation.update_reputation_many(keys, deltas)
+
     def get_query_history(self) -> List[str]:
         """Get the query history."""
         return self.query_history.copy()
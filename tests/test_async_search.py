@@ -0,0 +1,90 @@
+"""
+Unit tests for the asyncio search coalescer used by StudSarManager.asearch().
+"""
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.managers.async_support import SearchCoalescer  # noqa: E402
+
+
+def _fake_search_batch(calls):
+    def search_batch(queries, ks):
+        calls.append(list(queries))
+        return [([i] * k, [1.0] * k, [q] * k) for i, (q, k) in enumerate(zip(queries, ks))]
+    return search_batch
+
+
+def test_concurrent_submits_are_coalesced():
+    calls = []
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            coalescer = SearchCoalescer(_fake_search_batch(calls), pool, max_batch_size=64, max_wait_ms=5)
+            return await asyncio.gather(*[coalescer.submit(f"q{i}", k=1 + i % 3) for i in range(10)])
+
+    results = asyncio.run(main())
+    assert len(calls) == 1 and len(calls[0]) == 10
+    for i, (ids, sims, segs) in enumerate(results):
+        assert len(ids) == 1 + i % 3
+        assert segs[0] == f"q{i}"
+
+
+def test_cancelled_and_timed_out_requests_are_dropped():
+    calls = []
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            coalescer = SearchCoalescer(_fake_search_batch(calls), pool, max_batch_size=64, max_wait_ms=20)
+            cancelled = asyncio.ensure_future(coalescer.submit("cancel-me"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(coalescer.submit("too-slow"), timeout=0.001)
+            return await coalescer.submit("kept")
+
+    ids, _, segs = asyncio.run(main())
+    assert segs == ["kept"]
+    assert calls == [["kept"]]
+
+
+def test_errors_propagate_to_every_waiter():
+    def failing(queries, k):
+        raise RuntimeError("encoder down")
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            coalescer = SearchCoalescer(failing, pool, max_batch_size=2, max_wait_ms=5)
+            return await asyncio.gather(coalescer.submit("a"), coalescer.submit("b"), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_mixed_k_batch_counts_only_delivered_hits():
+    pytest.importorskip("torch")
+    from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32),
+                             coalesce_window_ms=20)
+    manager.add_segments([f"segment number {i} about topic {i % 4}" for i in range(12)])
+
+    async def main():
+        results = await asyncio.gather(manager.asearch("topic 1", k=1), manager.asearch("topic 2", k=10))
+        return results, manager._coalescer.batches_dispatched
+
+    try:
+        results, batches = asyncio.run(main())
+    finally:
+        manager.close()
+    assert batches == 1
+    assert [len(ids) for ids, _, _ in results] == [1, 10]
+    assert sum(manager.studsar_network.id_to_usage.values()) == 11
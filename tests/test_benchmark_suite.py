@@ -0,0 +1,27 @@
+"""
+Smoke test of the benchmark suite on a tiny corpus with the offline stub encoder.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("torch")
+
+
+def test_suite_reports_every_measurement_as_json():
+    from benchmarks.bench_suite import run
+
+    results = run(sizes=[300], ks=[1, 5], num_queries=5, isolate=False, stub_dim=32)
+    size = json.loads(json.dumps(results))["sizes"][0]
+    assert size["ingestion"]["markers"] == 300
+    assert set(size["ingestion"]["phases"]) == {"segment", "encode", "insert"}
+    assert size["search"]["k=5"]["samples"] == 5
+    assert size["search"]["k=1"]["p50_ms"] <= size["search"]["k=1"]["p99_ms"]
+    assert set(size["persistence"]) == {"legacy", "columnar"}
+    assert "error" not in size["persistence"]["columnar"]
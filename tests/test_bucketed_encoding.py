@@ -0,0 +1,39 @@
+"""
+Length-bucketed bulk encoding: padding accounting and order restoration.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.utils.batching import length_buckets, padding_ratio, sequential_batches  # noqa: E402
+
+
+def test_length_buckets_cover_every_index_once():
+    lengths = [5, 100, 7, 99, 6, 98, 1]
+    batches = length_buckets(lengths, 2)
+    assert sorted(i for b in batches for i in b) == list(range(len(lengths)))
+    assert batches[0] == [1, 3]
+    assert padding_ratio(lengths, batches) < padding_ratio(lengths, sequential_batches(len(lengths), 2))
+
+
+def test_bulk_insert_restores_original_order():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("torch")
+    from benchmarks.stub_encoder import STUB_MODEL_NAME, register_stub_encoder
+    from src.managers.manager import StudSarManager
+
+    register_stub_encoder(dim=64)
+    manager = StudSarManager(model_name=STUB_MODEL_NAME)
+    segments = [("long segment " * (i % 9 + 1)) + f"number {i}" for i in range(50)]
+    marker_ids = manager.add_segments(segments, batch_size=8)
+
+    assert marker_ids == list(range(50))
+    for marker_id, seg in zip(marker_ids, segments):
+        details = manager.studsar_network.get_marker_by_id(marker_id)
+        assert details["segment"] == seg
+        assert np.allclose(details["embedding"], manager.generate_embedding(seg), atol=1e-6)
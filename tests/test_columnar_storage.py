@@ -0,0 +1,73 @@
+"""
+Columnar save format: round trip, lazy memory-mapped columns and legacy compatibility.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, register_stub_encoder  # noqa: E402
+from src.storage.columnar import ColumnMap  # noqa: E402
+
+SEGMENTS = ["Budget report for the finance department.", "Neural memory retrieval with embeddings.",
+            "Policy guidance for civil service records — café, naïve.", "Semantic search over text segments."]
+
+
+@pytest.fixture
+def manager():
+    from src.managers.manager import StudSarManager
+    register_stub_encoder(dim=32)
+    manager = StudSarManager(model_name=STUB_MODEL_NAME)
+    manager.add_segments(SEGMENTS[:2], emotion="neutral")
+    manager.add_segments(SEGMENTS[2:])
+    manager.update_marker_reputation(1, 2.5)
+    manager.search("finance budget", k=1)
+    return manager
+
+
+def test_columnar_round_trip(manager, tmp_path):
+    from src.managers.manager import StudSarManager
+
+    path = tmp_path / "memory"
+    assert manager.save(str(path))
+    manifest = json.loads((path / "manifest.json").read_text())
+    assert manifest["count"] == 4 and manifest["embedding_model_name"] == STUB_MODEL_NAME
+
+    loaded = StudSarManager.load(str(path))
+    network = loaded.studsar_network
+    assert isinstance(network.id_to_segment, ColumnMap)
+    for marker_id, segment in enumerate(SEGMENTS):
+        details = network.get_marker_by_id(marker_id)
+        original = manager.studsar_network.get_marker_by_id(marker_id)
+        assert details["segment"] == segment
+        assert details["emotion"] == original["emotion"]
+        assert details["usage_count"] == original["usage_count"]
+        assert details["reputation"] == original["reputation"]
+        assert np.allclose(details["embedding"], original["embedding"])
+    assert loaded.search("finance budget", k=1)[0] == [0]
+
+    # The loaded memory keeps accepting writes and can be saved again in either format
+    new_id = loaded.update_network("A new marker added after loading.")
+    assert new_id == 4
+    assert loaded.save(str(path))
+    assert loaded.save(str(tmp_path / "legacy.pth"))
+    assert StudSarManager.load(str(path), mmap=False).studsar_network.id_to_segment[4] == "A new marker added after loading."
+    assert StudSarManager.load(str(tmp_path / "legacy.pth")).studsar_network.get_total_markers() == 5
+
+
+def test_column_map_overlay_semantics():
+    ids = np.arange(3)
+    column = ColumnMap(ids, lambda row: f"value {row}", present=np.array([True, False, True]))
+    assert dict(column) == {0: "value 0", 2: "value 2"}
+    column[1] = "new"
+    del column[0]
+    assert 0 not in column and column[1] == "new"
+    assert sorted(column) == [1, 2] and len(column) == 2
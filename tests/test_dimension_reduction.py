@@ -0,0 +1,62 @@
+"""
+Reduced-dimension memory mode: PCA / truncation projections, re-ranking and persistence.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+torch = pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, register_stub_encoder  # noqa: E402
+from src.models.neural import StudSarNeural  # noqa: E402
+from src.models.projection import PCAProjection, projection_from_state  # noqa: E402
+
+TOPICS = ["budget report for the finance department", "neural memory retrieval with embeddings",
+          "policy guidance for civil service records", "semantic search over text segments",
+          "quarterly analysis of department spending", "association between memory markers"]
+
+
+def test_pca_projection_roundtrips_through_state():
+    data = torch.randn(50, 16) @ torch.randn(16, 16)
+    projection = PCAProjection.fit(data, 4)
+    restored = projection_from_state(projection.state())
+    assert torch.allclose(projection(data), restored(data))
+    assert 0.0 < projection.explained_variance_ratio <= 1.0
+
+
+def test_reranked_search_matches_full_dimension_top_hit():
+    torch.manual_seed(0)
+    network = StudSarNeural(32, initial_capacity=4, device=torch.device("cpu"))
+    embeddings = torch.randn(40, 32)
+    for i, embedding in enumerate(embeddings):
+        network.add_marker(f"segment {i}", embedding)
+    queries = embeddings[:5] + 0.01 * torch.randn(5, 32)
+    exact = [r[0][0] for r in network.search_similar_markers_batch(queries, k=1)]
+
+    assert network.reduce_dimensions(8, method="pca", rerank_factor=10) is not None
+    assert network.memory_embeddings.shape[1] == 8
+    network.add_marker("late segment", embeddings[0]) # inserts are projected too
+    reranked = [network.search_similar_markers(q, k=1)[0][0] for q in queries]
+    assert reranked == exact
+
+
+def test_reduced_memory_survives_save_and_load(tmp_path):
+    from src.managers.manager import StudSarManager
+
+    register_stub_encoder(dim=64)
+    manager = StudSarManager(model_name=STUB_MODEL_NAME)
+    manager.add_segments(TOPICS)
+    assert manager.reduce_dimensions(16, method="truncate", keep_full=False) is not None
+    before = manager.search("department budget spending", k=2)
+
+    path = str(tmp_path / "reduced.pth")
+    assert manager.save(path)
+    loaded = StudSarManager.load(path)
+    assert loaded.studsar_network.projection.dim == 16
+    assert loaded.studsar_network.full_embeddings is None
+    assert loaded.search("department budget spending", k=2)[0] == before[0]
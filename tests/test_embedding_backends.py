@@ -0,0 +1,82 @@
+"""
+Pluggable embedding backends: selection, identity recording and load-time mismatch checks.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+torch = pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, register_stub_encoder  # noqa: E402
+from src.models.backends import create_embedding_backend  # noqa: E402
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_embedding_backend("tensorrt", STUB_MODEL_NAME)
+    with pytest.raises(ValueError):
+        create_embedding_backend("onnx", STUB_MODEL_NAME) # backend_path is required
+
+
+def test_torch_backend_wraps_registry_model():
+    register_stub_encoder(dim=32)
+    backend = create_embedding_backend("torch", STUB_MODEL_NAME, "cpu")
+    assert backend.identity == ("torch", STUB_MODEL_NAME)
+    assert backend.get_sentence_embedding_dimension() == 32
+    assert tuple(backend.encode(["a b", "c"], convert_to_tensor=True).shape) == (2, 32)
+
+
+def test_load_refuses_other_backend(tmp_path):
+    from src.managers.manager import StudSarManager
+
+    register_stub_encoder(dim=32)
+    manager = StudSarManager(model_name=STUB_MODEL_NAME)
+    manager.add_segments(["first memory", "second memory"])
+    path = str(tmp_path / "memory.pth")
+    manager.save(path)
+
+    assert StudSarManager.load(path, embedding_backend="torch-int8") is None
+    loaded = StudSarManager.load(path)
+    assert loaded is not None
+    assert loaded.embedding_backend.identity == ("torch", STUB_MODEL_NAME)
+    assert loaded.studsar_network.get_total_markers() == 2
+
+
+def _tiny_sentence_transformer(path):
+    """Saves a randomly initialised 1-layer BERT SentenceTransformer (no download) and returns it."""
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *"budget report finance neural memory policy".split()]
+    (path / "vocab.txt").write_text("\n".join(vocab), encoding="utf-8")
+    BertTokenizerFast(vocab_file=str(path / "vocab.txt")).save_pretrained(path)
+    BertModel(BertConfig(vocab_size=len(vocab), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+                         intermediate_size=32)).save_pretrained(path)
+    model = SentenceTransformer(modules=[models.Transformer(str(path)), models.Pooling(16)], device="cpu")
+    model.save(str(path / "st"))
+    return model, str(path / "st")
+
+
+def test_onnx_export_matches_sentence_transformer(tmp_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    from src.models.backends import OnnxBackend, export_onnx
+
+    model, model_path = _tiny_sentence_transformer(tmp_path)
+    output_dir = export_onnx(model_path, str(tmp_path / "onnx"), quantize=True)
+
+    texts = ["budget report", "neural memory policy finance"]
+    backend = OnnxBackend(output_dir, prefer_quantized=False)
+    assert backend.identity == ("onnx", model_path)
+    assert backend.get_sentence_embedding_dimension() == 16
+    assert abs(backend.encode(texts) - model.encode(texts)).max() < 1e-4
+    assert tuple(backend.encode(texts, convert_to_tensor=True).shape) == (2, 16)
+
+    quantized = create_embedding_backend("onnx", backend_path=output_dir)
+    assert quantized.identity == ("onnx-int8", model_path)
+    assert quantized.encode(texts).shape == (2, 16)
@@ -0,0 +1,73 @@
+"""
+Emotion tagging: batching, caching and deferred background tagging.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.models.emotion import PENDING_EMOTION, EmotionTagger  # noqa: E402
+
+
+class FakeSentimentPipeline:
+    """Labels texts containing 'good' Positive and 'bad' Negative; records each call."""
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+
+    def __call__(self, texts, **kwargs):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls.append(list(texts))
+        return [{"label": "Positive" if "good" in t else "Negative" if "bad" in t else "Neutral"} for t in texts]
+
+
+def test_tag_batch_batches_and_caches():
+    pipe = FakeSentimentPipeline()
+    tagger = EmotionTagger(pipe, batch_size=2)
+    texts = ["a good day", "a bad day", "a day", "a good day"]
+    assert tagger.tag_batch(texts) == ["pleasant", "unpleasant", "neutral", "pleasant"]
+    assert [len(c) for c in pipe.calls] == [2, 1] # duplicate tagged once, in batches of 2
+    assert tagger.tag("a bad day") == "unpleasant"
+    assert len(pipe.calls) == 2 # served from the cache
+
+
+def test_deferred_tags_are_filled_in_background():
+    gate = threading.Event()
+    tagger = EmotionTagger(FakeSentimentPipeline(gate), batch_size=8)
+    results = {}
+    tagger.submit([0, 1], ["good news", "bad news"], lambda ids, tags: results.update(zip(ids, tags)))
+    tagger.submit([2], ["plain news"], lambda ids, tags: results.update(zip(ids, tags)))
+    assert results == {} and tagger.pending() > 0
+    gate.set()
+    assert tagger.wait(timeout=5)
+    assert results == {0: "pleasant", 1: "unpleasant", 2: "neutral"}
+    tagger.close()
+
+
+def test_manager_exposes_pending_then_final_tag():
+    pytest.importorskip("torch")
+    from benchmarks.stub_encoder import STUB_MODEL_NAME, register_stub_encoder
+    from src.models.registry import default_device, registry
+    from src.studsar import StudSarManager
+
+    gate = threading.Event()
+    register_stub_encoder(dim=32)
+    registry.register("sentiment", "cardiffnlp/twitter-roberta-base-sentiment-latest",
+                      FakeSentimentPipeline(gate), default_device())
+    try:
+        manager = StudSarManager(model_name=STUB_MODEL_NAME, defer_emotions=True)
+        manager.build_network_from_text("A good result. A bad result.", use_spacy_segmentation=False, segment_length=3)
+        emotions = manager.search("good result", k=2)[3]
+        assert set(emotions) == {PENDING_EMOTION}
+        gate.set()
+        assert manager.wait_for_emotions(timeout=5)
+        assert set(manager.search("good result", k=2)[3]) == {"pleasant", "unpleasant"}
+    finally:
+        gate.set()
+        registry.unload("sentiment", "cardiffnlp/twitter-roberta-base-sentiment-latest")
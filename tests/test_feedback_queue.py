@@ -0,0 +1,49 @@
+"""
+Feedback ingestion: queued thumbs-up / thumbs-down signals become marker reputation.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder  # noqa: E402
+from src.managers.feedback import signal_delta  # noqa: E402
+
+TOPICS = ["budget report for the finance department", "neural memory retrieval with embeddings",
+          "policy guidance for civil service records"]
+
+
+def test_signals_map_to_deltas():
+    assert signal_delta("positive") == 1.0
+    assert signal_delta("Negative", weight=0.5) == -0.5
+    assert signal_delta(0.25) == 0.25
+    with pytest.raises(ValueError):
+        signal_delta("meh")
+
+
+def test_queued_feedback_is_batched_into_reputation_and_saved(tmp_path):
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    manager.add_segments(TOPICS)
+    queue = manager.enable_feedback_queue(flush_interval=60)
+    hits = manager.search("finance budget report", k=2)[0]
+    manager.submit_feedback("finance budget report", hits, "positive")
+    manager.submit_feedback("finance budget report", hits[:1], "positive")
+    manager.submit_feedback("finance budget report", hits[1:], "negative")
+    assert queue.pending() == 2
+    assert dict(manager.studsar_network.id_to_reputation) == {}
+
+    path = str(tmp_path / "memory.pth")
+    assert manager.save(path) # Flushes the queue first
+    loaded = StudSarManager.load(path, embedding_model=StubEncoder(dim=32))
+    assert dict(loaded.studsar_network.id_to_reputation) == {hits[0]: 2.0}
+    assert loaded.submit_feedback("policy", [hits[1]], "negative") # No queue: applied at once
+    assert loaded.studsar_network.id_to_reputation[hits[1]] == -1.0
+    manager.close()
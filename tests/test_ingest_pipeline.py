@@ -0,0 +1,146 @@
+"""
+Staged ingestion: batched segmentation, dedupe, batched encoding and bulk insert into
+consecutive marker ranges.
+"""
+
+import functools
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder  # noqa: E402
+from src.rag.ingest import IngestPipeline, content_hash, to_ranges  # noqa: E402
+
+SPLITS = ["Budget report for finance. Policy guidance for records.",
+          "Neural memory retrieval.  budget REPORT for finance. Semantic search over text.",
+          "Civil service records."]
+
+
+def _sentences(texts):
+    return [[piece for piece in text.split(".")] for text in texts]
+
+
+def test_ranges_compress_consecutive_markers_per_split():
+    assert to_ranges([4, 5, 6, None, 8, 9], [0, 0, 1, 1, 1, 2]) == [[4, 6, 0], [6, 7, 1], [8, 9, 1], [9, 10, 2]]
+    assert content_hash(" Budget  report ") == content_hash("budget report")
+
+
+def test_pipeline_dedupes_and_inserts_in_stage_sized_batches():
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    manager.add_segments(["an existing marker"])
+    pipeline = IngestPipeline(manager, _sentences, stage_sizes={"segment": 2, "encode": 2, "insert": 3})
+    result = pipeline.run(SPLITS, emotion="neutral")
+
+    assert result["segments"] == 5 and result["duplicates"] == 1
+    assert result["marker_ids"] == [1, 2, 3, 4, 5]
+    assert result["ranges"] == [[1, 3, 0], [3, 5, 1], [5, 6, 2]]
+    assert manager.studsar_network.get_marker_by_id(4)["segment"] == "Semantic search over text"
+    assert set(result["stats"]) == {"segment", "dedupe", "encode", "insert"}
+    assert result["stats"]["encode"]["items"] == 5 and result["stats"]["segment"]["items"] == 3
+
+    again = pipeline.run(SPLITS[2:], known_hashes=result["hashes"])
+    assert again["segments"] == 0 and again["duplicates"] == 1
+
+
+def test_files_prepared_in_workers_are_inserted_by_one_writer(tmp_path):
+    from src.managers.manager import StudSarManager
+    from src.rag.ingest import prepare_file, prepare_files
+    from src.utils.text import segment_texts
+
+    paths = []
+    for i, text in enumerate(["Budget report. Finance.\n\nPolicy guidance.", "Neural memory retrieval."]):
+        paths.append(str(tmp_path / f"doc{i}.txt"))
+        Path(paths[-1]).write_text(text, encoding="utf-8")
+    paths.insert(1, str(tmp_path / "missing.txt"))
+
+    prepare = functools.partial(prepare_file, segment_fn=functools.partial(segment_texts, use_spacy="regex"))
+    prepared = {path: (result, error) for path, result, error in prepare_files(paths, prepare, workers=2)}
+    assert set(prepared) == set(paths)
+    assert isinstance(prepared[paths[1]][1], FileNotFoundError) # Isolated: the other files still succeed
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    pipeline = IngestPipeline(manager, None)
+    result, _ = prepared[paths[0]]
+    assert result["segments"][1] == [0, 1]
+    added = pipeline.run(result["texts"], segments=result["segments"])
+    assert added["ranges"] == [[0, 1, 0], [1, 2, 1]] and "segment" not in added["stats"]
+    assert manager.search("policy guidance", k=1)[2] == ["Policy guidance."]
+
+
+def test_refresh_only_replaces_changed_chunks():
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    pipeline = IngestPipeline(manager, _sentences)
+    first = pipeline.run(SPLITS)
+    chunks = {digest: [marker_id] for digest, marker_id in zip(first["hashes"], first["marker_ids"])}
+    kept_id = chunks[content_hash("Civil service records")][0]
+    manager.studsar_network.increment_usage_many([kept_id], 3)
+    manager.update_reputation_many([kept_id], 1.0)
+
+    edited = ["Budget report for finance. Policy guidance for records.", "Civil service records. A new paragraph."]
+    result = pipeline.refresh(edited, chunks)
+    assert (result["kept"], result["segments"], result["removed"]) == (3, 1, 2)
+    assert result["stats"]["encode"]["items"] == 1 # Only the new chunk is encoded
+    assert result["chunks"][content_hash("Civil service records")] == [kept_id]
+    assert result["ranges"] == [[0, 2, 0], [4, 6, 1]]
+
+    network = manager.studsar_network
+    assert sorted(network.marker_id_to_index) == [0, 1, 4, 5]
+    assert network.id_to_usage[kept_id] == 3 and network.id_to_reputation[kept_id] == 1.0
+    assert manager.search("a new paragraph", k=1)[2] == ["A new paragraph"]
+
+
+def test_refresh_tracks_repeated_chunks_and_rolls_back_failed_inserts():
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    pipeline = IngestPipeline(manager, _sentences, dedupe=False)
+    first = pipeline.run(["Budget report. Budget report. Policy guidance."])
+    chunks = {}
+    for digest, marker_id in zip(first["hashes"], first["marker_ids"]):
+        chunks.setdefault(digest, []).append(marker_id)
+    assert chunks[content_hash("Budget report")] == [0, 1]
+
+    # One repeat disappears: its marker is removed instead of being orphaned
+    result = pipeline.refresh(["Budget report. Policy guidance."], chunks)
+    assert (result["kept"], result["segments"], result["removed"]) == (2, 0, 1)
+    assert sorted(manager.studsar_network.marker_id_to_index) == [0, 2]
+
+    add_segments, calls = manager.add_segments, []
+    def failing_add_segments(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("insert failed")
+        return add_segments(*args, **kwargs)
+    manager.add_segments = failing_add_segments
+    pipeline.stage_sizes["insert"] = 1 # The first new chunk is inserted, the second one fails
+    with pytest.raises(RuntimeError):
+        pipeline.refresh(["Something else. Entirely new."], result["chunks"])
+    assert sorted(manager.studsar_network.marker_id_to_index) == [0, 2] # Old markers kept, nothing new
+
+
+def test_run_removes_inserted_markers_when_an_insert_fails():
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    pipeline = IngestPipeline(manager, _sentences, stage_sizes={"insert": 1})
+    pipeline.run(["Budget report."])
+    add_segments, calls = manager.add_segments, []
+    def failing_add_segments(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise RuntimeError("insert failed")
+        return add_segments(*args, **kwargs)
+    manager.add_segments = failing_add_segments
+    with pytest.raises(RuntimeError):
+        pipeline.run(["Policy guidance. Railway timetable. Hospital times."])
+    assert len(calls) == 3 and sorted(manager.studsar_network.marker_id_to_index) == [0]
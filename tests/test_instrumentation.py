@@ -0,0 +1,70 @@
+"""
+Instrumentation: phase timers and counters reach the attached sinks, and nothing is recorded without one.
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder  # noqa: E402
+from src.utils.instrumentation import InMemorySink, LoggingSink, PrometheusSink, metrics  # noqa: E402
+
+
+@pytest.fixture
+def sink():
+    sink = metrics.add_sink(InMemorySink())
+    yield sink
+    metrics.remove_sink(sink)
+
+
+def test_pipeline_reports_phase_timers_and_counters(sink):
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, initial_capacity=2, embedding_model=StubEncoder(dim=32))
+    manager.build_network_from_text("First fact. Second fact. Third fact.", use_spacy_segmentation="regex",
+                                    spacy_sentences_per_segment=1)
+    manager.search("second fact", k=2)
+    manager.search_batch(["first", "third"], k=1)
+
+    snapshot = sink.snapshot()
+    assert {"segment", "encode", "insert", "similarity", "topk", "id_mapping"} <= set(snapshot["timers"])
+    assert snapshot["timers"]["similarity"]["count"] == 2
+    assert snapshot["counters"]["markers_added"] == 3
+    assert snapshot["counters"]["searches"] == 3
+    assert snapshot["counters"]["resizes"] == 1
+
+
+def test_disabled_instrumentation_records_nothing(sink):
+    metrics.remove_sink(sink)
+    assert not metrics.enabled
+    with metrics.timer("encode"):
+        metrics.count("markers_added")
+    assert sink.snapshot() == {"counters": {}, "timers": {}}
+
+
+def test_prometheus_and_logging_sinks(caplog):
+    prometheus = PrometheusSink()
+    logging_sink = LoggingSink(level=logging.INFO)
+    for s in (prometheus, logging_sink):
+        metrics.add_sink(s)
+    try:
+        with caplog.at_level(logging.INFO, logger="studsar.metrics"):
+            metrics.timing("topk", 0.002)
+            metrics.timing("topk", 3.0)
+            metrics.count("resizes", 2)
+    finally:
+        metrics.clear_sinks()
+
+    text = prometheus.render()
+    assert "# TYPE studsar_resizes_total counter\nstudsar_resizes_total 2" in text
+    assert 'studsar_topk_seconds_bucket{le="0.0025"} 1' in text
+    assert 'studsar_topk_seconds_bucket{le="+Inf"} 2' in text
+    assert "studsar_topk_seconds_count 2" in text
+    assert any("counter resizes +2" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,45 @@
+"""
+Memory footprint accounting and release of over-allocated capacity.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder  # noqa: E402
+
+
+@pytest.fixture
+def manager():
+    from src.managers.manager import StudSarManager
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, initial_capacity=4, embedding_model=StubEncoder(dim=32))
+    manager.add_segments(["alpha memory", "beta memory", "gamma memory", "delta memory", "epsilon memory"],
+                         emotion="neutral")
+    return manager
+
+
+def test_report_breaks_down_used_and_slack_capacity(manager):
+    report = manager.memory_report()
+    components = report["components"]
+    assert (report["markers"], report["capacity"]) == (5, 8)
+    assert components["memory_embeddings"] == 5 * 32 * 4
+    assert components["memory_embeddings_slack"] == 3 * 32 * 4
+    assert report["slack_bytes"] == components["memory_embeddings_slack"]
+    assert components["segments"] > sum(len(s) for s in manager.studsar_network.id_to_segment.values())
+    assert components["emotions"] > 0 and components["index"] > 0
+    assert report["total_bytes"] == sum(components.values())
+
+
+def test_shrink_to_fit_releases_slack_and_keeps_search_working(manager):
+    assert manager.shrink_to_fit() == 3 * 32 * 4
+    report = manager.memory_report()
+    assert report["capacity"] == 5 and report["slack_bytes"] == 0
+    assert manager.search("gamma memory", k=1)[0] == [2]
+    assert manager.update_network("zeta memory") == 5
+    assert manager.shrink_to_fit(reserve=2) == 2 * 32 * 4 # Capacity doubled to 10 on insert, shrunk to 6 + 2
@@ -0,0 +1,65 @@
+"""
+Prometheus metrics endpoint: histograms, counters and gauges scraped over local HTTP.
+"""
+
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder  # noqa: E402
+
+
+def test_exporter_serves_prometheus_text(tmp_path):
+    from src.managers.manager import StudSarManager
+    from src.managers.metrics_exporter import CONTENT_TYPE, MetricsExporter
+    from src.managers.namespaces import NamespacedStudSar
+    from src.utils.instrumentation import metrics
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, initial_capacity=1, embedding_model=StubEncoder(dim=32))
+    tenants = NamespacedStudSar(str(tmp_path), model_name=STUB_MODEL_NAME, embedding_model=manager.embedding_backend)
+    with MetricsExporter(port=0).watch_manager(manager, name="main").watch_namespaces(tenants) as exporter:
+        manager.add_segments(["first memory", "second memory"])
+        manager.search("first", k=1)
+        tenants.add_segments("finance", ["budget"])
+        with urllib.request.urlopen(exporter.url, timeout=10) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            body = response.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(exporter.url.replace("/metrics", "/other"), timeout=10)
+    assert exporter.sink not in metrics.sinks
+
+    assert "# TYPE studsar_similarity_seconds histogram" in body
+    assert 'studsar_similarity_seconds_bucket{le="+Inf"} 1' in body
+    assert "studsar_resizes_total 1" in body
+    assert 'studsar_markers{manager="main"} 2' in body
+    assert f'studsar_memory_bytes{{manager="main"}} {manager.memory_report()["total_bytes"]}' in body
+    assert 'studsar_namespace_markers{namespace="finance"} 1' in body
+    assert "studsar_loaded_namespaces 1" in body
+
+
+def test_ingest_backlog_gauge_tracks_pending_segments():
+    from src.managers.manager import StudSarManager
+    from src.managers.metrics_exporter import MetricsExporter
+    from src.rag.ingest import IngestPipeline
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    pipeline = IngestPipeline(manager, lambda texts: [t.split(".") for t in texts], stage_sizes={"insert": 2})
+    exporter = MetricsExporter(port=0).watch_ingest(pipeline, name="docs")
+    seen = []
+    add_segments = manager.add_segments
+    def observed(*args, **kwargs):
+        seen.append([l for l in exporter.render().splitlines() if l.startswith("studsar_ingest_segments_pending")][0])
+        return add_segments(*args, **kwargs)
+    manager.add_segments = observed
+
+    pipeline.run(["budget report. finance. policy guidance"])
+    assert seen == ['studsar_ingest_segments_pending{ingest="docs"} 3', 'studsar_ingest_segments_pending{ingest="docs"} 1']
+    assert 'studsar_ingest_segments_pending{ingest="docs"} 0' in exporter.render()
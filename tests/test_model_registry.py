@@ -0,0 +1,77 @@
+"""
+Unit tests for the process-wide model registry.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.models.registry import ModelRegistry  # noqa: E402
+
+
+def test_registry_loads_each_key_once_across_threads():
+    registry = ModelRegistry()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def loader(model_name, device):
+        calls.append((model_name, device))
+        return object()
+
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(registry.get_or_load("embedding", "fake-model", loader, device="cpu"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == [("fake-model", "cpu")]
+    assert all(r is results[0] for r in results)
+
+
+def test_registry_keys_by_kind_model_and_device():
+    registry = ModelRegistry()
+    loader = lambda name, device: object()  # noqa: E731
+
+    a = registry.get_or_load("embedding", "m", loader, device="cpu")
+    b = registry.get_or_load("embedding", "m", loader, device="cuda")
+    c = registry.get_or_load("sentiment", "m", loader, device="cpu")
+    assert len({a, b, c}) == 3
+    assert registry.get_or_load("embedding", "m", loader, device="cpu") is a
+
+    assert registry.unload("embedding", "m", device="cpu")
+    assert ("embedding", "m", "cpu") not in registry.loaded_models()
+
+
+def test_register_reuses_supplied_model():
+    registry = ModelRegistry()
+    model = object()
+    registry.register("embedding", "preloaded", model, device="cpu")
+
+    def loader(name, device):
+        raise AssertionError("loader must not be called for a registered model")
+
+    assert registry.get_or_load("embedding", "preloaded", loader, device="cpu") is model
+
+
+def test_supplied_embedding_model_stays_with_its_manager():
+    pytest.importorskip("torch")
+    from benchmarks.stub_encoder import StubEncoder
+    from src.managers.manager import StudSarManager
+    from src.models.registry import registry
+
+    before = registry.loaded_models()
+    encoder = StubEncoder(dim=16)
+    manager = StudSarManager(model_name="injected-model", embedding_model=encoder)
+    assert manager.embedding_backend.model is encoder
+    assert registry.loaded_models() == before
@@ -0,0 +1,67 @@
+"""
+Namespaced memories: shared encoder, LRU unloading to disk and cross-namespace search.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder  # noqa: E402
+
+
+@pytest.fixture
+def tenants(tmp_path):
+    from src.managers.namespaces import NamespacedStudSar
+    tenants = NamespacedStudSar(str(tmp_path), model_name=STUB_MODEL_NAME, max_loaded=2,
+                                embedding_model=StubEncoder(dim=256))
+    tenants.add_segments("finance", ["quarterly budget report", "department spending analysis"])
+    tenants.add_segments("health", ["hospital waiting times", "vaccination programme guidance"])
+    tenants.add_segments("transport", ["railway timetable changes", "road maintenance budget"])
+    return tenants
+
+
+def test_idle_namespaces_are_unloaded_and_reloaded(tenants):
+    assert tenants.loaded_namespaces() == ["health", "transport"]
+    assert tenants.namespaces() == ["finance", "health", "transport"]
+    encoders = {id(tenants.get(name).embedding_backend) for name in tenants.namespaces()}
+    assert encoders == {id(tenants.encoder)}
+    finance = tenants.get("finance", create=False)
+    assert finance.studsar_network.get_total_markers() == 2
+    assert set(tenants.memory_usage()) == set(tenants.loaded_namespaces())
+    with pytest.raises(KeyError):
+        tenants.get("unknown", create=False)
+    with pytest.raises(ValueError):
+        tenants.get("../escape")
+
+
+def test_search_across_namespaces_merges_by_similarity(tenants):
+    results = tenants.search_batch(["budget report", "railway timetable"], ["finance", "transport"], k=2)
+    assert [hit[0] for hit in results[0]] == ["finance", "transport"]
+    assert results[1][0][:2] == ("transport", 0)
+    assert all(a[2] >= b[2] for a, b in zip(results[0], results[0][1:]))
+    assert tenants.search("hospital waiting", "health", k=1)[0][3] == "hospital waiting times"
+
+
+def test_supplied_encoder_is_not_registered(tmp_path):
+    from src.managers.namespaces import NamespacedStudSar
+    from src.models.registry import registry
+
+    before = registry.loaded_models()
+    tenants = NamespacedStudSar(str(tmp_path), model_name="injected-model", embedding_model=StubEncoder(dim=16))
+    tenants.add_segments("finance", ["quarterly budget report"])
+    assert tenants.get("finance").embedding_backend is tenants.encoder
+    assert registry.loaded_models() == before
+
+
+def test_search_without_namespaces_stays_on_loaded_ones(tenants, monkeypatch):
+    saves = []
+    monkeypatch.setattr("src.managers.manager.StudSarManager.save", lambda self, *a, **kw: saves.append(a) or True)
+    results = tenants.search_batch(["budget report"], k=5)
+    assert {hit[0] for hit in results[0]} == {"health", "transport"}
+    assert tenants.loaded_namespaces() == ["health", "transport"] and saves == []
@@ -0,0 +1,87 @@
+"""
+In-process tests for the micro-batching query scheduler, driven by a thread
+pool of synthetic clients against a fake manager.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.managers.query_server import MicroBatchScheduler  # noqa: E402
+
+
+class FakeManager:
+    """Answers every query with its own text so clients can check routing."""
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def search_batch(self, query_texts, k=1):
+        with self._lock:
+            self.batches.append(list(query_texts))
+        time.sleep(self.delay)
+        return [(list(range(n)), [1.0] * n, [q] * n) for q, n in zip(query_texts, k)]
+
+
+def test_synthetic_clients_are_batched_and_routed():
+    manager = FakeManager(delay=0.002)
+    with MicroBatchScheduler(manager, max_batch_size=16, max_wait_ms=10) as scheduler:
+        with ThreadPoolExecutor(max_workers=32) as clients:
+            futures = [clients.submit(scheduler.search, f"query-{i}", 1 + i % 2) for i in range(200)]
+            results = [f.result(timeout=10) for f in futures]
+        metrics = scheduler.metrics()
+
+    for i, (ids, sims, segs) in enumerate(results):
+        assert segs == [f"query-{i}"] * (1 + i % 2)
+    assert metrics["requests_served"] == 200
+    assert sum(len(b) for b in manager.batches) == 200
+    assert max(len(b) for b in manager.batches) <= 16
+    assert metrics["batches"] < 200
+    assert sum(metrics["batch_size_histogram"].values()) == metrics["batches"]
+    assert sum(metrics["wait_time_ms_buckets"].values()) == 200
+
+
+def test_max_batch_size_flushes_before_window():
+    manager = FakeManager()
+    with MicroBatchScheduler(manager, max_batch_size=4, max_wait_ms=10_000) as scheduler:
+        futures = [scheduler.submit(f"q{i}") for i in range(4)]
+        assert [f.result(timeout=5)[2] for f in futures] == [["q0"], ["q1"], ["q2"], ["q3"]]
+
+
+def test_errors_are_delivered_to_callers():
+    class Broken:
+        def search_batch(self, query_texts, k=1):
+            raise RuntimeError("boom")
+
+    with MicroBatchScheduler(Broken(), max_wait_ms=1) as scheduler:
+        with pytest.raises(RuntimeError):
+            scheduler.search("anything", timeout=5)
+        assert scheduler.metrics()["requests_failed"] == 1
+
+
+def test_submit_requires_running_scheduler():
+    with pytest.raises(RuntimeError):
+        MicroBatchScheduler(FakeManager()).submit("q")
+
+
+def test_mixed_k_batch_counts_only_delivered_hits():
+    pytest.importorskip("torch")
+    from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    manager.add_segments([f"segment number {i} about topic {i % 4}" for i in range(12)])
+    with MicroBatchScheduler(manager, max_batch_size=2, max_wait_ms=10_000) as scheduler:
+        futures = [scheduler.submit("topic 1", 1), scheduler.submit("topic 2", 10)]
+        results = [f.result(timeout=5) for f in futures]
+        assert scheduler.metrics()["batches"] == 1
+    assert [len(ids) for ids, _, _ in results] == [1, 10]
+    assert sum(manager.studsar_network.id_to_usage.values()) == 11
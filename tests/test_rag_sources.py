@@ -0,0 +1,102 @@
+"""
+RAGConnector source bookkeeping: parallel multi-file ingestion and incremental refresh.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("torch")
+pytest.importorskip("langchain_community")
+pytest.importorskip("langchain.text_splitter")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder  # noqa: E402
+
+
+def _connector():
+    from src.managers.manager import StudSarManager
+    from src.rag.rag_connector import RAGConnector
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    return manager, RAGConnector(manager)
+
+
+def _marker_ids(rag, source_id):
+    return [m for start, stop, _ in rag.source_markers[source_id]["ranges"] for m in range(start, stop)]
+
+
+def test_add_directory_records_ranges_and_isolates_failures(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "budget.txt").write_text("Budget report for finance. Policy guidance for records.", encoding="utf-8")
+    (docs / "sub" / "memory.txt").write_text("Neural memory retrieval. Semantic search over text.", encoding="utf-8")
+    (docs / "notes.md").write_text("Not a supported document.", encoding="utf-8")
+    manager, rag = _connector()
+
+    progress = []
+    added = rag.add_directory(str(docs), "*.txt", workers=2,
+                              progress=lambda done, total, path, source_id, error: progress.append((done, total, error)))
+    assert sorted(os.path.basename(path) for path in added) == ["budget.txt", "memory.txt"]
+    assert all(added.values()) and progress == [(1, 2, None), (2, 2, None)]
+    for path, source_id in added.items():
+        ids = _marker_ids(rag, source_id)
+        assert ids and all(rag.marker_source(m) == source_id for m in ids)
+        assert rag.marker_tags(ids[0]) == [f"external_source_id:{source_id}", "source_type:txt"]
+        assert rag.marker_metadata(ids[0])["original_path"] == path
+    assert manager.studsar_network.get_total_markers() == sum(len(_marker_ids(rag, s)) for s in added.values())
+
+    budget = str(docs / "budget.txt")
+    missing = str(tmp_path / "missing.txt")
+    results = rag.add_documents([missing, budget], workers=2)
+    assert results[missing] is None and results[budget] is not None # The failing file does not stop the other
+
+    # Workers segment exactly like add_document
+    single = rag.add_document(budget)
+    segments = manager.studsar_network.id_to_segment
+    assert [segments[m] for m in _marker_ids(rag, single)] == [segments[m] for m in _marker_ids(rag, results[budget])]
+
+
+BUDGET = "The budget report was filed. It covers the finance department. It was approved in May."
+MEMORY = "Neural memory stores segments. It retrieves them by similarity. It runs on a GPU."
+POLICY = "Policy guidance is published yearly. It applies to civil servants. It is reviewed often."
+RECORDS = "Civil service records are archived. They are kept for ten years. They can be requested."
+
+
+def test_update_external_source_reingests_only_changed_chunks(tmp_path):
+    manager, rag = _connector()
+    path = tmp_path / "guide.txt"
+    path.write_text("\n\n".join([BUDGET, MEMORY, POLICY]), encoding="utf-8")
+    source_id = rag.add_document(str(path))
+    segments = manager.studsar_network.id_to_segment
+    ids = {segments[m]: m for m in _marker_ids(rag, source_id)}
+    assert set(ids) == {BUDGET, MEMORY, POLICY}
+    network = manager.studsar_network
+    network.increment_usage_many([ids[BUDGET]], 4)
+    manager.update_reputation_many([ids[POLICY]], 2.0)
+
+    edited = tmp_path / "guide_v2.txt"
+    edited.write_text("\n\n".join([BUDGET, RECORDS, POLICY]), encoding="utf-8")
+    encoded = []
+    generate = manager.generate_embeddings
+    manager.generate_embeddings = lambda texts, **kwargs: encoded.extend(texts) or generate(texts, **kwargs)
+    assert rag.update_external_source(source_id, content_path=str(edited))
+
+    assert encoded == [RECORDS] # Only the new chunk is encoded
+    after = {segments[m]: m for m in _marker_ids(rag, source_id)}
+    assert set(after) == {BUDGET, RECORDS, POLICY}
+    assert after[BUDGET] == ids[BUDGET] and after[POLICY] == ids[POLICY]
+    assert ids[MEMORY] not in network.marker_id_to_index
+    assert network.id_to_usage[ids[BUDGET]] == 4 and network.id_to_reputation[ids[POLICY]] == 2.0
+    assert rag.marker_tags(after[RECORDS]) == [f"external_source_id:{source_id}", "source_type:txt"]
+    assert rag.marker_metadata(after[RECORDS])["original_path"] == str(edited)
+    info = rag.external_sources[source_id]
+    assert info["path"] == str(edited) and info["segments_memorized"] == 3
+    assert (info["ingest_stats"]["kept"], info["ingest_stats"]["removed"]) == (2, 1)
+
+    assert rag.remove_external_source(source_id, purge_memory=True)
+    assert network.get_total_markers() == 0
@@ -0,0 +1,66 @@
+"""
+Loading builds the manager from saved state in one pass and reuses supplied models.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder  # noqa: E402
+from src.models.registry import registry  # noqa: E402
+
+
+def _count_networks(monkeypatch, network_cls):
+    created = []
+    original = network_cls.__init__
+
+    def counting_init(self, *args, **kwargs):
+        created.append(self)
+        original(self, *args, **kwargs)
+    monkeypatch.setattr(network_cls, "__init__", counting_init)
+    return created
+
+
+@pytest.mark.parametrize("filename", ["memory.pth", "memory"])
+def test_manager_load_allocates_one_network_and_reuses_model(tmp_path, monkeypatch, filename):
+    from src.managers.manager import StudSarManager
+    from src.models.neural import StudSarNeural
+
+    encoder = StubEncoder(dim=32)
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=encoder)
+    manager.add_segments(["first memory", "second memory"])
+    path = str(tmp_path / filename)
+    assert manager.save(path)
+
+    supplied = StubEncoder(dim=32, seed=1)
+    created = _count_networks(monkeypatch, StudSarNeural)
+    loaded = StudSarManager.load(path, embedding_model=supplied)
+    assert len(created) == 1 and loaded.studsar_network is created[0]
+    assert loaded.embedding_backend.model is supplied
+    assert loaded.search("first memory", k=1)[0] == [0]
+
+
+def test_search_only_load_skips_sentiment_pipeline(tmp_path, monkeypatch):
+    from src.studsar import StudSarManager, StudSarNeural
+
+    encoder = StubEncoder(dim=32)
+    registry.register("embedding", STUB_MODEL_NAME, encoder)
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, load_emotion_model=False)
+    manager.build_network_from_text("One memory here. Another memory there.", use_spacy_segmentation=False, segment_length=3)
+    path = str(tmp_path / "memory.pth")
+    assert manager.save(path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("sentiment pipeline must not be loaded")
+    monkeypatch.setattr(registry, "get_sentiment_pipeline", fail)
+    created = _count_networks(monkeypatch, StudSarNeural)
+    loaded = StudSarManager.load(path, search_only=True)
+    assert len(created) == 1
+    assert loaded._emotion_pipe is None
+    assert loaded.search("another memory", k=1)[0] == [1]
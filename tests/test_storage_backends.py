@@ -0,0 +1,118 @@
+"""
+Embedding storage backends (in-RAM, memory-mapped, int8) and the shared save format of both managers.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+torch = pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, register_stub_encoder  # noqa: E402
+from src.models.neural import StudSarNeural  # noqa: E402
+from src.storage.embedding_storage import Int8Storage, MemmapStorage  # noqa: E402
+
+TOPICS = ["budget report for the finance department", "neural memory retrieval with embeddings",
+          "policy guidance for civil service records", "semantic search over text segments"]
+
+
+@pytest.mark.parametrize("storage", ["memory", "mmap", "int8"])
+def test_every_storage_returns_the_same_top_hits(storage, tmp_path):
+    torch.manual_seed(0)
+    embeddings = torch.randn(60, 32)
+    queries = embeddings[:8] + 0.01 * torch.randn(8, 32)
+    backend = MemmapStorage(str(tmp_path)) if storage == "mmap" else storage
+    network = StudSarNeural(32, initial_capacity=4, device=torch.device("cpu"), storage=backend)
+    for i, embedding in enumerate(embeddings):
+        network.add_marker(f"segment {i}", embedding)
+    assert [r[0][0] for r in network.search_similar_markers_batch(queries, k=1)] == list(range(8))
+
+    network.remove_markers([0])
+    network.shrink_to_fit()
+    assert network.memory_embeddings.shape[0] == 59
+    assert network.search_similar_markers(queries[1], k=1)[0] == [1]
+    assert network.reduce_dimensions(8, method="pca", rerank_factor=10) is not None
+    assert network.search_similar_markers(queries[2], k=1)[0] == [2]
+    if storage == "mmap":
+        assert len(list(tmp_path.iterdir())) == 2 # One live file per buffer
+
+
+def test_int8_rows_are_a_quarter_of_float32_and_close():
+    storage = Int8Storage()
+    vectors = torch.randn(5, 384)
+    rows = storage.encode(vectors)
+    assert rows.dtype == torch.int8 and rows.shape == (5, 388)
+    assert torch.allclose(storage.decode(rows), vectors, atol=vectors.abs().max().item() / 127)
+
+
+def test_int8_memory_survives_both_save_formats(tmp_path):
+    from src.managers.manager import StudSarManager
+
+    register_stub_encoder(dim=32)
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, storage="int8")
+    manager.add_segments(TOPICS)
+    before = manager.search("finance budget", k=2)
+    for path in (str(tmp_path / "memory.pth"), str(tmp_path / "memory")):
+        assert manager.save(path)
+        loaded = StudSarManager.load(path)
+        assert loaded.studsar_network.storage.name == "int8"
+        assert loaded.search("finance budget", k=2)[0] == before[0]
+
+
+def test_both_managers_read_each_others_files(tmp_path):
+    from src.managers.manager import StudSarManager
+    from src import studsar
+
+    register_stub_encoder(dim=32)
+    legacy = studsar.StudSarManager(model_name=STUB_MODEL_NAME, load_emotion_model=False)
+    for topic in TOPICS:
+        legacy.update_network(topic)
+    legacy.studsar_network.set_emotion(1, "pleasant")
+    path = str(tmp_path / "legacy.pth")
+    assert legacy.save(path)
+
+    # Layout written by src/studsar.py before the shared format: no index map, emotions in metadata
+    state = torch.load(path)
+    for key in ("marker_id_to_index", "id_to_emotion", "storage"):
+        state.pop(key)
+    state["network_state_dict"]["memory_embeddings"] = state["network_state_dict"]["memory_embeddings"][:len(TOPICS)]
+    torch.save(state, path)
+
+    manager = StudSarManager.load(path)
+    assert manager.search("neural memory retrieval", k=1)[0] == [1]
+    assert manager.studsar_network.get_marker_by_id(1)["emotion"] == "pleasant"
+
+    path = str(tmp_path / "manager.pth")
+    assert manager.save(path)
+    reloaded = studsar.StudSarManager.load(path, search_only=True)
+    ids, _, segments, emotions = reloaded.search("neural memory retrieval", k=1)
+    assert (ids, segments, emotions) == ([1], [TOPICS[1]], ["pleasant"])
+    embedding, segment = reloaded.studsar_network.get_marker_by_id(0)
+    assert segment == TOPICS[0] and embedding.shape == (32,)
+
+
+def test_mmap_storage_cleans_up_its_files():
+    import gc
+    import os
+
+    storage = MemmapStorage()
+    directory = storage.directory
+    network = StudSarNeural(8, initial_capacity=2, device=torch.device("cpu"), storage=storage)
+    for i in range(5):
+        network.add_marker(f"segment {i}", torch.randn(8))
+    assert len(os.listdir(directory)) == 1 # Resizes unlink the replaced files
+    with pytest.raises(ValueError):
+        storage.allocate("memory_embeddings", 4, 8, "cuda")
+    del network, storage
+    gc.collect()
+    assert not os.path.exists(directory) # Temporary directory removed with the storage
+
+    kept = MemmapStorage(directory)
+    kept.allocate("memory_embeddings", 4, 8, "cpu")
+    kept.close()
+    assert os.listdir(directory) == [] # A caller's directory is emptied, not removed
+    os.rmdir(directory)
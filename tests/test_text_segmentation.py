@@ -0,0 +1,102 @@
+"""
+Unit tests for the text segmentation utilities (no spaCy model required).
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.utils.sentences import RegexSentenceSplitter, split_sentences  # noqa: E402
+from src.utils.text import StreamingSegmenter, iter_segments, segment_text, segment_text_by_tokens  # noqa: E402
+
+LONG_TEXT = " ".join(f"Sentence number {i} has a handful of words in it." for i in range(300))
+
+
+@pytest.mark.parametrize("chunk_size", [3, 17, 256, 1 << 20])
+def test_streaming_word_segments_match_segment_text(chunk_size):
+    expected = segment_text(LONG_TEXT, segment_length=13, use_spacy=False)
+    from_file = list(iter_segments(io.StringIO(LONG_TEXT), segment_length=13, use_spacy=False, chunk_size=chunk_size))
+    chunks = [LONG_TEXT[i:i + chunk_size] for i in range(0, len(LONG_TEXT), chunk_size)]
+    from_iterable = list(StreamingSegmenter(iter(chunks), segment_length=13, use_spacy=False))
+    assert from_file == expected
+    assert from_iterable == expected
+
+
+def test_streaming_handles_bytes_and_empty_sources():
+    assert list(iter_segments(io.BytesIO(b"alpha beta gamma"), segment_length=2, use_spacy=False)) == ["alpha beta", "gamma"]
+    assert list(iter_segments(io.StringIO(""), use_spacy=False)) == []
+
+
+def test_regex_splitter_handles_abbreviations_and_initials():
+    text = ('Dr. Smith met Mr. J. R. Tolkien in the U.S. on Jan. 5. He left early! '
+            '"Was it raining?" she asked. Prices rose 3.5% e.g. in March.\n\nNew paragraph')
+    assert split_sentences(text) == [
+        "Dr. Smith met Mr. J. R. Tolkien in the U.S. on Jan. 5.",
+        "He left early!",
+        '"Was it raining?" she asked.',
+        "Prices rose 3.5% e.g. in March.",
+        "New paragraph",
+    ]
+
+
+def test_regex_splitter_custom_abbreviations_and_tail():
+    splitter = RegexSentenceSplitter(abbreviations={"approx."})
+    assert splitter.split("It weighs approx. Ten tons. Done.") == ["It weighs approx. Ten tons.", "Done."]
+    complete, tail = splitter.split_with_tail("First one. Second one. Third is cu")
+    assert complete == ["First one.", "Second one."]
+    assert "First one. Second one. Third is cu"[tail:] == "Third is cu"
+
+
+def test_regex_mode_groups_sentences_and_streams_identically():
+    text = " ".join(f"Item {i} is listed here. Mr. Jones checked item {i}." for i in range(100))
+    segments = segment_text(text, use_spacy="regex", spacy_sentences_per_segment=3)
+    assert segments[0] == "Item 0 is listed here. Mr. Jones checked item 0. Item 1 is listed here."
+    assert len(segments) == 67
+    streamed = list(iter_segments(io.StringIO(text), use_spacy="regex", spacy_sentences_per_segment=3, chunk_size=41))
+    assert streamed == segments
+
+
+class WordTokenizer:
+    """One token per whitespace word, plus [CLS]/[SEP]."""
+    def tokenize(self, text):
+        return text.split()
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+
+def test_token_budget_segments_fit_and_report_counts():
+    text = " ".join(f"Sentence {i} " + "word " * (i % 6) + "end." for i in range(40))
+    segments = segment_text_by_tokens(text, WordTokenizer(), max_tokens=16, use_spacy="regex")
+    assert all(seg.num_tokens <= 16 for seg in segments)
+    assert all(seg.num_tokens == len(seg.text.split()) + 2 for seg in segments)
+    # No sentence is lost or cut
+    assert " ".join(seg.text for seg in segments) == text
+
+
+def test_token_budget_overlap_and_long_sentences():
+    text = "Alpha one two. Beta one two. Gamma one two. Long " + " ".join(["long"] * 30) + "."
+    segments = segment_text_by_tokens(text, WordTokenizer(), max_tokens=9, overlap_sentences=1, use_spacy="regex")
+    assert segments[0].text == "Alpha one two. Beta one two."
+    assert segments[1].text.startswith("Beta one two.")
+    assert all(seg.num_tokens <= 9 for seg in segments)
+    with pytest.raises(ValueError):
+        segment_text_by_tokens(text, WordTokenizer(), max_tokens=2)
+
+
+def test_streams_reject_token_budget_and_n_process():
+    pytest.importorskip("torch")
+    from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=16))
+    for kwargs in ({"token_budget": 32}, {"n_process": 2}):
+        with pytest.raises(ValueError):
+            manager.build_network_from_text(io.StringIO("One sentence. Another one."), use_spacy_segmentation="regex", **kwargs)
+    manager.build_network_from_text(io.StringIO("One sentence. Another one."), use_spacy_segmentation="regex")
+    assert manager.studsar_network.get_total_markers() == 1
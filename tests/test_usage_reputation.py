@@ -0,0 +1,65 @@
+"""
+Bulk usage / reputation updates on dense columns and buffered usage accounting.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+torch = pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, StubEncoder  # noqa: E402
+from src.models.neural import StudSarNeural  # noqa: E402
+
+TOPICS = ["budget report for the finance department", "neural memory retrieval with embeddings",
+          "policy guidance for civil service records", "semantic search over text segments"]
+
+
+def test_bulk_updates_follow_rows_through_removal():
+    network = StudSarNeural(8, initial_capacity=2, device=torch.device("cpu"))
+    ids = [network.add_marker(f"segment {i}", torch.randn(8)) for i in range(5)]
+    assert network.increment_usage_many([ids[1], ids[4], ids[4], 99]) == 3
+    assert network.update_reputation_many([ids[0], ids[4]], [0.5, -1.0]) == 2
+    network.id_to_usage[ids[2]] += 1
+    assert dict(network.id_to_usage) == {ids[1]: 1, ids[2]: 1, ids[4]: 2}
+
+    network.remove_markers([ids[1]]) # The last row (ids[4]) moves into the freed slot
+    assert dict(network.id_to_usage) == {ids[2]: 1, ids[4]: 2}
+    assert network.id_to_reputation == {ids[0]: 0.5, ids[4]: -1.0}
+    assert network.get_marker_by_id(ids[3])["usage_count"] == 0
+    assert network.id_to_usage.get(ids[1], 0) == 0
+
+
+def test_buffered_usage_is_flushed_and_persisted(tmp_path):
+    from src.managers.manager import StudSarManager
+
+    manager = StudSarManager(model_name=STUB_MODEL_NAME, embedding_model=StubEncoder(dim=32))
+    manager.add_segments(TOPICS)
+    buffer = manager.enable_usage_buffer(flush_interval=60)
+    hits = manager.search("finance budget", k=2)[0] + manager.search_batch(["finance budget"], k=1)[0][0]
+    assert dict(manager.studsar_network.id_to_usage) == {}
+    assert buffer.pending() == 2
+
+    manager.update_reputation_many(hits[:2], 1.0)
+    path = str(tmp_path / "memory")
+    assert manager.save(path)
+    loaded = StudSarManager.load(path, embedding_model=StubEncoder(dim=32))
+    assert loaded.studsar_network.id_to_usage[hits[0]] == 2
+    assert loaded.studsar_network.id_to_reputation[hits[1]] == 1.0
+    manager.close()
+
+
+def test_columns_keep_the_mapping_views():
+    network = StudSarNeural(8, device=torch.device("cpu"))
+    ids = [network.add_marker(f"segment {i}", torch.randn(8)) for i in range(3)]
+    network.increment_usage_many([ids[0], ids[2], ids[2]])
+    network.update_reputation_many([ids[1]], [1.5])
+    assert sorted(network.id_to_usage.values()) == [1, 2]
+    assert sum(network.id_to_usage.values()) == 3
+    assert dict(network.id_to_usage.items()) == {ids[0]: 1, ids[2]: 2}
+    assert list(network.id_to_reputation.values()) == [1.5]
+    assert list(network.id_to_reputation.items()) == [(ids[1], 1.5)]
@@ -0,0 +1,83 @@
+"""
+Write-ahead log: replay on load, torn-tail recovery, checkpoints and deletes.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+
+from benchmarks.stub_encoder import STUB_MODEL_NAME, register_stub_encoder  # noqa: E402
+from src.storage.wal import OP_USAGE, WriteAheadLog, read_records, wal_path_for  # noqa: E402
+
+
+def _manager():
+    from src.managers.manager import StudSarManager
+    register_stub_encoder(dim=32)
+    return StudSarManager(model_name=STUB_MODEL_NAME)
+
+
+def test_log_truncates_torn_tail(tmp_path):
+    path = str(tmp_path / "memory.wal")
+    log = WriteAheadLog(path, group_size=2)
+    log.append(OP_USAGE, ids=[1])
+    log.append("add", embedding=np.ones(4), id=0, segment="text")
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage") # crash mid-append
+    records, _ = read_records(path)
+    assert [h["lsn"] for h, _ in records] == [1, 2]
+    assert np.array_equal(records[1][1], np.ones(4, dtype=np.float32))
+
+    log = WriteAheadLog(path)
+    assert log.append(OP_USAGE, ids=[2]) == 3
+    log.close()
+    assert len(read_records(path)[0]) == 3
+
+
+def test_mutations_are_replayed_on_load(tmp_path):
+    from src.managers.manager import StudSarManager
+
+    path = str(tmp_path / "memory")
+    manager = _manager()
+    manager.add_segments(["budget report for finance", "neural memory retrieval"])
+    assert manager.enable_log(path, group_size=8, checkpoint_every=None)
+    snapshot_mtime = os.path.getmtime(os.path.join(path, "embeddings.npy"))
+
+    new_id = manager.update_network("policy guidance for civil service", emotion="neutral")
+    manager.update_marker_reputation(0, 1.5)
+    assert manager.update_marker_embedding(0, manager.generate_embedding("finance budget"))
+    updated = manager.studsar_network.get_all_embeddings_and_ids()[0]
+    manager.search("finance budget", k=1)
+    assert manager.remove_markers([1, 1, 99]) == 1
+    assert manager.save(path) # only syncs the log
+    deletes = [h for h, _ in read_records(wal_path_for(path))[0] if h["op"] == "delete"]
+    assert [h["ids"] for h in deletes] == [[1]] # Only the markers actually removed
+    assert os.path.getmtime(os.path.join(path, "embeddings.npy")) == snapshot_mtime
+    manager.close()
+
+    loaded = StudSarManager.load(path)
+    assert (loaded.checkpoint_every, loaded._wal.group_size) == (None, 8) # Settings survive the reload
+    network = loaded.studsar_network
+    assert sorted(network.marker_id_to_index) == [0, new_id]
+    assert network.get_marker_by_id(new_id)["emotion"] == "neutral"
+    assert network.get_marker_by_id(0)["reputation"] == 1.5
+    assert network.get_marker_by_id(0)["usage_count"] == 1
+    assert torch.allclose(network.get_all_embeddings_and_ids()[0], updated)
+    assert loaded.search("civil service policy", k=1)[0] == [new_id]
+
+    # A checkpoint folds the log into the snapshot; sequence numbers keep going
+    assert loaded.checkpoint()
+    assert read_records(wal_path_for(path))[0] == []
+    loaded.update_network("added after the checkpoint")
+    loaded.close()
+    reloaded = StudSarManager.load(path)
+    assert reloaded.studsar_network.get_total_markers() == 3
+    assert reloaded.studsar_network.get_marker_by_id(new_id)["usage_count"] == 1